@@ -0,0 +1,183 @@
+import io
+import os
+import gzip
+import json
+import hashlib
+import logging
+import tarfile
+import zipfile
+from builder import as_output_key, output_path
+from limits import DocumentLimitError
+from manifest import MANIFEST_NAME, RESERVED_NAMES, hash_bytes
+
+# Every entry gets this timestamp (1980-01-01, the earliest a zip can hold),
+# so archives of the same site are byte-identical
+FIXED_MTIME = 315532800
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+FILE_MODE = 0o644
+# Static files are streamed into the archive in chunks of this size
+CHUNK_SIZE = 1024 * 1024
+
+class HashingReader:
+    """File wrapper that hashes what is read through it."""
+    def __init__(self, f):
+        self.f = f
+        self.hash = hashlib.sha256()
+    
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.hash.update(data)
+        return data
+
+class SiteArchive:
+    """
+    A tar, gzipped tar or zip archive of site output, written entry by entry.
+    
+    The format follows the file name: .zip, .tar.gz or .tgz, or .tar. Entries
+    carry fixed timestamps and permissions and no owner, and the gzip header
+    no name or time, so the archive depends only on the entries' paths, bytes
+    and order. Each entry's sha256 is recorded for the build manifest.
+    
+    The archive is written under a temporary name next to path and only
+    renamed into place by close(), so a failed build never leaves a partial
+    archive at path. Leaving a with block by an exception discards it.
+    
+    Args:
+        path: Archive file to create
+    
+    Raises:
+        ValueError: If the file name has no supported extension
+    """
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+        self.manifest = {}
+        self._file = None
+        self._gzip = None
+        self._tar = None
+        self._zip = None
+        if path.endswith(".zip"):
+            self._zip = zipfile.ZipFile(self.temp_path, "w", zipfile.ZIP_DEFLATED)
+        elif path.endswith((".tar.gz", ".tgz")):
+            self._file = open(self.temp_path, "wb")
+            self._gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self._file, mtime=0)
+            self._tar = tarfile.open(fileobj=self._gzip, mode="w", format=tarfile.PAX_FORMAT)
+        elif path.endswith(".tar"):
+            self._tar = tarfile.open(self.temp_path, mode="w", format=tarfile.PAX_FORMAT)
+        else:
+            raise ValueError(f"Archive must end in .zip, .tar.gz, .tgz or .tar: {path}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+    
+    def _tar_info(self, key, size):
+        info = tarfile.TarInfo(key)
+        info.size = size
+        info.mtime = FIXED_MTIME
+        info.mode = FILE_MODE
+        return info
+    
+    def _zip_info(self, key):
+        info = zipfile.ZipInfo(key, FIXED_DATE_TIME)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = FILE_MODE << 16
+        return info
+    
+    def add_bytes(self, key, data):
+        """Add an entry from bytes in memory."""
+        self.manifest[key] = hash_bytes(data)
+        if self._zip is not None:
+            self._zip.writestr(self._zip_info(key), data)
+        else:
+            self._tar.addfile(self._tar_info(key, len(data)), io.BytesIO(data))
+    
+    def add_file(self, key, path):
+        """Add an entry streamed from a file on disk, without reading it whole."""
+        with open(path, "rb") as f:
+            reader = HashingReader(f)
+            if self._zip is not None:
+                with self._zip.open(self._zip_info(key), "w") as entry:
+                    while True:
+                        chunk = reader.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        entry.write(chunk)
+            else:
+                self._tar.addfile(self._tar_info(key, os.fstat(f.fileno()).st_size), reader)
+        self.manifest[key] = reader.hash.hexdigest()
+    
+    def _close_files(self):
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+        if self._gzip is not None:
+            self._gzip.close()
+        if self._file is not None:
+            self._file.close()
+    
+    def close(self):
+        """Finish the archive and move it into place at path."""
+        self._close_files()
+        os.replace(self.temp_path, self.path)
+    
+    def discard(self):
+        """Abandon the archive, leaving whatever was at path untouched."""
+        try:
+            self._close_files()
+        finally:
+            try:
+                os.remove(self.temp_path)
+            except FileNotFoundError:
+                pass
+
+def write_site_archive(site, archive_path):
+    """
+    Build a site straight into an archive, with no output tree on disk.
+    
+    Entries are written in sorted path order: pages are rendered as they are
+    reached, static files are streamed from static_dir, and stylesheets the
+    site's css stage rewrote come from its output. A page that cannot be read
+    or exceeds the site's limits is logged and left out, as in a normal
+    build. The build manifest is added last.
+    
+    Args:
+        site: The Site to build
+        archive_path: Archive file to create (see SiteArchive)
+    
+    Returns:
+        The manifest of the archived files
+    """
+    template_content = site.read_template()
+    pages = {as_output_key(output_path(path)): path for path in site.pages()}
+    static = {as_output_key(path): path for path in site.static_files()}
+    generated = site.css.outputs() if site.css is not None else {}
+    
+    with SiteArchive(archive_path) as archive:
+        for key in sorted(set(pages) | set(static) | set(generated)):
+            if key in RESERVED_NAMES:
+                continue
+            if key in pages:
+                try:
+                    page = site.build_page(pages[key], template_content)
+                except DocumentLimitError as e:
+                    logging.error(f"Skipping {pages[key]}: {e}")
+                    continue
+                except Exception as e:
+                    logging.error(f"Error converting {pages[key]} to HTML: {e}")
+                    continue
+                archive.add_bytes(*page)
+            elif key in generated:
+                archive.add_bytes(key, generated[key])
+            else:
+                archive.add_file(key, os.path.join(site.static_dir, static[key]))
+        manifest = dict(archive.manifest)
+        archive.add_bytes(MANIFEST_NAME, (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+    logging.info(f"Archived {len(manifest)} files into {archive_path}")
+    return manifest
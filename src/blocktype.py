@@ -1,5 +1,9 @@
+import re
 from enum import Enum
 
+# An indented item line nested inside a list; nested lists may use either marker
+NESTED_ITEM_PATTERN = re.compile(r"[ \t]+(?:- |\d+\. )")
+
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
     HEADING = "heading"
@@ -19,8 +23,10 @@ def block_to_block_type(block):
     """
     # Check if it's a heading (starts with 1-6 # characters followed by a space)
     if block.startswith("#"):
-        # Extract the potential heading marker
-        heading_marker = block.split(" ", 1)[0]
+        # Extract the potential heading marker, looking no further than the
+        # longest valid marker so a huge block is not copied just to find it
+        marker_end = block.find(" ", 0, 7)
+        heading_marker = block[:marker_end] if marker_end != -1 else block[:7]
         # Check if it's a valid heading (1-6 # characters)
         if 1 <= len(heading_marker) <= 6 and all(char == '#' for char in heading_marker):
             return BlockType.HEADING
@@ -29,23 +35,36 @@ def block_to_block_type(block):
     if block.startswith("```") and block.endswith("```"):
         return BlockType.CODE
     
-    # Check if it's a quote block (every line starts with >)
+    # The remaining types all constrain the first line, so the first
+    # characters pick the single candidate and its lines are scanned once
     lines = block.split("\n")
-    if all(line.startswith(">") for line in lines):
-        return BlockType.QUOTE
     
-    # Check if it's an unordered list (every line starts with - followed by a space)
-    if all(line.startswith("- ") for line in lines):
-        return BlockType.UNORDERED_LIST
+    # Check if it's a quote block (every line starts with >, ">>" or "> >" nesting)
+    if block.startswith(">"):
+        if all(line.startswith(">") for line in lines):
+            return BlockType.QUOTE
+    
+    # Check if it's an unordered list (every line starts with - followed by a
+    # space, or is an indented item of a nested list)
+    elif block.startswith("- "):
+        if all(line.startswith("- ") or NESTED_ITEM_PATTERN.match(line) for line in lines):
+            return BlockType.UNORDERED_LIST
     
     # Check if it's an ordered list
-    # Every line must start with a number followed by . and a space
-    # Numbers must start at 1 and increment by 1 for each line
-    if len(lines) > 0 and lines[0].startswith("1. "):
+    # Every unindented line must start with a number followed by . and a space
+    # Numbers must start at 1 and increment by 1 for each of those lines;
+    # indented lines are items of nested lists
+    elif block.startswith("1. "):
         is_ordered_list = True
-        for i, line in enumerate(lines, 1):
-            expected_prefix = f"{i}. "
-            if not line.startswith(expected_prefix):
+        number = 0
+        for line in lines:
+            if line.startswith((" ", "\t")):
+                if not NESTED_ITEM_PATTERN.match(line):
+                    is_ordered_list = False
+                    break
+                continue
+            number += 1
+            if not line.startswith(f"{number}. "):
                 is_ordered_list = False
                 break
         if is_ordered_list:
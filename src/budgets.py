@@ -0,0 +1,144 @@
+import os
+import logging
+import posixpath
+from urllib.parse import unquote
+from hooks import PRE_WRITE, POST_BUILD
+from manifest import write_json
+
+class SizeBudgets:
+    """
+    Byte limits for a build's output; any limit may be None to disable it.
+    
+    Args:
+        max_page_bytes: Largest final HTML of a single page
+        max_image_bytes: Largest total size of the local images one page references
+        max_site_bytes: Largest total size of all pages and static files
+    """
+    def __init__(self, max_page_bytes=None, max_image_bytes=None, max_site_bytes=None):
+        self.max_page_bytes = max_page_bytes
+        self.max_image_bytes = max_image_bytes
+        self.max_site_bytes = max_site_bytes
+    
+    def __bool__(self):
+        return any(limit is not None for limit in (self.max_page_bytes, self.max_image_bytes, self.max_site_bytes))
+    
+    def to_dict(self):
+        return {
+            "max_page_bytes": self.max_page_bytes,
+            "max_image_bytes": self.max_image_bytes,
+            "max_site_bytes": self.max_site_bytes,
+        }
+
+def image_key(page_key, url):
+    """
+    Resolve an image URL from a page to a static output path.
+    
+    Returns:
+        The output path, e.g. "images/tom.png", or None for an external or data URL
+    """
+    url = url.split("#", 1)[0].split("?", 1)[0]
+    if not url or url.startswith("//") or ":" in url.split("/", 1)[0]:
+        return None
+    if url.startswith("/"):
+        path = url[1:]
+    else:
+        path = posixpath.join(posixpath.dirname(page_key), url)
+    return posixpath.normpath(unquote(path)).lstrip("/")
+
+class BudgetCheck:
+    """
+    Checks a build's output sizes against SizeBudgets as the pages are written.
+    
+    It subscribes to the build hooks like a plugin: pre-write measures each
+    page's final HTML and adds up the sizes of the local images its summary
+    lists, and post-build totals the site and writes the JSON report. Image
+    and static sizes come from the inventory's stat data, so no output file
+    is read back.
+    
+    Args:
+        budgets: The SizeBudgets to enforce
+        static_sizes: {output path: size in bytes} of every static file, which
+            pages' images are looked up in
+        dest_dir: Output directory the pages are written to
+        report_path: Where post-build writes the report
+        site_static: Output paths of the static files this build writes, which
+            count towards the site total; None for all of static_sizes. A shard
+            passes its own files, while its pages may show images of any shard.
+    """
+    def __init__(self, budgets, static_sizes, dest_dir, report_path, site_static=None):
+        self.budgets = budgets
+        self.static_sizes = static_sizes
+        self.site_static = set(static_sizes if site_static is None else site_static)
+        self.dest_dir = dest_dir
+        self.report_path = report_path
+        # page output path -> (HTML bytes, referenced image bytes)
+        self.pages = {}
+    
+    def register(self, hooks):
+        """Subscribe to a HookRegistry, in the same way a plugin's register does."""
+        hooks.register(PRE_WRITE, self.record_page, name="budgets.record_page")
+        hooks.register(POST_BUILD, self.finish, name="budgets.finish")
+    
+    def record_page(self, html, page):
+        """Record a page's sizes and warn if it is over budget; html is returned unchanged."""
+        key = os.path.relpath(page.dest_path, self.dest_dir).replace(os.sep, "/")
+        images = set()
+        if page.summary is not None:
+            images = {image_key(key, url) for alt, url in page.summary.images}
+        image_bytes = sum(self.static_sizes.get(image, 0) for image in images if image is not None)
+        self.pages[key] = (len(html.encode("utf-8")), image_bytes)
+        for violation in self._page_violations(key):
+            logging.warning(f"Over budget: {violation['path']} {violation['budget']} is {violation['bytes']} bytes, "
+                            f"limit {violation['limit']}")
+        return html
+    
+    def _page_violations(self, key):
+        html_bytes, image_bytes = self.pages[key]
+        violations = []
+        if self.budgets.max_page_bytes is not None and html_bytes > self.budgets.max_page_bytes:
+            violations.append({"budget": "page_html", "path": key, "bytes": html_bytes,
+                               "limit": self.budgets.max_page_bytes})
+        if self.budgets.max_image_bytes is not None and image_bytes > self.budgets.max_image_bytes:
+            violations.append({"budget": "page_images", "path": key, "bytes": image_bytes,
+                               "limit": self.budgets.max_image_bytes})
+        return violations
+    
+    def add_static(self, outputs):
+        """Record static files the build rewrote after copying, from their new bytes."""
+        for key, data in outputs.items():
+            self.static_sizes[key] = len(data)
+            self.site_static.add(key)
+    
+    @property
+    def site_bytes(self):
+        """Total size of the pages recorded so far and the static files."""
+        return (sum(html_bytes for html_bytes, _ in self.pages.values())
+                + sum(self.static_sizes[key] for key in self.site_static))
+    
+    def violations(self):
+        """Return every budget violation, pages in path order and then the site total."""
+        violations = []
+        for key in sorted(self.pages):
+            violations.extend(self._page_violations(key))
+        site_bytes = self.site_bytes
+        if self.budgets.max_site_bytes is not None and site_bytes > self.budgets.max_site_bytes:
+            violations.append({"budget": "site", "path": None, "bytes": site_bytes,
+                               "limit": self.budgets.max_site_bytes})
+        return violations
+    
+    def report(self):
+        """Return the budget report: the limits, the totals, every page's sizes and the violations."""
+        return {
+            "budgets": self.budgets.to_dict(),
+            "site_bytes": self.site_bytes,
+            "pages": {key: {"html_bytes": html, "image_bytes": images} for key, (html, images) in self.pages.items()},
+            "violations": self.violations(),
+        }
+    
+    def finish(self, dest_dir, page):
+        """Write the report at the end of the build."""
+        report = self.report()
+        write_json(report, self.report_path)
+        logging.info(f"Size budgets: {report['site_bytes']} site bytes, {len(report['violations'])} violations, "
+                     f"report in {self.report_path}")
+        return dest_dir
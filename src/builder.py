@@ -0,0 +1,392 @@
+import os
+import re
+import shutil
+import logging
+from htmlnode import escape_text
+from limits import DEFAULT_LIMITS, DocumentLimitError
+from utils import parse_document
+from fastrender import markdown_to_html_with_summary
+
+# Title used when a page has no h1 heading
+DEFAULT_TITLE = "Untitled Page"
+
+def apply_basepath(html, basepath):
+    """
+    Prefix root-relative href and src attributes with a basepath.
+    
+    Args:
+        html: The rendered HTML page
+        basepath: Base path for all links and resources, e.g. "/repo-name"
+        
+    Returns:
+        The HTML with href="/ and src="/ rewritten; unchanged for basepath "/"
+    """
+    if basepath == "/":
+        return html
+    
+    # Make sure basepath doesn't end with a slash if it's not just "/"
+    if basepath.endswith("/"):
+        basepath = basepath[:-1]
+    
+    html = html.replace('href="/', f'href="{basepath}/')
+    return html.replace('src="/', f'src="{basepath}/')
+
+def summary_values(summary, related="", markers=None):
+    """
+    Map the summary placeholders to their text for one page.
+    
+    Args:
+        summary: The page's DocumentSummary, or None to leave them empty
+        related: HTML for the {{ Related }} placeholder
+        markers: The placeholder markers the template uses (default: all);
+            the summary's word count is only computed if one needs it
+        
+    Returns:
+        A dict from placeholder marker to replacement text, for markers
+    """
+    values = {RELATED: related}
+    if markers is None or TOC in markers:
+        values[TOC] = "" if summary is None else summary.toc_html()
+    if markers is None or WORD_COUNT in markers:
+        values[WORD_COUNT] = "" if summary is None else str(summary.word_count)
+    if markers is None or READING_TIME in markers:
+        values[READING_TIME] = "" if summary is None else str(summary.reading_time)
+    return values
+
+def fill_template(template_content, title, html_content, basepath="/", summary=None, related=""):
+    """
+    Substitute the title and content into a template and apply the basepath.
+    
+    Args:
+        template_content: Template text with {{ Title }} and {{ Content }} placeholders,
+            and optionally {{ Toc }}, {{ WordCount }}, {{ ReadingTime }} and {{ Related }}
+        title: Already-escaped page title
+        html_content: Rendered page body
+        basepath: Base path for all links and resources (default: "/")
+        summary: The page's DocumentSummary, filling the optional placeholders
+        related: HTML listing the page's related posts, see RelatedPosts.html_for
+        
+    Returns:
+        The final page HTML
+    """
+    markers = {marker for marker, text in PLACEHOLDERS.items() if text in template_content}
+    for marker, value in summary_values(summary, related, markers).items():
+        template_content = template_content.replace(PLACEHOLDERS[marker], value)
+    final_html = template_content.replace("{{ Title }}", title).replace("{{ Content }}", html_content)
+    return apply_basepath(final_html, basepath)
+
+class Template:
+    """
+    A page template compiled once into the text around its placeholders.
+    
+    Rendering joins the pre-split segments instead of searching the whole
+    template for each placeholder on every page.
+    
+    Args:
+        template_content: Template text with {{ Title }} and {{ Content }} placeholders,
+            and optionally {{ Toc }}, {{ WordCount }}, {{ ReadingTime }} and {{ Related }}
+    """
+    def __init__(self, template_content):
+        markers = {text: marker for marker, text in PLACEHOLDERS.items()}
+        self.segments = [
+            markers.get(piece, piece)
+            for piece in PLACEHOLDER_PATTERN.split(template_content)
+        ]
+        self.markers = {segment for segment in self.segments if segment in PLACEHOLDERS}
+    
+    def render(self, title, html_content, basepath="/", summary=None, related=""):
+        """Fill in an already-escaped title, the page body, its summary and related posts, then apply the basepath."""
+        values = summary_values(summary, related, self.markers)
+        values[TITLE] = title
+        values[CONTENT] = html_content
+        html = "".join(values.get(segment, segment) for segment in self.segments)
+        return apply_basepath(html, basepath)
+
+# Placeholder markers inside Template.segments; compared by identity
+TITLE = object()
+CONTENT = object()
+TOC = object()
+WORD_COUNT = object()
+READING_TIME = object()
+RELATED = object()
+
+PLACEHOLDERS = {
+    TITLE: "{{ Title }}",
+    CONTENT: "{{ Content }}",
+    TOC: "{{ Toc }}",
+    WORD_COUNT: "{{ WordCount }}",
+    READING_TIME: "{{ ReadingTime }}",
+    RELATED: "{{ Related }}",
+}
+PLACEHOLDER_PATTERN = re.compile("(" + "|".join(re.escape(text) for text in PLACEHOLDERS.values()) + ")")
+
+def parse_page(markdown_content, limits=DEFAULT_LIMITS, fast=False, inline_cache=None, block_cache=None):
+    """
+    Parse a markdown document into the basepath-independent parts of a page.
+    
+    The result can be passed to fill_template once per basepath, so a page
+    built for several targets is only parsed and serialized once.
+    
+    Args:
+        markdown_content: The page's markdown source
+        limits: DocumentLimits applied to the markdown (None disables them)
+        fast: Render with the fused markdown_to_html instead of building a node tree
+        inline_cache: Optional InlineCache shared with other pages of the build
+        block_cache: Optional BlockCache of rendered blocks, kept across rebuilds
+        
+    Returns:
+        A tuple of (escaped title, rendered body HTML, DocumentSummary); the
+        title comes from the summary, so the document is only scanned once
+        
+    Raises:
+        DocumentLimitError: If the document exceeds one of the given limits
+    """
+    if fast:
+        html_content, summary = markdown_to_html_with_summary(markdown_content, limits, inline_cache=inline_cache,
+                                                              block_cache=block_cache)
+    else:
+        node, summary = parse_document(markdown_content, limits, inline_cache=inline_cache, block_cache=block_cache)
+        html_content = node.to_html()
+    title = DEFAULT_TITLE if summary.title is None else escape_text(summary.title)
+    return title, html_content, summary
+
+def render_page(markdown_content, template_content, basepath="/", limits=DEFAULT_LIMITS, fast=False,
+                inline_cache=None, block_cache=None):
+    """
+    Render a markdown document into a full HTML page.
+    
+    Args:
+        markdown_content: The page's markdown source
+        template_content: Template text with {{ Title }} and {{ Content }} placeholders
+        basepath: Base path for all links and resources (default: "/")
+        limits: DocumentLimits applied to the markdown (None disables them)
+        fast: Render with the fused markdown_to_html instead of building a node tree
+        inline_cache: Optional InlineCache shared with other pages of the build
+        block_cache: Optional BlockCache of rendered blocks, kept across rebuilds
+        
+    Returns:
+        The final page HTML
+        
+    Raises:
+        DocumentLimitError: If the document exceeds one of the given limits
+    """
+    title, html_content, summary = parse_page(markdown_content, limits, fast, inline_cache, block_cache)
+    return fill_template(template_content, title, html_content, basepath, summary)
+
+def output_path(markdown_path):
+    """
+    Map a markdown path to the HTML path it is generated at.
+    
+    index.md keeps its directory (blog/tom/index.md -> blog/tom/index.html);
+    any other file swaps its .md extension for .html.
+    """
+    head, name = os.path.split(markdown_path)
+    if name == "index.md":
+        return os.path.join(head, "index.html")
+    return os.path.join(head, name[:-len(".md")] + ".html")
+
+def walk_files(root):
+    """Yield the paths of all files under root, relative to it, in sorted order."""
+    for dirpath, dirs, files in os.walk(root):
+        dirs.sort()
+        rel_dir = os.path.relpath(dirpath, root)
+        for name in sorted(files):
+            yield name if rel_dir == "." else os.path.join(rel_dir, name)
+
+class Site:
+    """
+    Programmatic access to a site build.
+    
+    The site can be built into an in-memory mapping of output path to bytes,
+    written to disk, or rebuilt one page at a time. Output paths are relative
+    to the output root and always use forward slashes.
+    
+    Args:
+        content_dir: Directory containing the markdown pages
+        template_path: Path to the HTML template file
+        static_dir: Optional directory of static files copied as-is
+        basepath: Base path for all links and resources (default: "/")
+        limits: DocumentLimits applied to each page (None disables them)
+        fast: Render with the fused markdown_to_html instead of building node trees
+        inline_cache: Optional InlineCache shared by all pages; kept across builds
+        block_cache: Optional BlockCache of rendered blocks; kept across builds, so
+            rebuilding an edited page re-renders only its changed blocks
+        css: Optional CssStage that inlines or content-hashes the template's
+            stylesheets and minifies the static ones
+        minify: Optional HtmlMinifier applied to the template
+    """
+    def __init__(self, content_dir, template_path, static_dir=None, basepath="/", limits=DEFAULT_LIMITS, fast=False,
+                 inline_cache=None, css=None, block_cache=None, minify=None):
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.static_dir = static_dir
+        self.basepath = basepath
+        self.limits = limits
+        self.fast = fast
+        self.inline_cache = inline_cache
+        self.css = css
+        self.block_cache = block_cache
+        self.minify = minify
+    
+    def read_template(self):
+        """Return the current template text, with its stylesheets processed by css, then minified."""
+        with open(self.template_path, 'r') as f:
+            template_content = f.read()
+        if self.css is not None:
+            template_content = self.css.apply(template_content)
+        if self.minify is not None:
+            template_content = self.minify.apply(template_content)
+        return template_content
+    
+    def pages(self):
+        """Return the markdown pages of the site, relative to content_dir, sorted."""
+        return [path for path in walk_files(self.content_dir) if path.endswith(".md")]
+    
+    def static_files(self):
+        """Return the static files of the site, relative to static_dir, sorted."""
+        if self.static_dir is None or not os.path.isdir(self.static_dir):
+            return []
+        return list(walk_files(self.static_dir))
+    
+    def static_output(self):
+        """
+        Read the static files into an output mapping.
+        
+        Stylesheets are replaced by the css stage's output, so the template
+        must have been read first for its hashed stylesheets to be included.
+        """
+        output = {}
+        for path in self.static_files():
+            with open(os.path.join(self.static_dir, path), 'rb') as f:
+                output[as_output_key(path)] = f.read()
+        if self.css is not None:
+            output.update(self.css.outputs())
+        return output
+    
+    def build_page(self, path, template_content=None):
+        """
+        Render a single page.
+        
+        Args:
+            path: Markdown path relative to content_dir, e.g. "blog/tom/index.md"
+            template_content: Template text to use instead of re-reading the template
+            
+        Returns:
+            A tuple of (output path, page bytes)
+        """
+        if template_content is None:
+            template_content = self.read_template()
+        with open(os.path.join(self.content_dir, path), 'r') as f:
+            markdown_content = f.read()
+        html = render_page(markdown_content, template_content, self.basepath, self.limits, self.fast,
+                           self.inline_cache, self.block_cache)
+        return as_output_key(output_path(path)), html.encode("utf-8")
+    
+    def build_targets(self, basepaths):
+        """
+        Build the site in memory for several basepaths at once.
+        
+        Each page is read and parsed once; only the template substitution and
+        basepath rewrite are repeated per basepath. Static files are shared.
+        
+        Args:
+            basepaths: Iterable of basepaths to build for
+            
+        Returns:
+            A dict mapping each basepath to its output mapping (see build)
+        """
+        basepaths = list(basepaths)
+        template_content = self.read_template()
+        static = self.static_output()
+        outputs = {basepath: dict(static) for basepath in basepaths}
+        
+        for path in self.pages():
+            # A page that cannot be read or exceeds the limits is logged and
+            # left out of every target, as in a single build
+            try:
+                with open(os.path.join(self.content_dir, path), 'r') as f:
+                    title, html_content, summary = parse_page(f.read(), self.limits, self.fast, self.inline_cache,
+                                                              self.block_cache)
+            except DocumentLimitError as e:
+                logging.error(f"Skipping {path}: {e}")
+                continue
+            except Exception as e:
+                logging.error(f"Error converting {path} to HTML: {e}")
+                continue
+            key = as_output_key(output_path(path))
+            for basepath in basepaths:
+                html = fill_template(template_content, title, html_content, basepath, summary)
+                outputs[basepath][key] = html.encode("utf-8")
+        return outputs
+    
+    def build(self):
+        """
+        Build the whole site in memory.
+        
+        Returns:
+            A dict mapping each output path to its bytes; pages take precedence
+            over static files with the same path
+        """
+        template_content = self.read_template()
+        output = self.static_output()
+        for path in self.pages():
+            key, data = self.build_page(path, template_content)
+            output[key] = data
+        return output
+    
+    def write(self, dest_dir, clean=True):
+        """
+        Build the site and write it to disk.
+        
+        Args:
+            dest_dir: Output directory
+            clean: Delete dest_dir before writing (default: True)
+            
+        Returns:
+            The in-memory output that was written
+        """
+        output = self.build()
+        if clean and os.path.exists(dest_dir):
+            logging.info(f"Deleting existing destination directory: {dest_dir}")
+            shutil.rmtree(dest_dir)
+        write_output(output, dest_dir)
+        return output
+    
+    def write_targets(self, targets, clean=True):
+        """
+        Build the site for several (basepath, dest_dir) targets and write each.
+        
+        Pages are parsed once for all targets (see build_targets).
+        """
+        targets = list(targets)
+        outputs = self.build_targets(basepath for basepath, dest_dir in targets)
+        for basepath, dest_dir in targets:
+            if clean and os.path.exists(dest_dir):
+                logging.info(f"Deleting existing destination directory: {dest_dir}")
+                shutil.rmtree(dest_dir)
+            write_output(outputs[basepath], dest_dir)
+        return outputs
+    
+    def write_page(self, path, dest_dir):
+        """
+        Rebuild a single page and write it into an existing output directory.
+        
+        Returns:
+            The output path that was written
+        """
+        key, data = self.build_page(path)
+        write_output({key: data}, dest_dir)
+        return key
+
+def as_output_key(path):
+    """Normalise a relative path into an output mapping key."""
+    return path.replace(os.sep, "/")
+
+def write_output(output, dest_dir):
+    """Write a mapping of output path to bytes under dest_dir."""
+    for key, data in output.items():
+        dest_path = os.path.join(dest_dir, *key.split("/"))
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, 'wb') as f:
+            f.write(data)
+        logging.info(f"Wrote {dest_path}")
@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import logging
+import argparse
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from limits import DocumentLimitError, DEFAULT_LIMITS
+from fastrender import markdown_to_html_with_summary
+from inlinecache import InlineCache
+
+# Records handed to a worker at a time; larger batches amortize the IPC cost
+DEFAULT_BATCH_SIZE = 256
+# Batches read ahead of the writer per worker process
+PENDING_PER_WORKER = 2
+
+# Each process keeps its own cache of inline fragments across batches
+INLINE_CACHE = InlineCache()
+
+def convert_record(line, limits=DEFAULT_LIMITS):
+    """
+    Convert one NDJSON record {"id", "markdown"} into its result record.
+    
+    Returns:
+        A dict of {"id", "html", "title"}, where title is the first h1's
+        text or None; or {"id", "error"} if the record could not be converted
+    """
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return {"id": None, "error": f"Invalid JSON: {e}"}
+    if not isinstance(record, dict):
+        return {"id": None, "error": "Record must be a JSON object"}
+    record_id = record.get("id")
+    markdown = record.get("markdown")
+    if not isinstance(markdown, str):
+        return {"id": record_id, "error": "Record has no markdown string"}
+    try:
+        html, summary = markdown_to_html_with_summary(markdown, limits, inline_cache=INLINE_CACHE)
+    except DocumentLimitError as e:
+        return {"id": record_id, "error": str(e)}
+    return {"id": record_id, "html": html, "title": summary.title}
+
+def convert_batch(lines, limits=DEFAULT_LIMITS):
+    """Convert a batch of NDJSON lines and return the output lines, in order, as one string."""
+    return "".join(json.dumps(convert_record(line, limits)) + "\n" for line in lines)
+
+def read_batches(infile, batch_size):
+    """Yield lists of up to batch_size non-blank lines from infile."""
+    lines = (line for line in infile if line.strip())
+    while True:
+        batch = list(itertools.islice(lines, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def convert_stream(infile, outfile, executor=None, batch_size=DEFAULT_BATCH_SIZE, max_pending=None,
+                   limits=DEFAULT_LIMITS):
+    """
+    Convert every NDJSON record of infile and write the results to outfile.
+    
+    Records are read in batches and converted on the executor. Results are
+    written in input order, and at most max_pending batches are read ahead
+    of the writer, so memory stays bounded however long the input is.
+    
+    Args:
+        infile: Text file of {"id", "markdown"} records, one per line
+        outfile: Text file the {"id", "html", "title"} records are written to
+        executor: Executor to convert batches on, or None to convert in-process
+        batch_size: Records per batch
+        max_pending: Batches read ahead of the writer (default: PENDING_PER_WORKER per CPU)
+        limits: DocumentLimits applied to each record (None disables them)
+    
+    Returns:
+        The number of records converted
+    """
+    count = 0
+    if executor is None:
+        for batch in read_batches(infile, batch_size):
+            outfile.write(convert_batch(batch, limits))
+            count += len(batch)
+        return count
+    
+    if max_pending is None:
+        max_pending = PENDING_PER_WORKER * (os.cpu_count() or 1)
+    pending = deque()
+    for batch in read_batches(infile, batch_size):
+        # Wait for the oldest batch before reading further ahead
+        if len(pending) >= max_pending:
+            outfile.write(pending.popleft().result())
+        pending.append(executor.submit(convert_batch, batch, limits))
+        count += len(batch)
+    while pending:
+        outfile.write(pending.popleft().result())
+    return count
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description="Convert NDJSON markdown records to NDJSON HTML records")
+    parser.add_argument("input", nargs="?", default="-",
+                        help='File of {"id", "markdown"} records, one per line (default: stdin)')
+    parser.add_argument("-o", "--output", default="-",
+                        help='File to write {"id", "html", "title"} records to (default: stdout)')
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Convert on this many processes (default: in-process)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Records per batch (default: {DEFAULT_BATCH_SIZE})")
+    args = parser.parse_args(argv)
+    
+    infile = sys.stdin if args.input == "-" else open(args.input, 'r')
+    outfile = sys.stdout if args.output == "-" else open(args.output, 'w')
+    try:
+        if args.workers > 0:
+            with ProcessPoolExecutor(args.workers) as executor:
+                count = convert_stream(infile, outfile, executor, args.batch_size,
+                                       PENDING_PER_WORKER * args.workers)
+        else:
+            count = convert_stream(infile, outfile, batch_size=args.batch_size)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+    logging.info(f"Converted {count} records")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
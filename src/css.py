@@ -0,0 +1,182 @@
+import os
+import re
+import hashlib
+import logging
+from builder import walk_files, as_output_key
+from shard import in_shard
+
+# Minified stylesheets up to this many bytes are inlined into the page head
+DEFAULT_INLINE_LIMIT = 8 * 1024
+
+# Strings are kept verbatim, comments dropped and whitespace runs collapsed
+CSS_TOKEN_PATTERN = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/|\s+|[^"\'/\s]+|/', re.DOTALL)
+# Punctuation that needs no whitespace on either side
+CSS_TIGHT = frozenset("{};,>")
+
+LINK_TAG_PATTERN = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+HREF_PATTERN = re.compile(r'\bhref="([^"]*)"', re.IGNORECASE)
+STYLESHEET_PATTERN = re.compile(r'\brel="stylesheet"', re.IGNORECASE)
+
+def minify_css(css):
+    """
+    Minify a stylesheet by removing comments and unneeded whitespace.
+    
+    Quoted strings are left untouched, whitespace is dropped around { } ; , >
+    and after a colon, and the last semicolon of each block is removed.
+    
+    Example:
+        minify_css("a {\\n  color: red;\\n}\\n") # "a{color:red}"
+    """
+    parts = []
+    pending_space = False
+    for match in CSS_TOKEN_PATTERN.finditer(css):
+        token = match.group()
+        if token.startswith("/*"):
+            pending_space = True
+            continue
+        if token.isspace():
+            pending_space = True
+            continue
+        if token[0] not in "\"'":
+            # Split bare runs so punctuation can be joined tightly
+            pieces = re.split(r"([{};,>:])", token)
+        else:
+            pieces = [token]
+        for piece in pieces:
+            if not piece:
+                continue
+            if pending_space and parts and parts[-1][-1] not in CSS_TIGHT and parts[-1][-1] != ":" \
+                    and piece[0] not in CSS_TIGHT:
+                parts.append(" ")
+            pending_space = False
+            if piece == "}" and parts and parts[-1] == ";":
+                parts.pop()
+            parts.append(piece)
+    return "".join(parts)
+
+class Stylesheet:
+    """
+    A minified stylesheet from the static directory.
+    
+    Attributes:
+        key: Output path of the original stylesheet, e.g. "index.css"
+        minified: The minified CSS text
+        digest: sha256 hex digest of the minified bytes
+    """
+    def __init__(self, key, minified):
+        self.key = key
+        self.minified = minified
+        self.digest = hashlib.sha256(minified.encode("utf-8")).hexdigest()
+    
+    @property
+    def hashed_key(self):
+        """Content-hashed output path, e.g. "index.0123456789.css"."""
+        stem, ext = os.path.splitext(self.key)
+        return f"{stem}.{self.digest[:10]}{ext}"
+
+class CssStage:
+    """
+    Minifies the site's stylesheets and inlines the small ones into pages.
+    
+    Each stylesheet is minified once per build, cached by the hash of its
+    source, and each template is rewritten once, cached by its text, so pages
+    sharing a template pay only a dictionary lookup. A <link rel="stylesheet">
+    to a static stylesheet whose minified size is at most inline_limit bytes
+    becomes a <style> element; a larger one keeps its link with a
+    content-hashed URL.
+    
+    Args:
+        static_dir: Directory the stylesheets are served from
+        inline_limit: Largest minified stylesheet, in bytes, that is inlined
+    """
+    def __init__(self, static_dir, inline_limit=DEFAULT_INLINE_LIMIT):
+        self.static_dir = static_dir
+        self.inline_limit = inline_limit
+        self._minified = {}
+        self._templates = {}
+        self._linked = {}
+    
+    def minify(self, source):
+        """Return the minified text of a stylesheet, computing it once per source hash."""
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        minified = self._minified.get(digest)
+        if minified is None:
+            minified = self._minified[digest] = minify_css(source)
+        return minified
+    
+    def stylesheet(self, key):
+        """Return the Stylesheet for an output path, or None if static_dir has no such file."""
+        path = os.path.join(self.static_dir, *key.split("/"))
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'r') as f:
+            return Stylesheet(key, self.minify(f.read()))
+    
+    def stylesheets(self):
+        """Return a Stylesheet for every .css file under static_dir, sorted by path."""
+        if not os.path.isdir(self.static_dir):
+            return []
+        keys = [as_output_key(path) for path in walk_files(self.static_dir) if path.endswith(".css")]
+        return [self.stylesheet(key) for key in keys]
+    
+    def _rewrite_link(self, match):
+        tag = match.group()
+        href = HREF_PATTERN.search(tag)
+        if not STYLESHEET_PATTERN.search(tag) or href is None or not href.group(1).startswith("/"):
+            return tag
+        sheet = self.stylesheet(href.group(1)[1:])
+        if sheet is None:
+            return tag
+        # A stylesheet that could close the element early is never inlined
+        if len(sheet.minified.encode("utf-8")) <= self.inline_limit and "</style" not in sheet.minified.lower():
+            return f"<style>{sheet.minified}</style>"
+        self._linked[sheet.key] = sheet
+        return tag[:href.start(1)] + "/" + sheet.hashed_key + tag[href.end(1):]
+    
+    def apply(self, template_content):
+        """Return the template with its stylesheet links inlined or content-hashed."""
+        processed = self._templates.get(template_content)
+        if processed is None:
+            processed = LINK_TAG_PATTERN.sub(self._rewrite_link, template_content)
+            self._templates[template_content] = processed
+        return processed
+    
+    def outputs(self):
+        """
+        Return the stylesheet files of the build.
+        
+        Every static stylesheet is replaced by its minified text, and each one
+        a processed template still links to is also written at its hashed path.
+        
+        Returns:
+            A dict mapping output paths to bytes
+        """
+        output = {}
+        for sheet in self.stylesheets():
+            output[sheet.key] = sheet.minified.encode("utf-8")
+        for sheet in self._linked.values():
+            output[sheet.hashed_key] = sheet.minified.encode("utf-8")
+        return output
+    
+    def write(self, dest_dir, shard=None):
+        """
+        Write outputs() into dest_dir, overwriting the copied stylesheets.
+        
+        Args:
+            dest_dir: Output directory the static files were copied to
+            shard: Optional (index, count) shard; only files assigned to it are written
+        
+        Returns:
+            A dict mapping the output paths written to their bytes
+        """
+        written = {}
+        for key, data in self.outputs().items():
+            if not in_shard(key, shard):
+                continue
+            written[key] = data
+            path = os.path.join(dest_dir, *key.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+        logging.info(f"Minified {len(self._minified)} stylesheets, {len(self._linked)} linked by hash")
+        return written
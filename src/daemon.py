@@ -0,0 +1,286 @@
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import hashlib
+import logging
+import argparse
+import threading
+import socketserver
+from builder import Template, as_output_key, output_path, parse_page
+from inlinecache import BlockCache, InlineCache
+from inventory import Inventory
+from limits import DEFAULT_LIMITS
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOCKET = os.path.join(PROJECT_ROOT, ".ssg-daemon.sock")
+
+class BuildState:
+    """
+    Everything a long-lived build process keeps warm between requests.
+    
+    Holds the compiled template, the parsed (title, body, summary) of every page keyed
+    by its mtime and size, the inline and block caches, and for each output directory
+    what was last written there and which subdirectories exist. A build re-parses only pages whose source
+    changed, re-renders only the blocks of those pages that changed,
+    rewrites only pages whose bytes changed and copies only static
+    files whose stat data changed. Pages are parsed with the fused renderer,
+    whose output is identical to the node-tree path.
+    
+    Args:
+        content_dir: Directory containing the markdown pages
+        template_path: Path to the HTML template file
+        static_dir: Optional directory of static files copied as-is
+        limits: DocumentLimits applied to each page (None disables them)
+    """
+    def __init__(self, content_dir, template_path, static_dir=None, limits=DEFAULT_LIMITS):
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.static_dir = static_dir
+        self.limits = limits
+        self.inline_cache = InlineCache()
+        self.block_cache = BlockCache()
+        self._template = None
+        self._template_stamp = None
+        self._parsed = {}
+        self._written = {}
+        # dest_dir -> output directories created under it
+        self._dirs = {}
+        self.builds = 0
+    
+    def template(self):
+        """Return the compiled template, recompiling it only when the file changed."""
+        stat = os.stat(self.template_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._template_stamp:
+            with open(self.template_path, 'r') as f:
+                self._template = Template(f.read())
+            self._template_stamp = stamp
+        return self._template
+    
+    def parsed_page(self, path, stamp):
+        """Return the (title, body, summary) of a page, parsing it only if its stamp changed."""
+        entry = self._parsed.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1], False
+        with open(os.path.join(self.content_dir, *path.split("/")), 'r') as f:
+            parsed = parse_page(f.read(), self.limits, fast=True, inline_cache=self.inline_cache,
+                                block_cache=self.block_cache)
+        self._parsed[path] = (stamp, parsed)
+        return parsed, True
+    
+    def render(self, path, basepath="/"):
+        """Render one page, given relative to content_dir, and return its HTML."""
+        stamp = os.stat(os.path.join(self.content_dir, *path.split("/")))
+        title, html_content, summary = self.parsed_page(path, (stamp.st_mtime_ns, stamp.st_size))[0]
+        return self.template().render(title, html_content, basepath, summary)
+    
+    def build(self, dest_dir, basepath="/"):
+        """
+        Incrementally build the site into dest_dir.
+        
+        Returns:
+            A dict of counts: pages, parsed, written, removed and seconds
+        """
+        start = time.perf_counter()
+        template = self.template()
+        # Output path -> page hash or static file (mtime, size), as last
+        # written. Kept per dest_dir whatever the basepath: the page hashes
+        # cover the rendered links, so a basepath change rewrites every page.
+        written = self._written.setdefault(dest_dir, {})
+        produced = set()
+        parsed_count = 0
+        write_count = 0
+        
+        # One scan of both trees; output directories are created up front,
+        # only those not created by an earlier build
+        inventory = Inventory(self.static_dir, self.content_dir)
+        made = self._dirs.get(dest_dir)
+        if made is None or not os.path.isdir(dest_dir):
+            os.makedirs(dest_dir, exist_ok=True)
+            made = self._dirs[dest_dir] = set()
+        for directory in inventory.dest_dirs():
+            if directory not in made:
+                os.makedirs(os.path.join(dest_dir, *directory.split("/")), exist_ok=True)
+                made.add(directory)
+        
+        # Static files are copied only when their stat data changed
+        if self.static_dir is not None:
+            for path, stamp in inventory.static.items():
+                produced.add(path)
+                dest_path = os.path.join(dest_dir, *path.split("/"))
+                if written.get(path) == stamp and os.path.exists(dest_path):
+                    continue
+                shutil.copy2(os.path.join(self.static_dir, *path.split("/")), dest_path)
+                written[path] = stamp
+                write_count += 1
+        
+        # Pages are re-parsed only when their source changed and rewritten
+        # only when the rendered bytes changed
+        pages = {path: stamp for path, stamp in inventory.content.items() if path.endswith(".md")}
+        for path, stamp in pages.items():
+            try:
+                (title, html_content, summary), parsed = self.parsed_page(path, stamp)
+            except Exception as e:
+                logging.error(f"Error converting {path} to HTML: {e}")
+                continue
+            parsed_count += parsed
+            key = as_output_key(output_path(path))
+            produced.add(key)
+            data = template.render(title, html_content, basepath, summary).encode("utf-8")
+            digest = hashlib.sha256(data).digest()
+            dest_path = os.path.join(dest_dir, *key.split("/"))
+            if written.get(key) == digest and os.path.exists(dest_path):
+                continue
+            with open(dest_path, 'wb') as f:
+                f.write(data)
+            written[key] = digest
+            write_count += 1
+        
+        # Drop parsed pages whose source is gone
+        for path in list(self._parsed):
+            if path not in pages:
+                del self._parsed[path]
+        
+        removed = [key for key in written if key not in produced]
+        for key in removed:
+            try:
+                os.remove(os.path.join(dest_dir, *key.split("/")))
+            except FileNotFoundError:
+                pass
+            del written[key]
+        
+        self.builds += 1
+        return {
+            "pages": len(pages),
+            "parsed": parsed_count,
+            "written": write_count,
+            "removed": len(removed),
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+    
+    def stats(self):
+        return {
+            "builds": self.builds,
+            "parsed_pages": len(self._parsed),
+            "inline_cache": self.inline_cache.stats(),
+            "block_cache": self.block_cache.stats(),
+        }
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """Handles one JSON request per line, answering with one JSON line each."""
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = self.server.dispatch(request)
+            except Exception as e:
+                logging.error(f"Request failed: {e}")
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+class BuildDaemon(socketserver.UnixStreamServer):
+    """
+    Unix socket server answering build and render requests from a warm BuildState.
+    
+    Requests are handled one at a time, so builds never overlap.
+    
+    Requests:
+        {"command": "build", "dest": DIR, "basepath": "/"}
+        {"command": "render", "path": "blog/tom/index.md", "basepath": "/"}
+        {"command": "stats"}
+        {"command": "shutdown"}
+    """
+    def __init__(self, socket_path, state):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, DaemonRequestHandler)
+        self.socket_path = socket_path
+        self.state = state
+    
+    def dispatch(self, request):
+        command = request.get("command")
+        basepath = request.get("basepath", "/")
+        if command == "build":
+            return {"ok": True, **self.state.build(request["dest"], basepath)}
+        if command == "render":
+            return {"ok": True, "html": self.state.render(request["path"], basepath)}
+        if command == "stats":
+            return {"ok": True, **self.state.stats()}
+        if command == "shutdown":
+            # shutdown() waits for serve_forever, so it must not run on this thread
+            threading.Thread(target=self.shutdown).start()
+            return {"ok": True}
+        raise ValueError(f"Unknown command: {command}")
+    
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+def send_request(request, socket_path=DEFAULT_SOCKET):
+    """Send one request to a running daemon and return its decoded response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile('rb') as f:
+            return json.loads(f.readline())
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description="Persistent build daemon and its client")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("serve", help="Run the daemon in the foreground")
+    build = commands.add_parser("build", help="Ask the daemon to build the site")
+    build.add_argument("--dest", default=os.path.join(PROJECT_ROOT, "docs"))
+    build.add_argument("--basepath", default="/")
+    render = commands.add_parser("render", help="Ask the daemon to render one page to stdout")
+    render.add_argument("path", help="Markdown path relative to content/")
+    render.add_argument("--basepath", default="/")
+    commands.add_parser("stats", help="Show the daemon's cache statistics")
+    commands.add_parser("stop", help="Stop the daemon")
+    args = parser.parse_args(argv)
+    
+    if args.command == "serve":
+        state = BuildState(
+            os.path.join(PROJECT_ROOT, "content"),
+            os.path.join(PROJECT_ROOT, "template.html"),
+            os.path.join(PROJECT_ROOT, "static"),
+        )
+        server = BuildDaemon(args.socket, state)
+        logging.info(f"Build daemon listening on {args.socket}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+    
+    if args.command == "build":
+        request = {"command": "build", "dest": os.path.abspath(args.dest), "basepath": args.basepath}
+    elif args.command == "render":
+        request = {"command": "render", "path": args.path, "basepath": args.basepath}
+    elif args.command == "stats":
+        request = {"command": "stats"}
+    else:
+        request = {"command": "shutdown"}
+    
+    response = send_request(request, args.socket)
+    if not response.get("ok"):
+        print(response.get("error"), file=sys.stderr)
+        sys.exit(1)
+    if args.command == "render":
+        sys.stdout.write(response["html"])
+    else:
+        print(json.dumps(response, indent=2))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,86 @@
+import os
+import sys
+import shutil
+import logging
+import argparse
+from manifest import MANIFEST_NAME, read_manifest, diff_manifests
+
+def copy_atomic(source_path, dest_path):
+    """Copy a file so readers of dest_path never see it half written."""
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    temp_path = dest_path + ".deploy-tmp"
+    shutil.copy2(source_path, temp_path)
+    os.replace(temp_path, dest_path)
+
+def remove_empty_dirs(root, path):
+    """Remove path's parent directories below root while they are empty."""
+    directory = os.path.dirname(path)
+    while directory != root and directory.startswith(root):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
+
+def deploy(source_dir, dest_dir):
+    """
+    Bring dest_dir up to date with a build by applying only what changed.
+    
+    The manifest already deployed in dest_dir is compared with the build's
+    manifest, so only the manifests are read in full. Added and modified
+    files are copied first, removals are applied afterwards so pages never
+    link to a file that is already gone, and the new manifest is written last.
+    
+    Args:
+        source_dir: Build output directory containing a manifest
+        dest_dir: Deployment directory
+        
+    Returns:
+        The ManifestDiff that was applied
+        
+    Raises:
+        FileNotFoundError: If source_dir has no manifest
+    """
+    source_root = os.path.abspath(source_dir)
+    dest_root = os.path.abspath(dest_dir)
+    new = read_manifest(os.path.join(source_root, MANIFEST_NAME))
+    if not new:
+        raise FileNotFoundError(f"No manifest in build output: {source_root}")
+    old = read_manifest(os.path.join(dest_root, MANIFEST_NAME))
+    diff = diff_manifests(old, new)
+    
+    for key in diff.added + diff.modified:
+        logging.info(f"Deploying {key}")
+        copy_atomic(os.path.join(source_root, *key.split("/")), os.path.join(dest_root, *key.split("/")))
+    
+    for key in diff.removed:
+        path = os.path.join(dest_root, *key.split("/"))
+        logging.info(f"Removing {key}")
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        remove_empty_dirs(dest_root, path)
+    
+    copy_atomic(os.path.join(source_root, MANIFEST_NAME), os.path.join(dest_root, MANIFEST_NAME))
+    logging.info(
+        f"Deployed {len(diff.added)} added, {len(diff.modified)} modified, "
+        f"{len(diff.removed)} removed files to {dest_root}"
+    )
+    return diff
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Apply the changes of the last build to a deployment directory")
+    parser.add_argument("--to", required=True, metavar="DIR", help="Deployment directory")
+    parser.add_argument("--from", dest="source", default=os.path.join(project_root, "docs"),
+                        metavar="DIR", help="Build output directory (default: docs/)")
+    args = parser.parse_args(argv)
+    deploy(args.source, args.to)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,296 @@
+from htmlnode import escape_text, escape_attribute
+from utils import (
+  IMAGE_PATTERN,
+  LINK_PATTERN,
+  IMAGE_REFERENCE_PATTERN,
+  LINK_REFERENCE_PATTERN,
+  find_references,
+  default_registry,
+  markdown_to_blocks,
+  extract_title_level,
+  extract_code_content,
+  flat_list_items,
+  scan_list,
+  scan_quote,
+  TEXT,
+  OPEN,
+  paragraph_to_html_node,
+  heading_to_html_node,
+  code_to_html_node,
+  quote_to_html_node,
+  unordered_list_to_html_node,
+  ordered_list_to_html_node,
+  text_to_children,
+  cached_text_to_children,
+  extract_reference_definitions,
+  depends_on_references,
+  resolving_references,
+  add_heading_anchor,
+  DocumentSummary,
+  block_entry,
+  is_cacheable,
+  splice_block,
+)
+from blocktype import BlockType
+
+# Direct renderers for the fused path. Each one produces exactly the HTML the
+# matching node-tree renderer would serialize to, without building the
+# LeafNode and ParentNode objects in between.
+
+# Inline delimiters in the order text_to_textnodes applies them, with the
+# tags they render to
+DELIMITERS = (("**", "b"), ("_", "i"), ("`", "code"))
+
+def split_delimiter(segments, delimiter, tag):
+  """Split the plain segments of (tag or None, text) pairs at a delimiter, as split_nodes_delimiter does."""
+  result = []
+  for segment in segments:
+    if segment[0] is not None or delimiter not in segment[1]:
+      result.append(segment)
+      continue
+    splits = segment[1].split(delimiter)
+    # Text between complete pairs gets the tag; an unpaired last delimiter
+    # leaves the text after it plain
+    last = len(splits) - 1
+    for i, part in enumerate(splits):
+      if part:
+        result.append((tag if i % 2 == 1 and i < last else None, part))
+  return result
+
+def render_links(text, references, parts, plain, links):
+  """Render plain text with its links, as split_nodes_link and the node serializer would."""
+  if "[" not in text:
+    parts.append(escape_text(text))
+    plain.append(text)
+    return
+  if references:
+    matches = find_references(text, LINK_REFERENCE_PATTERN, references)
+  else:
+    matches = ((match, match.group(2)) for match in LINK_PATTERN.finditer(text))
+  position = 0
+  for match, url in matches:
+    if match.start() > position:
+      parts.append(escape_text(text[position:match.start()]))
+      plain.append(text[position:match.start()])
+    label = match.group(1)
+    parts.append(f'<a href="{escape_attribute(url)}">{escape_text(label)}</a>')
+    plain.append(label)
+    links.append((label, url))
+    position = match.end()
+  parts.append(escape_text(text[position:]))
+  plain.append(text[position:])
+
+def render_inline(text, references=None):
+  """Render inline markdown to HTML and collect what a DocumentSummary needs.
+  
+  The delimiters split the text into (tag, text) pairs, and the plain
+  pairs are rendered with their images and links straight from the
+  pattern matches, so no TextNode or LeafNode is built. The tokens and
+  HTML are the same as text_to_textnodes and the node serializer give.
+  
+  Args:
+    text: The inline markdown text
+    references: Optional dict of the document's reference definitions
+  
+  Returns:
+    A tuple of (html, plain text, links tuple, images tuple); tuples so the
+    whole result can be shared through an InlineCache
+  """
+  # Fast path: without any delimiter or bracket the tokenizer would return
+  # the whole string as a single text token
+  if "**" not in text and "_" not in text and "`" not in text and "[" not in text:
+    return escape_text(text), text, (), ()
+  
+  segments = [(None, text)]
+  for delimiter, tag in DELIMITERS:
+    if delimiter in text:
+      segments = split_delimiter(segments, delimiter, tag)
+  
+  parts = []
+  plain = []
+  links = []
+  images = []
+  for tag, value in segments:
+    if tag is not None:
+      parts.append(f"<{tag}>{escape_text(value)}</{tag}>")
+      plain.append(value)
+      continue
+    if "![" not in value:
+      render_links(value, references, parts, plain, links)
+      continue
+    if references:
+      matches = find_references(value, IMAGE_REFERENCE_PATTERN, references)
+    else:
+      matches = ((match, match.group(2)) for match in IMAGE_PATTERN.finditer(value))
+    position = 0
+    for match, url in matches:
+      if match.start() > position:
+        render_links(value[position:match.start()], references, parts, plain, links)
+      alt = match.group(1)
+      parts.append(f'<img src="{escape_attribute(url)}" alt="{escape_attribute(alt)}"></img>')
+      images.append((alt, url))
+      position = match.end()
+    if position < len(value):
+      render_links(value[position:], references, parts, plain, links)
+  return "".join(parts), "".join(plain), tuple(links), tuple(images)
+
+def inline_to_html(text):
+  """Render inline markdown straight to an HTML string."""
+  return render_inline(text)[0]
+
+# Block renderers take the inline renderer to use, so a cached one can be
+# passed in, mirroring the node-tree renderers
+
+def paragraph_to_html(block, inline):
+  text = block.replace("\n", " ")
+  return f"<p>{inline(text)}</p>"
+
+def code_to_html(block, inline):
+  return f"<pre><code>{escape_text(extract_code_content(block))}</code></pre>"
+
+def events_to_html(events, inline):
+  """Render scan_list or scan_quote events in one pass, like utils.events_to_node."""
+  parts = []
+  for kind, value in events:
+    if kind == TEXT:
+      parts.append(inline(value))
+    elif kind == OPEN:
+      parts.append(f"<{value}>")
+    else:
+      parts.append(f"</{value}>")
+  return "".join(parts)
+
+def quote_to_html(block, inline):
+  return events_to_html(scan_quote(block), inline)
+
+def list_to_html(block, inline):
+  flat = flat_list_items(block)
+  if flat is None:
+    return events_to_html(scan_list(block), inline)
+  tag, items = flat
+  return f"<{tag}>" + "".join(f"<li>{inline(item)}</li>" for item in items) + f"</{tag}>"
+
+# Keyed by the node-tree renderer each direct renderer stands in for, so a
+# registry that swaps in its own renderer for a block type falls back to the
+# tree path for that type automatically
+FUSED_RENDERERS = {
+  paragraph_to_html_node: paragraph_to_html,
+  code_to_html_node: code_to_html,
+  quote_to_html_node: quote_to_html,
+  unordered_list_to_html_node: list_to_html,
+  ordered_list_to_html_node: list_to_html,
+}
+
+def block_html_entry(block, renderer, render, render_nodes):
+  """Render a block into a BlockCache entry, directly where a fused renderer exists.
+  
+  The entry is identical to the one utils.block_entry builds from the node tree.
+  """
+  if renderer is heading_to_html_node:
+    level, content = extract_title_level(block)
+    html, plain, links, images = render(content)
+    return html, len(plain.split()), links, images, (level, plain, content)
+  fused = FUSED_RENDERERS.get(renderer)
+  if fused is None:
+    return block_entry(block, renderer, render_nodes)
+  summary = DocumentSummary()
+  
+  def inline_html(text):
+    html, plain, links, images = render(text)
+    summary.add_inline(plain, links, images)
+    return html
+  
+  html = fused(block, inline_html)
+  return html, summary.word_count, tuple(summary.links), tuple(summary.images), None
+
+def markdown_to_html_with_summary(markdown, limits=None, registry=None, inline_cache=None, block_cache=None):
+  """Convert a markdown string directly to an HTML string and summarize it.
+  
+  The fused counterpart of parse_document: the HTML is byte-identical to
+  parse_document(markdown)[0].to_html() and the summary is the same.
+  Core block types are rendered straight from their block and inline tokens;
+  block types without a direct renderer (such as extensions) are rendered
+  through their node-tree renderer.
+  
+  Args:
+    markdown: A string containing markdown text
+    limits: Optional DocumentLimits guarding the size and conversion time
+    registry: BlockRegistry used to detect and render blocks (default: default_registry)
+    inline_cache: Optional InlineCache memoizing inline HTML across documents
+    block_cache: Optional BlockCache of rendered blocks; only blocks missing
+      from it are parsed and rendered
+    
+  Returns:
+    A tuple of (HTML for the document wrapped in a div, DocumentSummary)
+    
+  Raises:
+    DocumentLimitError: If the document exceeds one of the given limits
+  """
+  deadline = None
+  if limits is not None:
+    limits.check_size(markdown)
+    deadline = limits.deadline()
+  
+  if registry is None:
+    registry = default_registry
+  if inline_cache is None:
+    render = render_inline
+    render_nodes = text_to_children
+  else:
+    def render(text):
+      return inline_cache.lookup("html", text, render_inline)
+    render_nodes = cached_text_to_children(inline_cache)
+  references, blocks = extract_reference_definitions(markdown_to_blocks(markdown))
+  if references:
+    render = resolving_references(render, render_inline, references)
+    render_nodes = resolving_references(render_nodes, text_to_children, references)
+  summary = DocumentSummary()
+  
+  def inline_html(text):
+    html, plain, links, images = render(text)
+    summary.add_inline(plain, links, images)
+    return html
+  
+  parts = ["<div>"]
+  for block in blocks:
+    if deadline is not None:
+      limits.check_time(deadline)
+    
+    block_type = registry.detect(block)
+    renderer = registry.renderer(block_type)
+    if (block_cache is not None and is_cacheable(block_type, renderer)
+        and not depends_on_references(block, references)):
+      entry = block_cache.lookup(
+        block_type, block, lambda block: block_html_entry(block, renderer, render, render_nodes),
+      )
+      parts.append(splice_block(entry, summary))
+      continue
+    
+    # Headings need their plain text for the anchor, so they are rendered here
+    if renderer is heading_to_html_node:
+      level, content = extract_title_level(block)
+      html, plain, links, images = render(content)
+      summary.add_inline(plain, links, images)
+      anchor = summary.add_heading(level, plain, content)
+      parts.append(f'<h{level} id="{escape_attribute(anchor)}">{html}</h{level}>')
+      continue
+    
+    fused = FUSED_RENDERERS.get(renderer)
+    if fused is not None:
+      parts.append(fused(block, inline_html))
+    else:
+      node = renderer(block, render_nodes)
+      summary.add_block(node)
+      if block_type == BlockType.HEADING:
+        add_heading_anchor(node, block, summary)
+      parts.append(node.to_html())
+  parts.append("</div>")
+  return "".join(parts), summary
+
+def markdown_to_html(markdown, limits=None, registry=None, inline_cache=None, block_cache=None):
+  """Convert a markdown string directly to an HTML string.
+  
+  The output is byte-identical to markdown_to_html_node(markdown).to_html();
+  see markdown_to_html_with_summary for the arguments.
+  """
+  return markdown_to_html_with_summary(markdown, limits, registry, inline_cache, block_cache)[0]
@@ -0,0 +1,7 @@
+import os
+
+def write_file(path, content):
+    """Write text or bytes to a file for a test, creating its parent directories."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb' if isinstance(content, bytes) else 'w') as f:
+        f.write(content)
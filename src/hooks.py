@@ -0,0 +1,130 @@
+import time
+import importlib
+
+# Hook points, in the order a page passes through them
+PRE_READ = "pre-read"
+POST_PARSE = "post-parse"
+POST_RENDER = "post-render"
+PRE_WRITE = "pre-write"
+POST_BUILD = "post-build"
+HOOK_POINTS = (PRE_READ, POST_PARSE, POST_RENDER, PRE_WRITE, POST_BUILD)
+
+class Page:
+    """
+    What a hook knows about the page being built.
+    
+    Attributes:
+        source_path: Path of the markdown file
+        dest_path: Path the HTML page is written to
+        summary: The page's DocumentSummary once it has been parsed, else None
+    """
+    def __init__(self, source_path, dest_path):
+        self.source_path = source_path
+        self.dest_path = dest_path
+        self.summary = None
+
+class HookRegistry:
+    """
+    Plugins register callables at named hook points here.
+    
+    Every hook is called as hook(value, page) and returns the value passed
+    on to the next hook at that point:
+    
+        pre-read: the markdown path to read
+        post-parse: the page's node tree
+        post-render: the page body HTML, before the template is applied
+        pre-write: the final page HTML
+        post-build: the output directory, with page None; the result is ignored
+    
+    The registry is bound once with bind() before the build starts.
+    """
+    def __init__(self):
+        self._hooks = {point: [] for point in HOOK_POINTS}
+        # (point, hook name) -> [calls, seconds]
+        self.timings = {}
+    
+    def register(self, point, hook, name=None):
+        """
+        Subscribe a hook to a hook point.
+        
+        Args:
+            point: One of HOOK_POINTS
+            hook: Callable taking (value, page) and returning the new value
+            name: Name shown in the timing report (default: the hook's qualified
+                name); a name already used at the point gets a "#2", "#3"... suffix
+        
+        Raises:
+            ValueError: If point is not a known hook point
+        """
+        if point not in self._hooks:
+            raise ValueError(f"Unknown hook point: {point}")
+        if name is None:
+            name = f"{hook.__module__}.{hook.__qualname__}"
+        # Two lambdas, or one function registered twice, keep separate timings
+        unique = name
+        suffix = 1
+        while (point, unique) in self.timings:
+            suffix += 1
+            unique = f"{name}#{suffix}"
+        name = unique
+        self._hooks[point].append((name, hook))
+        self.timings[(point, name)] = [0, 0.0]
+    
+    def _chain(self, point):
+        hooks = [(name, hook, self.timings[(point, name)]) for name, hook in self._hooks[point]]
+        if not hooks:
+            return None
+        
+        def run(value, page=None):
+            for name, hook, timing in hooks:
+                start = time.perf_counter()
+                value = hook(value, page)
+                timing[0] += 1
+                timing[1] += time.perf_counter() - start
+            return value
+        return run
+    
+    def bind(self):
+        """Return BoundHooks for the hooks registered so far."""
+        return BoundHooks(self)
+    
+    def report(self):
+        """Return one line per hook with its calls and total time, slowest first."""
+        rows = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            f"hook {point} {name}: {calls} calls, {seconds * 1000:.1f} ms"
+            for (point, name), (calls, seconds) in rows
+        ]
+
+class BoundHooks:
+    """
+    The hooks of a registry bound once for a build.
+    
+    Each hook point is an attribute (pre_read, post_parse, post_render,
+    pre_write, post_build) holding a callable that runs its hooks in order,
+    or None when nothing subscribed, so an unused point costs a single
+    attribute check per page.
+    """
+    def __init__(self, registry=None):
+        for point in HOOK_POINTS:
+            chain = registry._chain(point) if registry is not None else None
+            setattr(self, point.replace("-", "_"), chain)
+
+# Bound hooks with no subscribers, used when no plugins are loaded
+NO_HOOKS = BoundHooks()
+
+def load_plugins(module_names, registry=None):
+    """
+    Import plugin modules and let each register its hooks.
+    
+    A plugin is a module with a register(hooks) function, called with the
+    HookRegistry, in the same way tables.register extends a BlockRegistry.
+    
+    Returns:
+        The HookRegistry the plugins registered with
+    """
+    if registry is None:
+        registry = HookRegistry()
+    for module_name in module_names:
+        importlib.import_module(module_name).register(registry)
+    return registry
@@ -0,0 +1,131 @@
+import re
+
+# Comments (kept if conditional), tags and the text between them
+HTML_TOKEN_PATTERN = re.compile(r"<!--.*?-->|<![^>]*>|</?[A-Za-z][^>]*>|[^<]+|<", re.DOTALL)
+TAG_PATTERN = re.compile(r"<(/?)([A-Za-z][A-Za-z0-9-]*)(.*?)(/?)>$", re.DOTALL)
+ATTRIBUTE_PATTERN = re.compile(r"""([^\s=/>]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s>]+))?""")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# Attribute values that need no quotes
+UNQUOTED_VALUE_PATTERN = re.compile(r"[A-Za-z0-9._:-]+")
+
+# Elements whose content is kept byte for byte
+PRESERVED_ELEMENTS = frozenset(("pre", "code", "textarea", "script", "style"))
+# Elements that whitespace next to can never render as a space
+BLOCK_ELEMENTS = frozenset("""
+    html head body title meta link base script style noscript template
+    article aside blockquote details dialog div dl dd dt fieldset figcaption figure footer form
+    h1 h2 h3 h4 h5 h6 header hgroup hr li main nav ol p pre section summary table tbody td tfoot
+    th thead tr ul br option select
+""".split())
+# Attributes rewritten by apply_basepath and the css stage, which look for
+# their double quotes
+QUOTED_ATTRIBUTES = frozenset(("href", "src"))
+
+def minify_tag(name, closing, attributes):
+    """Rebuild a tag with single spaces between attributes and quotes only where needed."""
+    if closing:
+        return f"</{name}>"
+    parts = [f"<{name}"]
+    for match in ATTRIBUTE_PATTERN.finditer(attributes):
+        key, value = match.groups()
+        if value is None:
+            parts.append(f" {key}")
+            continue
+        if value[0] in "\"'":
+            value = value[1:-1]
+        if key.lower() not in QUOTED_ATTRIBUTES and UNQUOTED_VALUE_PATTERN.fullmatch(value):
+            parts.append(f" {key}={value}")
+        elif '"' in value:
+            parts.append(f" {key}='{value}'")
+        else:
+            parts.append(f' {key}="{value}"')
+    # No self-closing slash: void elements need none, and an unquoted value
+    # would swallow it
+    parts.append(">")
+    return "".join(parts)
+
+def minify_html(html):
+    """
+    Minify HTML by collapsing whitespace, dropping comments and optional quotes.
+    
+    Runs of whitespace become one space, and whitespace next to a block-level
+    tag is removed since it never renders. The content of pre, code, textarea,
+    script and style elements is left exactly as it is. Conditional comments
+    are kept. Template placeholders such as {{ Title }} are ordinary text and
+    come through unchanged.
+    
+    Example:
+        minify_html('<ul>\\n  <li class="a">x  y</li>\\n</ul>') # "<ul><li class=a>x y</li></ul>"
+    """
+    tokens = HTML_TOKEN_PATTERN.findall(html)
+    parts = []
+    # Whether the last token written was a block-level tag, or the start
+    previous_block = True
+    preserved = None
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if preserved is not None:
+            # Inside a preserved element, only its own closing tag ends it
+            match = TAG_PATTERN.match(token) if token.startswith("</") else None
+            if match is None or match.group(2).lower() != preserved:
+                parts.append(token)
+                continue
+            preserved = None
+            parts.append(f"</{match.group(2)}>")
+            previous_block = match.group(2).lower() in BLOCK_ELEMENTS
+            continue
+        
+        if token.startswith("<!--"):
+            if token.startswith("<!--[if"):
+                parts.append(token)
+            continue
+        if token.startswith("<!"):
+            parts.append(WHITESPACE_PATTERN.sub(" ", token))
+            previous_block = True
+            continue
+        match = TAG_PATTERN.match(token) if token.startswith("<") and len(token) > 1 else None
+        if match is not None:
+            closing, name, attributes, self_closing = match.groups()
+            lower = name.lower()
+            parts.append(minify_tag(name, closing, attributes))
+            previous_block = lower in BLOCK_ELEMENTS
+            if not closing and not self_closing and lower in PRESERVED_ELEMENTS:
+                preserved = lower
+            continue
+        
+        # Text: collapse whitespace, trimming it next to block-level tags
+        text = WHITESPACE_PATTERN.sub(" ", token)
+        # A space already written before a dropped comment is not repeated
+        if previous_block or (parts and parts[-1].endswith(" ")):
+            text = text.lstrip(" ")
+        next_match = None
+        if i < len(tokens) and tokens[i].startswith("<"):
+            next_match = TAG_PATTERN.match(tokens[i])
+        if next_match is not None and next_match.group(2).lower() in BLOCK_ELEMENTS:
+            text = text.rstrip(" ")
+        if text:
+            parts.append(text)
+            previous_block = False
+    return "".join(parts)
+
+class HtmlMinifier:
+    """
+    Minifies page templates once, when they are compiled.
+    
+    The rendered page body needs no pass of its own: the serializer already
+    writes it without whitespace or comments between tags, so minifying the
+    template text once per template covers the whole page. Each template is
+    minified once, cached by its text, so pages sharing a template pay only a
+    dictionary lookup.
+    """
+    def __init__(self):
+        self._templates = {}
+    
+    def apply(self, template_content):
+        """Return the minified template."""
+        minified = self._templates.get(template_content)
+        if minified is None:
+            minified = self._templates[template_content] = minify_html(template_content)
+        return minified
@@ -1,3 +1,23 @@
+# Translation tables for str.translate, built once at import. Text content
+# only needs &, < and > escaped; attribute values are always double-quoted,
+# so they also need ".
+TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+ATTRIBUTE_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+def escape_text(text):
+  """Escape a string for use as HTML text content."""
+  # Fast path: most strings have nothing to escape, and these membership
+  # tests are much cheaper than building a translated copy
+  if "&" not in text and "<" not in text and ">" not in text:
+    return text
+  return text.translate(TEXT_ESCAPES)
+
+def escape_attribute(value):
+  """Escape a string for use inside a double-quoted HTML attribute."""
+  if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+    return value
+  return value.translate(ATTRIBUTE_ESCAPES)
+
 class HTMLNode:
   def __init__(self, tag=None, value=None, children=None, props=None):
     self.tag = tag
@@ -9,10 +29,7 @@ class HTMLNode:
     raise NotImplementedError
 
   def props_to_html(self):
-    props_html = ""
-    for key, value in self.props.items():
-      props_html += f' {key}="{value}"'
-    return props_html
+    return "".join(f' {key}="{escape_attribute(str(value))}"' for key, value in self.props.items())
 
   def __repr__(self):
     return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
@@ -31,15 +48,26 @@ class LeafNode(HTMLNode):
       props_html = self.props_to_html()
       
     if self.tag is None:
-      return self.value
+      return escape_text(self.value)
     
-    return f"<{self.tag}{props_html}>{self.value}</{self.tag}>"
+    return f"<{self.tag}{props_html}>{escape_text(self.value)}</{self.tag}>"
+
+class RawNode(HTMLNode):
+  """A node whose value is trusted HTML and is emitted without escaping."""
+  def __init__(self, value):
+    super().__init__(None, value, None, None)
+    
+  def to_html(self):
+    if self.value is None:
+      raise ValueError("RawNode must have a value")
+    return self.value
 
 class ParentNode(HTMLNode):
   def __init__(self, tag, children, props=None):
     super().__init__(tag, None, children, props)
     
-  def to_html(self):
+  def open_tag(self):
+    """Check the node and return its opening tag."""
     if self.props is None:
       props_html = ""
     else:
@@ -50,6 +78,25 @@ class ParentNode(HTMLNode):
 
     if self.children is None:
       raise ValueError("ParentNode must have children")
-      
-    children_html = "".join(child.to_html() for child in self.children)
-    return f"<{self.tag}{props_html}>{children_html}</{self.tag}>"
+    
+    return f"<{self.tag}{props_html}>"
+  
+  def to_html(self):
+    # Nested ParentNodes are serialized with an explicit stack instead of
+    # recursion, so deeply nested lists and quotes cannot hit the recursion
+    # limit. Other nodes, ParentNode subclasses included, serialize themselves.
+    parts = [self.open_tag()]
+    append = parts.append
+    stack = [(self, iter(self.children))]
+    while stack:
+      node, children = stack[-1]
+      for child in children:
+        if type(child) is ParentNode:
+          append(child.open_tag())
+          stack.append((child, iter(child.children)))
+          break
+        append(child.to_html())
+      else:
+        stack.pop()
+        append(f"</{node.tag}>")
+    return "".join(parts)
@@ -0,0 +1,182 @@
+import os
+import zlib
+import struct
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Ancillary chunks that change how the image is displayed; every other
+# ancillary chunk (text, EXIF, timestamps, physical size, Apple's iDOT
+# offsets into the old IDAT data) is dropped
+KEPT_ANCILLARY = frozenset((b"tRNS", b"gAMA", b"cHRM", b"sRGB", b"iCCP", b"sBIT"))
+# Chunks of animated PNGs, whose frame data is left alone
+ANIMATION_CHUNKS = frozenset((b"acTL", b"fcTL", b"fdAT"))
+# Deflate strategies tried on the image data; the smallest result is kept
+STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE)
+
+def read_chunks(data):
+    """
+    Split PNG bytes into (type, data) chunks.
+    
+    Raises:
+        ValueError: If data is not a well-formed PNG
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("Not a PNG file")
+    chunks = []
+    position = len(PNG_SIGNATURE)
+    while position < len(data):
+        if position + 12 > len(data):
+            raise ValueError("Truncated PNG chunk")
+        length, chunk_type = struct.unpack(">I4s", data[position:position + 8])
+        end = position + 12 + length
+        if end > len(data):
+            raise ValueError("Truncated PNG chunk")
+        chunks.append((chunk_type, data[position + 8:end - 4]))
+        position = end
+        if chunk_type == b"IEND":
+            break
+    if not chunks or chunks[0][0] != b"IHDR" or chunks[-1][0] != b"IEND":
+        raise ValueError("PNG must start with IHDR and end with IEND")
+    return chunks
+
+def write_chunk(chunk_type, data):
+    """Serialize one PNG chunk with its length and CRC."""
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type)))
+
+def deflate(raw):
+    """Compress image data at the maximum level with every strategy, returning the smallest stream."""
+    best = None
+    for strategy in STRATEGIES:
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+        stream = compressor.compress(raw) + compressor.flush()
+        if best is None or len(stream) < len(best):
+            best = stream
+    return best
+
+def optimize_png(data):
+    """
+    Losslessly recompress a PNG.
+    
+    Ancillary chunks that do not affect display are stripped, and the
+    image data is inflated and deflated again at the maximum level with the
+    best of several zlib strategies. The scanlines and their row filters are
+    kept as they are, so the decoded pixels are identical.
+    
+    Args:
+        data: The PNG file's bytes
+    
+    Returns:
+        The smaller of the recompressed PNG and data itself; data unchanged
+        if it is animated or not a well-formed PNG
+    """
+    try:
+        chunks = read_chunks(data)
+        if any(chunk_type in ANIMATION_CHUNKS for chunk_type, _ in chunks):
+            return data
+        raw = zlib.decompress(b"".join(chunk for chunk_type, chunk in chunks if chunk_type == b"IDAT"))
+    except (ValueError, zlib.error):
+        return data
+    
+    parts = [PNG_SIGNATURE]
+    for chunk_type, chunk in chunks:
+        if chunk_type == b"IDAT":
+            # All image data goes into one chunk where the first one was
+            if raw is not None:
+                parts.append(write_chunk(b"IDAT", deflate(raw)))
+                raw = None
+        elif chunk_type in KEPT_ANCILLARY or chunk_type[0] & 0x20 == 0:
+            # Bit 5 of the first byte is clear for critical chunks
+            parts.append(write_chunk(chunk_type, chunk))
+    optimized = b"".join(parts)
+    return optimized if len(optimized) < len(data) else data
+
+def optimize_file(path):
+    """Read a PNG file and return (input sha256 hex digest, optimized bytes or None if no smaller)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    optimized = optimize_png(data)
+    return hashlib.sha256(data).hexdigest(), optimized if optimized is not data else None
+
+class ImageStage:
+    """
+    Recompresses the site's PNG images once and reuses the result forever.
+    
+    Results are kept in cache_dir under the sha256 of the input image: the
+    optimized PNG, or an empty file when recompressing gave nothing smaller.
+    Only images missing from the cache are optimized, in parallel on a
+    process pool; the rest are a hash and a file lookup.
+    
+    Args:
+        static_dir: Directory of the static files
+        cache_dir: Directory keeping optimized images between builds
+        workers: Number of worker processes (default: one per CPU)
+    """
+    def __init__(self, static_dir, cache_dir, workers=None):
+        self.static_dir = static_dir
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.optimized = 0
+    
+    def _cache_path(self, digest):
+        return os.path.join(self.cache_dir, digest + ".png")
+    
+    def _hash(self, key):
+        with open(os.path.join(self.static_dir, *key.split("/")), 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    
+    def outputs(self, keys):
+        """
+        Return the optimized bytes of the given static PNGs.
+        
+        Args:
+            keys: Output paths of static files; those not ending in .png are skipped
+        
+        Returns:
+            A dict mapping output paths to optimized bytes, for the images
+            that got smaller
+        """
+        keys = [key for key in keys if key.lower().endswith(".png")]
+        digests = {key: self._hash(key) for key in keys}
+        missing = sorted({key for key in keys if not os.path.exists(self._cache_path(digests[key]))})
+        if missing:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            paths = [os.path.join(self.static_dir, *key.split("/")) for key in missing]
+            with ProcessPoolExecutor(self.workers) as executor:
+                for digest, optimized in executor.map(optimize_file, paths):
+                    # Renamed into place so an interrupted build leaves no partial entry
+                    cache_path = self._cache_path(digest)
+                    with open(cache_path + ".tmp", 'wb') as f:
+                        f.write(optimized or b"")
+                    os.replace(cache_path + ".tmp", cache_path)
+            self.optimized += len(missing)
+        
+        output = {}
+        for key in keys:
+            with open(self._cache_path(digests[key]), 'rb') as f:
+                data = f.read()
+            if data:
+                output[key] = data
+        return output
+    
+    def write(self, dest_dir, keys):
+        """
+        Overwrite the copied PNGs in dest_dir with their optimized versions.
+        
+        Args:
+            dest_dir: Output directory the static files were copied to
+            keys: Output paths of the static files that were copied
+        
+        Returns:
+            A dict mapping the output paths overwritten to their new bytes
+        """
+        saved = 0
+        output = self.outputs(keys)
+        for key, data in output.items():
+            path = os.path.join(dest_dir, *key.split("/"))
+            saved += os.path.getsize(path) - len(data)
+            with open(path, 'wb') as f:
+                f.write(data)
+        logging.info(f"Optimized {self.optimized} new images, saved {saved} bytes")
+        return output
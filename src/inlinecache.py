@@ -0,0 +1,92 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+class InlineCache:
+    """
+    Bounded, content-keyed memo cache for inline markdown rendering.
+    
+    Entries are keyed by the renderer kind and the exact inline text, so a
+    nav line or list item repeated across many pages is tokenized once per
+    build. Texts longer than max_text_length are never cached: they are
+    rarely repeated and would push the short, common fragments out.
+    
+    Args:
+        max_entries: Number of fragments kept before the least recently used is evicted
+        max_text_length: Longest inline text that is cached
+    """
+    # Label used by stats()
+    name = "inline cache"
+    
+    def __init__(self, max_entries=4096, max_text_length=256):
+        self.max_entries = max_entries
+        self.max_text_length = max_text_length
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def lookup(self, kind, text, compute):
+        """
+        Return compute(text), reusing the cached result for this kind and text.
+        
+        Args:
+            kind: Name of the renderer, keeping different result types apart
+            text: The inline markdown text
+            compute: Callable producing the result on a miss; it must return
+                a value that is safe to share, such as a string or tuple
+        """
+        if len(text) > self.max_text_length:
+            return compute(text)
+        key = (kind, text)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+        result = compute(text)
+        with self._lock:
+            self._entries[key] = result
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+    
+    @property
+    def hit_rate(self):
+        """Fraction of cacheable lookups answered from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    def stats(self):
+        """Return a one-line summary of the cache's effectiveness."""
+        return (
+            f"{self.name}: {self.hits} hits, {self.misses} misses "
+            f"({self.hit_rate:.1%} hit rate), {len(self._entries)} entries"
+        )
+    
+    def __len__(self):
+        return len(self._entries)
+
+class BlockCache(InlineCache):
+    """
+    Bounded cache of rendered blocks, keyed by block type and a hash of the block text.
+    
+    Kept across rebuilds of a page, it lets an edit re-render only the blocks
+    that changed; every other block is spliced in from the cache. Entries are
+    whatever the renderer's compute function returns, so a cache must only be
+    used with one BlockRegistry.
+    
+    Args:
+        max_entries: Number of blocks kept before the least recently used is evicted
+    """
+    name = "block cache"
+    
+    def __init__(self, max_entries=65536):
+        super().__init__(max_entries)
+    
+    def lookup(self, block_type, block, compute):
+        """Return compute(block), reusing the cached result for this block type and text."""
+        digest = hashlib.sha1(block.encode("utf-8")).hexdigest()
+        return super().lookup(block_type, digest, lambda _: compute(block))
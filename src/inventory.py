@@ -0,0 +1,94 @@
+import os
+from builder import output_path
+from shard import in_shard
+
+def scan_files(root):
+    """
+    Return {relative path: (mtime_ns, size)} for every file under root.
+
+    Uses os.scandir so the stat data comes from the directory listing
+    where the platform provides it.
+    """
+    files = {}
+    stack = [("", root)]
+    while stack:
+        prefix, directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            rel_path = prefix + entry.name
+            if entry.is_dir():
+                stack.append((rel_path + "/", entry.path))
+            elif entry.is_file():
+                stat = entry.stat()
+                files[rel_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+class Inventory:
+    """
+    Every source file of a build with its stat data, gathered in one scandir pass.
+
+    Copying static files, generating pages and incremental rebuilds all read
+    from the same inventory instead of walking the trees again, and every
+    output directory is created once up front rather than checked per file.
+    Paths are relative to their root and use forward slashes.
+
+    Args:
+        static_dir: Optional directory of static files
+        content_dir: Optional directory of markdown pages
+
+    Attributes:
+        static: {path: (mtime_ns, size)} for every static file
+        content: {path: (mtime_ns, size)} for every file under content_dir
+    """
+    def __init__(self, static_dir=None, content_dir=None):
+        self.static_dir = static_dir
+        self.content_dir = content_dir
+        self.static = scan_files(static_dir) if static_dir is not None else {}
+        self.content = scan_files(content_dir) if content_dir is not None else {}
+        self._made = set()
+
+    def static_files(self, shard=None):
+        """Return the static files assigned to shard (all by default), sorted."""
+        return sorted(path for path in self.static if in_shard(path, shard))
+
+    def pages(self, shard=None):
+        """Return (markdown path, output path) for the pages assigned to shard (all by default), sorted."""
+        pages = []
+        for path in sorted(self.content):
+            if not path.endswith(".md"):
+                continue
+            key = output_path(path).replace(os.sep, "/")
+            if in_shard(key, shard):
+                pages.append((path, key))
+        return pages
+
+    def dest_dirs(self, shard=None):
+        """Return every output directory the files of shard are written to, parents first."""
+        dirs = set()
+        keys = self.static_files(shard) + [key for path, key in self.pages(shard)]
+        for key in keys:
+            directory = key.rpartition("/")[0]
+            while directory and directory not in dirs:
+                dirs.add(directory)
+                directory = directory.rpartition("/")[0]
+        return sorted(dirs)
+
+    def make_dest_dirs(self, dest_dir, shard=None):
+        """
+        Create dest_dir and every output directory under it in one pass.
+
+        Repeated calls for the same dest_dir and shard do nothing, so each
+        stage can ask for its directories without extra syscalls.
+        """
+        if (dest_dir, shard) in self._made:
+            return
+        os.makedirs(dest_dir, exist_ok=True)
+        for directory in self.dest_dirs(shard):
+            try:
+                os.mkdir(os.path.join(dest_dir, *directory.split("/")))
+            except FileExistsError:
+                pass
+        self._made.add((dest_dir, shard))
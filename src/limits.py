@@ -0,0 +1,43 @@
+import time
+
+class DocumentLimitError(ValueError):
+    """Raised when a markdown document exceeds its size or time budget."""
+
+class DocumentLimits:
+    """Per-document guards that stop one bad file from stalling a build.
+
+    Either limit may be None to disable it.
+
+    Args:
+        max_chars: Largest accepted document, in characters
+        max_seconds: Longest time a single document may spend being converted
+    """
+    def __init__(self, max_chars=None, max_seconds=None):
+        self.max_chars = max_chars
+        self.max_seconds = max_seconds
+
+    def check_size(self, markdown):
+        """Raise DocumentLimitError if the document is larger than max_chars."""
+        if self.max_chars is not None and len(markdown) > self.max_chars:
+            raise DocumentLimitError(
+                f"Document is {len(markdown)} characters, limit is {self.max_chars}"
+            )
+
+    def deadline(self):
+        """Return the perf_counter() time the current document must finish by.
+
+        Returns None when there is no time limit.
+        """
+        if self.max_seconds is None:
+            return None
+        return time.perf_counter() + self.max_seconds
+
+    def check_time(self, deadline):
+        """Raise DocumentLimitError if the given deadline has passed."""
+        if deadline is not None and time.perf_counter() > deadline:
+            raise DocumentLimitError(
+                f"Document took longer than {self.max_seconds} seconds to convert"
+            )
+
+# Generous defaults: real pages are a few kilobytes and convert in milliseconds
+DEFAULT_LIMITS = DocumentLimits(max_chars=5_000_000, max_seconds=10.0)
@@ -2,8 +2,33 @@ import os
 import sys
 import shutil
 import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from textnode import TextNode, TextType
-from utils import markdown_to_html_node, extract_title
+from utils import parse_document
+from fastrender import markdown_to_html_with_summary
+from limits import DocumentLimitError, DEFAULT_LIMITS
+from htmlnode import escape_text
+from builder import DEFAULT_TITLE, Site, fill_template
+from pipeline import generate_pages_pipelined
+from inlinecache import InlineCache
+from manifest import MANIFEST_NAME, read_manifest, write_build_manifest
+from shard import parse_shard, write_shard_info
+from css import DEFAULT_INLINE_LIMIT, CssStage
+from inventory import Inventory
+from hooks import NO_HOOKS, Page, load_plugins
+from related import RelatedPosts
+from archive import write_site_archive
+from imageopt import ImageStage
+from htmlmin import HtmlMinifier
+from budgets import BudgetCheck, SizeBudgets
+
+# Term counts of blog posts, kept between builds for --related
+RELATED_CACHE = ".ssg-related.json"
+# Recompressed images, kept between builds for --optimize-images
+IMAGE_CACHE = ".ssg-images"
+# Default path of the size budget report
+BUDGET_REPORT = "budget-report.json"
 
 # Configure logging
 logging.basicConfig(
@@ -11,7 +36,7 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-def copy_directory(source_dir, dest_dir):
+def copy_directory(source_dir, dest_dir, shard=None, inventory=None):
     """
     Recursively copy all contents from source_dir to dest_dir.
     First deletes all contents of dest_dir to ensure a clean copy.
@@ -19,6 +44,9 @@ def copy_directory(source_dir, dest_dir):
     Args:
         source_dir: Path to the source directory
         dest_dir: Path to the destination directory
+        shard: Optional (index, count) shard; only files assigned to it are copied
+        inventory: Optional Inventory listing source_dir as its static files; its
+            output directories (including those for pages) are created here
     """
     # Make sure source directory exists
     if not os.path.exists(source_dir):
@@ -30,31 +58,21 @@ def copy_directory(source_dir, dest_dir):
         logging.info(f"Deleting existing destination directory: {dest_dir}")
         shutil.rmtree(dest_dir)
     
-    # Create destination directory
+    # List the source files once and create every destination directory in bulk
+    if inventory is None:
+        inventory = Inventory(source_dir)
     logging.info(f"Creating destination directory: {dest_dir}")
-    os.makedirs(dest_dir)
+    inventory.make_dest_dirs(dest_dir, shard)
     
-    # Walk through the source directory and copy everything
-    for root, dirs, files in os.walk(source_dir):
-        # Get the relative path from source_dir
-        rel_path = os.path.relpath(root, source_dir)
-        
-        # Create the corresponding directory in dest_dir
-        if rel_path != '.':
-            dest_path = os.path.join(dest_dir, rel_path)
-            logging.info(f"Creating directory: {dest_path}")
-            os.makedirs(dest_path, exist_ok=True)
-        else:
-            dest_path = dest_dir
-        
-        # Copy all files in the current directory
-        for file in files:
-            source_file = os.path.join(root, file)
-            dest_file = os.path.join(dest_path, file)
-            logging.info(f"Copying file: {source_file} -> {dest_file}")
-            shutil.copy2(source_file, dest_file)
+    # Copy every file
+    for path in inventory.static_files(shard):
+        source_file = os.path.join(source_dir, *path.split("/"))
+        dest_file = os.path.join(dest_dir, *path.split("/"))
+        logging.info(f"Copying file: {source_file} -> {dest_file}")
+        shutil.copy2(source_file, dest_file)
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+def generate_page(from_path, template_path, dest_path, basepath="/", limits=DEFAULT_LIMITS, fast=False,
+                  inline_cache=None, css=None, make_dirs=True, hooks=NO_HOOKS, related="", minify=None):
     """
     Generate an HTML page from a markdown file using a template.
     
@@ -63,11 +81,23 @@ def generate_page(from_path, template_path, dest_path, basepath="/"):
         template_path: Path to the HTML template file
         dest_path: Path where the generated HTML file will be saved
         basepath: Base path for all links and resources (default: "/")
+        limits: DocumentLimits applied to the markdown file (None disables them)
+        fast: Render with the fused markdown_to_html instead of building a node tree
+        inline_cache: Optional InlineCache shared with other pages of the build
+        css: Optional CssStage applied to the template's stylesheets
+        make_dirs: Create the destination directory if it is missing; False when
+            the caller already created it
+        hooks: BoundHooks run around each stage of the page
+        related: HTML for the template's {{ Related }} placeholder
+        minify: Optional HtmlMinifier applied to the template
     """
     logging.info(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    page = Page(from_path, dest_path)
     
     # Read the markdown file
     try:
+        if hooks.pre_read is not None:
+            from_path = hooks.pre_read(from_path, page)
         with open(from_path, 'r') as f:
             markdown_content = f.read()
     except FileNotFoundError:
@@ -87,46 +117,51 @@ def generate_page(from_path, template_path, dest_path, basepath="/"):
     except Exception as e:
         logging.error(f"Error reading template file: {e}")
         return
+    if css is not None:
+        template_content = css.apply(template_content)
+    if minify is not None:
+        template_content = minify.apply(template_content)
     
-    # Convert markdown to HTML
+    # Convert markdown to HTML, summarizing the document in the same pass.
+    # Post-parse hooks need the node tree, so they disable the fused path.
     try:
-        html_node = markdown_to_html_node(markdown_content)
-        html_content = html_node.to_html()
+        if fast and hooks.post_parse is None:
+            html_content, summary = markdown_to_html_with_summary(markdown_content, limits, inline_cache=inline_cache)
+            page.summary = summary
+        else:
+            html_node, summary = parse_document(markdown_content, limits, inline_cache=inline_cache)
+            page.summary = summary
+            if hooks.post_parse is not None:
+                html_node = hooks.post_parse(html_node, page)
+            html_content = html_node.to_html()
+        if hooks.post_render is not None:
+            html_content = hooks.post_render(html_content, page)
+    except DocumentLimitError as e:
+        logging.error(f"Skipping {from_path}: {e}")
+        return
     except Exception as e:
         logging.error(f"Error converting markdown to HTML: {e}")
         return
     
-    # Extract title from markdown
-    try:
-        title = extract_title(markdown_content)
-    except ValueError as e:
-        logging.warning(f"No title found in markdown file, using default: {e}")
-        title = "Untitled Page"
-    except Exception as e:
-        logging.error(f"Error extracting title: {e}")
-        return
+    # Take the title from the summary
+    if summary.title is None:
+        logging.warning(f"No title found in markdown file, using default: {from_path}")
+        title = DEFAULT_TITLE
+    else:
+        title = escape_text(summary.title)
     
-    # Replace placeholders in template
+    # Replace placeholders in template and apply the basepath
     try:
-        final_html = template_content.replace("{{ Title }}", title).replace("{{ Content }}", html_content)
-        
-        # Replace href and src attributes with basepath
-        if basepath != "/":
-            # Make sure basepath doesn't end with a slash if it's not just "/"
-            if basepath.endswith("/"):
-                basepath = basepath[:-1]
-            
-            # Replace href="/ with href="{basepath}/
-            final_html = final_html.replace('href="/', f'href="{basepath}/')
-            # Replace src="/ with src="{basepath}/
-            final_html = final_html.replace('src="/', f'src="{basepath}/')
+        final_html = fill_template(template_content, title, html_content, basepath, summary, related)
+        if hooks.pre_write is not None:
+            final_html = hooks.pre_write(final_html, page)
     except Exception as e:
         logging.error(f"Error replacing placeholders: {e}")
         return
     
     # Create destination directory if it doesn't exist
     dest_dir = os.path.dirname(dest_path)
-    if not os.path.exists(dest_dir):
+    if make_dirs and not os.path.exists(dest_dir):
         try:
             os.makedirs(dest_dir)
             logging.info(f"Created directory: {dest_dir}")
@@ -143,7 +178,9 @@ def generate_page(from_path, template_path, dest_path, basepath="/"):
         logging.error(f"Error writing HTML file: {e}")
         return
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", limits=DEFAULT_LIMITS, fast=False,
+                             inline_cache=None, shard=None, css=None, inventory=None, hooks=NO_HOOKS,
+                             related=None, minify=None):
     """
     Recursively crawl a directory for markdown files and generate HTML pages.
     
@@ -152,6 +189,17 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
         template_path: Path to the HTML template file
         dest_dir_path: Path to the destination directory for generated HTML files
         basepath: Base path for all links and resources (default: "/")
+        limits: DocumentLimits applied to each markdown file (None disables them)
+        fast: Render with the fused markdown_to_html instead of building node trees
+        inline_cache: Optional InlineCache shared by all pages
+        shard: Optional (index, count) shard; only pages assigned to it are generated
+        css: Optional CssStage applied to the template's stylesheets
+        inventory: Optional Inventory listing dir_path_content as its content,
+            shared with copy_directory so the tree is only scanned once
+        hooks: BoundHooks run around each stage of every page
+        related: Optional RelatedPosts, up to date with the inventory, filling
+            the template's {{ Related }} placeholder
+        minify: Optional HtmlMinifier applied to the template
     """
     logging.info(f"Recursively generating pages from {dir_path_content} to {dest_dir_path}")
     
@@ -160,40 +208,121 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
         logging.error(f"Content directory does not exist: {dir_path_content}")
         return
     
-    # Walk through the content directory
-    for root, dirs, files in os.walk(dir_path_content):
-        # Get the relative path from the content directory
-        rel_path = os.path.relpath(root, dir_path_content)
-        
-        # Create the corresponding directory in the destination
-        if rel_path != '.':
-            dest_subdir = os.path.join(dest_dir_path, rel_path)
-        else:
-            dest_subdir = dest_dir_path
+    # List the pages once and create their directories in bulk
+    if inventory is None:
+        inventory = Inventory(content_dir=dir_path_content)
+    inventory.make_dest_dirs(dest_dir_path, shard)
+    
+    for path, key in inventory.pages(shard):
+        # index.md keeps its directory, other files become name.html
+        source_file = os.path.join(dir_path_content, *path.split("/"))
+        dest_file = os.path.join(dest_dir_path, *key.split("/"))
         
-        # Process markdown files
-        for file in files:
-            # Check if the file is a markdown file
-            if file.endswith('.md'):
-                # Get the source and destination paths
-                source_file = os.path.join(root, file)
-                
-                # If the file is named index.md, keep the directory structure
-                # Otherwise, create an HTML file with the same name
-                if file == 'index.md':
-                    # For index.md, create index.html in the same relative directory
-                    dest_file = os.path.join(dest_subdir, 'index.html')
-                else:
-                    # For other markdown files, replace .md with .html
-                    dest_file = os.path.join(dest_subdir, file.replace('.md', '.html'))
-                
-                # Generate the HTML page
-                generate_page(source_file, template_path, dest_file, basepath)
+        # Generate the HTML page
+        related_html = related.html_for(path) if related is not None else ""
+        generate_page(source_file, template_path, dest_file, basepath, limits, fast, inline_cache, css,
+                      make_dirs=False, hooks=hooks, related=related_html, minify=minify)
 
-def main():
-    # Get basepath from command line arguments or use default "/"
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
-    logging.info(f"Using basepath: {basepath}")
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the site into docs/")
+    parser.add_argument("basepath", nargs="?", default="/",
+                        help="Base path for all links and resources (default: /)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Overlap reading, rendering and writing pages with an asyncio pipeline")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="With --pipeline, render on this many processes (default: threads)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Render pages directly to HTML without building node trees")
+    parser.add_argument("--shard", type=parse_shard, metavar="i/N",
+                        help="Build only the 1-based shard i of N into shards/i-of-N; "
+                             "combine the shards with src/shard.py")
+    parser.add_argument("--target", action="append", default=[], metavar="BASEPATH=DIR",
+                        help="Build for this basepath into DIR; repeat to build several targets "
+                             "from one parse of each page (replaces the positional basepath and docs/)")
+    parser.add_argument("--css", action="store_true",
+                        help="Minify the static stylesheets and inline small ones into each page's head")
+    parser.add_argument("--css-inline-limit", type=int, default=DEFAULT_INLINE_LIMIT, metavar="BYTES",
+                        help="With --css, largest minified stylesheet to inline; larger ones are linked "
+                             f"by a content-hashed URL (default: {DEFAULT_INLINE_LIMIT})")
+    parser.add_argument("--plugin", action="append", default=[], metavar="MODULE",
+                        help="Import MODULE and call its register(hooks) to add build hooks; repeatable")
+    parser.add_argument("--related", type=int, default=0, metavar="K",
+                        help="List the K most similar blog posts on each post through the template's "
+                             "{{ Related }} placeholder")
+    parser.add_argument("--optimize-images", action="store_true",
+                        help="Losslessly recompress the static PNG images; results are cached in "
+                             f"{IMAGE_CACHE}/ by input hash")
+    parser.add_argument("--minify", action="store_true",
+                        help="Minify the template's HTML: collapse whitespace, drop comments and optional "
+                             "quotes, keeping pre, code, script and style content as is")
+    parser.add_argument("--output-archive", metavar="PATH",
+                        help="Build straight into a .tar.gz, .tgz, .tar or .zip archive with deterministic "
+                             "entries instead of writing docs/")
+    parser.add_argument("--max-page-bytes", type=int, metavar="BYTES",
+                        help="Budget for the final HTML of each page")
+    parser.add_argument("--max-page-image-bytes", type=int, metavar="BYTES",
+                        help="Budget for the total size of the local images each page references")
+    parser.add_argument("--max-site-bytes", type=int, metavar="BYTES",
+                        help="Budget for the total size of all pages and static files")
+    parser.add_argument("--budget-report", metavar="PATH",
+                        help=f"Where to write the JSON size budget report (default: {BUDGET_REPORT} in the project root)")
+    parser.add_argument("--fail-over-budget", action="store_true",
+                        help="Exit with an error when any size budget is exceeded")
+    args = parser.parse_args(argv)
+    try:
+        args.targets = [parse_target(target) for target in args.target]
+    except ValueError as e:
+        parser.error(str(e))
+    args.budgets = SizeBudgets(args.max_page_bytes, args.max_page_image_bytes, args.max_site_bytes)
+    if args.budgets and (args.pipeline or args.target or args.output_archive):
+        parser.error("Size budgets cannot be combined with --pipeline, --target or --output-archive")
+    if args.fail_over_budget and not args.budgets:
+        parser.error("--fail-over-budget needs at least one --max-*-bytes budget")
+    if args.shard is not None and (args.pipeline or args.target):
+        parser.error("--shard cannot be combined with --pipeline or --target")
+    if args.plugin and (args.pipeline or args.target):
+        parser.error("--plugin cannot be combined with --pipeline or --target")
+    if args.related and (args.pipeline or args.target):
+        parser.error("--related cannot be combined with --pipeline or --target")
+    if args.optimize_images and (args.target or args.output_archive):
+        parser.error("--optimize-images cannot be combined with --target or --output-archive")
+    if args.output_archive and (args.pipeline or args.target or args.shard is not None or args.plugin
+                                or args.related):
+        parser.error("--output-archive cannot be combined with --pipeline, --target, --shard, --plugin "
+                     "or --related")
+    return args
+
+def parse_target(target):
+    """Split a BASEPATH=DIR command line target into (basepath, dir)."""
+    basepath, sep, dest_dir = target.partition("=")
+    if not sep or not basepath or not dest_dir:
+        raise ValueError(f"Target must look like BASEPATH=DIR: {target}")
+    return basepath, os.path.abspath(dest_dir)
+
+def build_targets(targets, static_dir, content_dir, template_path, fast=False, inline_cache=None, css=None,
+                  minify=None, limits=DEFAULT_LIMITS):
+    """
+    Build the site for several (basepath, dest_dir) targets in one run.
+    
+    Static files are copied into every target and each markdown page is
+    parsed once, then rendered once per target. A page that fails is logged
+    and skipped in every target.
+    """
+    previous = {dest_dir: read_manifest(os.path.join(dest_dir, MANIFEST_NAME)) for _, dest_dir in targets}
+    for basepath, dest_dir in targets:
+        logging.info(f"Copying static files from {static_dir} to {dest_dir}")
+        copy_directory(static_dir, dest_dir)
+    
+    logging.info(f"Generating pages for {len(targets)} targets")
+    site = Site(content_dir, template_path, limits=limits, fast=fast, inline_cache=inline_cache, css=css,
+                minify=minify)
+    site.write_targets(targets, clean=False)
+    for basepath, dest_dir in targets:
+        write_build_manifest(dest_dir, previous[dest_dir])
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    basepath = args.basepath
     
     # Define source and destination directories relative to the project root
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -201,6 +330,44 @@ def main():
     docs_dir = os.path.join(project_root, "docs")
     content_dir = os.path.join(project_root, "content")
     template_path = os.path.join(project_root, "template.html")
+    related_cache = os.path.join(project_root, RELATED_CACHE)
+    
+    # Repeated inline fragments (nav lines, list items) are tokenized once per
+    # build. Worker processes cannot share it, so it is off with --workers.
+    inline_cache = None if args.workers > 0 else InlineCache()
+    
+    # Plugins register their hooks once; unused hook points stay None
+    hook_registry = load_plugins(args.plugin)
+    
+    # Stylesheets are minified once and the template rewritten once per build
+    css = CssStage(static_dir, args.css_inline_limit) if args.css else None
+    # The template is minified once; rendered bodies have no whitespace to collapse
+    minify = HtmlMinifier() if args.minify else None
+    
+    if args.output_archive:
+        # Pages are rendered and static files streamed straight into the
+        # archive; docs/ is left untouched
+        site = Site(content_dir, template_path, static_dir, basepath, fast=args.fast, inline_cache=inline_cache,
+                    css=css, minify=minify)
+        write_site_archive(site, os.path.abspath(args.output_archive))
+        return
+    
+    if args.target:
+        build_targets(args.targets, static_dir, content_dir, template_path, args.fast, inline_cache, css, minify)
+        logging.info("HTML pages generated successfully")
+        if inline_cache is not None:
+            logging.info(inline_cache.stats())
+        return
+    
+    logging.info(f"Using basepath: {basepath}")
+    
+    # A shard writes its part of the site to its own directory
+    if args.shard is not None:
+        docs_dir = os.path.join(project_root, "shards", "{}-of-{}".format(*args.shard))
+        logging.info(f"Building shard {args.shard[0]} of {args.shard[1]} into {docs_dir}")
+    
+    # Keep the previous build's manifest so the new one can be diffed against it
+    previous_manifest = read_manifest(os.path.join(docs_dir, MANIFEST_NAME))
     
     # Step 1: Delete anything in the docs directory
     if os.path.exists(docs_dir):
@@ -208,15 +375,75 @@ def main():
         shutil.rmtree(docs_dir)
         logging.info("Docs directory deleted successfully")
     
+    # One scan of the static and content trees serves every stage below
+    inventory = Inventory(static_dir, content_dir)
+    
+    # Related posts re-read only the posts whose stamp changed since the cached run
+    related = None
+    if args.related > 0:
+        related = RelatedPosts(content_dir, count=args.related)
+        related.load(related_cache)
+        logging.info(f"Related posts: {related.update(inventory.content)} posts read")
+        related.save(related_cache)
+    
+    # Size budgets measure each page as it is written, through the hooks, and
+    # take static sizes from the inventory. Pages look up images of every
+    # shard; only this shard's static files count towards the site total.
+    budget_check = None
+    if args.budgets:
+        static_sizes = {key: size for key, (mtime_ns, size) in inventory.static.items()}
+        report_path = os.path.abspath(args.budget_report or os.path.join(project_root, BUDGET_REPORT))
+        budget_check = BudgetCheck(args.budgets, static_sizes, docs_dir, report_path,
+                                   inventory.static_files(args.shard))
+        budget_check.register(hook_registry)
+    hooks = hook_registry.bind()
+    
     # Step 2: Copy all static files from static to docs
     logging.info(f"Copying static files from {static_dir} to {docs_dir}")
-    copy_directory(static_dir, docs_dir)
+    copy_directory(static_dir, docs_dir, args.shard, inventory)
     logging.info("Static files copied successfully")
+    if args.optimize_images:
+        images = ImageStage(static_dir, os.path.join(project_root, IMAGE_CACHE))
+        optimized = images.write(docs_dir, inventory.static_files(args.shard))
+        if budget_check is not None:
+            budget_check.add_static(optimized)
     
     # Step 3: Generate HTML pages from markdown files recursively
     logging.info("Recursively generating HTML pages from markdown files")
-    generate_pages_recursive(content_dir, template_path, docs_dir, basepath)
+    if args.pipeline and args.workers > 0:
+        with ProcessPoolExecutor(args.workers) as executor:
+            generate_pages_pipelined(content_dir, template_path, docs_dir, basepath, executor=executor, fast=args.fast,
+                                     css=css, minify=minify)
+    elif args.pipeline:
+        generate_pages_pipelined(content_dir, template_path, docs_dir, basepath, fast=args.fast,
+                                 inline_cache=inline_cache, css=css, minify=minify)
+    else:
+        generate_pages_recursive(content_dir, template_path, docs_dir, basepath, fast=args.fast,
+                                 inline_cache=inline_cache, shard=args.shard, css=css, inventory=inventory,
+                                 hooks=hooks, related=related, minify=minify)
     logging.info("HTML pages generated successfully")
+    if inline_cache is not None:
+        logging.info(inline_cache.stats())
+    
+    # Replace the copied stylesheets with their minified and hashed versions
+    if css is not None:
+        stylesheets = css.write(docs_dir, args.shard)
+        if budget_check is not None:
+            budget_check.add_static(stylesheets)
+    
+    if hooks.post_build is not None:
+        hooks.post_build(docs_dir)
+    for line in hook_registry.report():
+        logging.info(line)
+    
+    # Step 4: Record every output file's hash and what changed since last build
+    write_build_manifest(docs_dir, previous_manifest)
+    if args.shard is not None:
+        write_shard_info(docs_dir, args.shard)
+    
+    if args.fail_over_budget and budget_check.violations():
+        logging.error(f"Build is over its size budgets, see {budget_check.report_path}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+import os
+import json
+import hashlib
+import logging
+from builder import walk_files, as_output_key
+
+# Written into the output root; neither file lists itself
+MANIFEST_NAME = "manifest.json"
+CHANGES_NAME = "changes.json"
+RESERVED_NAMES = (MANIFEST_NAME, CHANGES_NAME)
+
+class ManifestDiff:
+    """
+    The difference between two manifests, as sorted lists of output paths.
+    
+    Attributes:
+        added: Paths only in the new manifest
+        modified: Paths in both manifests with different hashes
+        removed: Paths only in the old manifest
+    """
+    def __init__(self, added, modified, removed):
+        self.added = added
+        self.modified = modified
+        self.removed = removed
+    
+    def __bool__(self):
+        return bool(self.added or self.modified or self.removed)
+    
+    def to_dict(self):
+        return {"added": self.added, "modified": self.modified, "removed": self.removed}
+    
+    def __repr__(self):
+        return f"ManifestDiff(added={self.added}, modified={self.modified}, removed={self.removed})"
+
+def hash_bytes(data):
+    """Return the content hash recorded in manifests for a file's bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+def manifest_for_output(output):
+    """Build a manifest from an in-memory output mapping of path to bytes."""
+    return {key: hash_bytes(data) for key, data in output.items() if key not in RESERVED_NAMES}
+
+def manifest_for_directory(root):
+    """Build a manifest by hashing every file under an output directory."""
+    manifest = {}
+    for path in walk_files(root):
+        key = as_output_key(path)
+        if key in RESERVED_NAMES:
+            continue
+        with open(os.path.join(root, path), 'rb') as f:
+            manifest[key] = hash_bytes(f.read())
+    return manifest
+
+def read_manifest(path):
+    """Read a manifest file, returning an empty manifest if it does not exist."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def write_json(data, path):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def diff_manifests(old, new):
+    """Compare two manifests and return a ManifestDiff."""
+    added = sorted(key for key in new if key not in old)
+    modified = sorted(key for key in new if key in old and old[key] != new[key])
+    removed = sorted(key for key in old if key not in new)
+    return ManifestDiff(added, modified, removed)
+
+def write_build_manifest(output_dir, previous):
+    """
+    Write the manifest for a finished build and its diff against the previous one.
+    
+    Args:
+        output_dir: The build's output directory
+        previous: The previous build's manifest ({} for a first build)
+        
+    Returns:
+        The ManifestDiff between the previous and the new build
+    """
+    manifest = manifest_for_directory(output_dir)
+    diff = diff_manifests(previous, manifest)
+    write_json(manifest, os.path.join(output_dir, MANIFEST_NAME))
+    write_json(diff.to_dict(), os.path.join(output_dir, CHANGES_NAME))
+    logging.info(
+        f"Manifest: {len(diff.added)} added, {len(diff.modified)} modified, "
+        f"{len(diff.removed)} removed of {len(manifest)} files"
+    )
+    return diff
@@ -0,0 +1,140 @@
+import os
+import asyncio
+import logging
+from builder import render_page, output_path, walk_files
+from limits import DEFAULT_LIMITS
+
+# Marks the end of a queue's input; each consumer receives one
+DONE = object()
+
+def page_jobs(content_dir, dest_dir):
+    """
+    List the (markdown path, HTML path) pairs for every page under content_dir.
+    
+    Args:
+        content_dir: Directory containing the markdown pages
+        dest_dir: Output directory the HTML paths are placed under
+    """
+    return [
+        (os.path.join(content_dir, path), os.path.join(dest_dir, output_path(path)))
+        for path in walk_files(content_dir)
+        if path.endswith(".md")
+    ]
+
+def read_text(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+def write_text(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+async def build_pages_async(jobs, template_content, basepath="/", limits=DEFAULT_LIMITS,
+                            executor=None, render_workers=4, write_workers=4, queue_size=16, fast=False,
+                            inline_cache=None):
+    """
+    Render pages through a three-stage pipeline of reader, renderer and writer.
+    
+    Files are read and written on worker threads, and rendering runs on the
+    given executor, so disk I/O for some pages overlaps with parsing others.
+    The stages are joined by bounded queues: a fast reader blocks once
+    queue_size pages are waiting to be rendered, which keeps memory bounded
+    no matter how many pages there are.
+    
+    Args:
+        jobs: Iterable of (markdown path, HTML path) pairs
+        template_content: Template text with {{ Title }} and {{ Content }} placeholders
+        basepath: Base path for all links and resources (default: "/")
+        limits: DocumentLimits applied to each page (None disables them)
+        executor: concurrent.futures executor for rendering; a ProcessPoolExecutor
+            parallelises parsing, None uses the event loop's default thread pool
+        render_workers: Number of pages rendered concurrently
+        write_workers: Number of pages written concurrently
+        queue_size: Maximum number of pages waiting between two stages
+        fast: Render with the fused markdown_to_html instead of building node trees
+        inline_cache: Optional InlineCache shared by all pages; only useful with
+            a thread executor, since a process executor would copy it per page
+        
+    Returns:
+        A list of the HTML paths that were written
+    """
+    loop = asyncio.get_running_loop()
+    read_queue = asyncio.Queue(queue_size)
+    write_queue = asyncio.Queue(queue_size)
+    written = []
+    
+    async def reader():
+        for source_path, dest_path in jobs:
+            try:
+                markdown_content = await asyncio.to_thread(read_text, source_path)
+            except Exception as e:
+                logging.error(f"Error reading markdown file {source_path}: {e}")
+                continue
+            await read_queue.put((source_path, dest_path, markdown_content))
+        for _ in range(render_workers):
+            await read_queue.put(DONE)
+    
+    async def renderer():
+        while (item := await read_queue.get()) is not DONE:
+            source_path, dest_path, markdown_content = item
+            try:
+                html = await loop.run_in_executor(
+                    executor, render_page, markdown_content, template_content, basepath, limits, fast, inline_cache
+                )
+            except Exception as e:
+                logging.error(f"Error converting {source_path} to HTML: {e}")
+                continue
+            await write_queue.put((dest_path, html))
+    
+    async def writer():
+        while (item := await write_queue.get()) is not DONE:
+            dest_path, html = item
+            try:
+                await asyncio.to_thread(write_text, dest_path, html)
+            except Exception as e:
+                logging.error(f"Error writing HTML file {dest_path}: {e}")
+                continue
+            logging.info(f"Successfully generated page: {dest_path}")
+            written.append(dest_path)
+    
+    async def render_stage():
+        await asyncio.gather(*(renderer() for _ in range(render_workers)))
+        for _ in range(write_workers):
+            await write_queue.put(DONE)
+    
+    await asyncio.gather(reader(), render_stage(), *(writer() for _ in range(write_workers)))
+    return written
+
+def generate_pages_pipelined(dir_path_content, template_path, dest_dir_path, basepath="/",
+                             limits=DEFAULT_LIMITS, executor=None, fast=False, inline_cache=None, css=None,
+                             minify=None):
+    """
+    Generate every page under dir_path_content using the asyncio pipeline.
+    
+    Args:
+        dir_path_content: Path to the content directory containing markdown files
+        template_path: Path to the HTML template file
+        dest_dir_path: Path to the destination directory for generated HTML files
+        basepath: Base path for all links and resources (default: "/")
+        limits: DocumentLimits applied to each page (None disables them)
+        executor: Executor used for rendering (see build_pages_async)
+        fast: Render with the fused markdown_to_html instead of building node trees
+        inline_cache: Optional InlineCache shared by all pages (see build_pages_async)
+        css: Optional CssStage applied to the template's stylesheets
+        minify: Optional HtmlMinifier applied to the template
+        
+    Returns:
+        A list of the HTML paths that were written
+    """
+    if not os.path.exists(dir_path_content):
+        logging.error(f"Content directory does not exist: {dir_path_content}")
+        return []
+    template_content = read_text(template_path)
+    if css is not None:
+        template_content = css.apply(template_content)
+    if minify is not None:
+        template_content = minify.apply(template_content)
+    jobs = page_jobs(dir_path_content, dest_dir_path)
+    return asyncio.run(build_pages_async(jobs, template_content, basepath, limits, executor, fast=fast,
+                                         inline_cache=inline_cache))
@@ -0,0 +1,62 @@
+class BlockRegistry:
+    """Dispatch table from block types to their detector and renderer callables.
+
+    Core block types are recognised by a single default detector. Extension
+    types register a detector together with the first characters their blocks
+    can start with; a block is only offered to the extensions registered for
+    its first character, so extensions that never match cost one dict lookup.
+
+    Renderers are called as renderer(block, inline) where inline converts a
+    string of inline markdown into a list of child HTML nodes.
+
+    Args:
+        default_detector: Callable returning the block type of any block no
+            extension claimed
+    """
+    def __init__(self, default_detector):
+        self.default_detector = default_detector
+        self._prefixed = {}
+        self._renderers = {}
+
+    def register(self, block_type, renderer, detector=None, prefixes=()):
+        """Register a renderer, and optionally a detector, for a block type.
+
+        Args:
+            block_type: Any hashable key identifying the block type
+            renderer: Callable(block, inline) returning an HTMLNode
+            detector: Callable(block) returning True if the block is of this type
+            prefixes: First characters a matching block can start with
+
+        Raises:
+            ValueError: If a detector is given without any prefixes
+        """
+        if detector is not None:
+            if not prefixes:
+                raise ValueError(f"Detector for {block_type} needs at least one prefix")
+            for prefix in prefixes:
+                self._prefixed.setdefault(prefix, []).append((block_type, detector))
+        self._renderers[block_type] = renderer
+
+    def detect(self, block):
+        """Return the block type of a non-empty, stripped markdown block."""
+        candidates = self._prefixed.get(block[0])
+        if candidates is not None:
+            for block_type, detector in candidates:
+                if detector(block):
+                    return block_type
+        return self.default_detector(block)
+
+    def renderer(self, block_type):
+        """Return the renderer registered for a block type.
+
+        Raises:
+            ValueError: If no renderer is registered for the block type
+        """
+        try:
+            return self._renderers[block_type]
+        except KeyError:
+            raise ValueError(f"No renderer registered for block type: {block_type}") from None
+
+    def render(self, block, inline):
+        """Detect the type of a block and render it to an HTMLNode."""
+        return self.renderer(self.detect(block))(block, inline)
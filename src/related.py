@@ -0,0 +1,235 @@
+import os
+import re
+import json
+import math
+import heapq
+import logging
+from array import array
+from collections import Counter
+from textnode import TextType
+from htmlnode import escape_text
+from blocktype import BlockType, block_to_block_type
+from builder import output_path
+from utils import markdown_to_blocks, text_to_textnodes, extract_title_level, extract_reference_definitions
+
+# Posts are the pages under this content directory
+DEFAULT_SECTION = "blog"
+# Related posts listed per page
+DEFAULT_COUNT = 5
+# Terms in more than this fraction of posts carry almost no weight and would
+# make every query touch most posts, so they are left out of queries
+MAX_DOCUMENT_FRACTION = 0.5
+# ... unless they are in at most this many posts, which is cheap to scan, so
+# small sections keep every term
+MIN_POSTINGS_LIMIT = 50
+# A query uses only this many of the post's highest-weighted terms
+MAX_QUERY_TERMS = 40
+
+WORD_PATTERN = re.compile(r"[a-z][a-z0-9']+")
+STOP_WORDS = frozenset("""
+    about after all also and any are because been but can could did does for from had has have her his how
+    into its just more most not now one only other our out over she some such than that the their them then
+    there these they this those through too under very was were what when where which while who why will
+    with would you your
+""".split())
+
+# Inline text that carries no content: URLs of links and images, and code
+SKIPPED_TEXT_TYPES = (TextType.CODE, TextType.IMAGE)
+
+def post_terms(markdown):
+    """
+    Count the terms of a post and find its title.
+    
+    Terms are the lowercased words of the post's text nodes, leaving out code,
+    image alt text, stop words and words shorter than three letters.
+    
+    Returns:
+        A tuple of (title or None, Counter of term counts)
+    """
+    title = None
+    counts = Counter()
+    references, blocks = extract_reference_definitions(markdown_to_blocks(markdown))
+    for block in blocks:
+        block_type = block_to_block_type(block)
+        if block_type == BlockType.CODE:
+            continue
+        if block_type == BlockType.HEADING:
+            level, block = extract_title_level(block)
+            if level == 1 and title is None:
+                title = block.strip()
+        for node in text_to_textnodes(block.replace("\n", " "), references):
+            if node.text_type in SKIPPED_TEXT_TYPES:
+                continue
+            counts.update(word for word in WORD_PATTERN.findall(node.text.lower()) if word not in STOP_WORDS)
+    return title, counts
+
+def post_url(path):
+    """Return the site URL of a post, e.g. "blog/tom/index.md" -> "/blog/tom"."""
+    key = output_path(path).replace(os.sep, "/")
+    if key == "index.html" or key.endswith("/index.html"):
+        return "/" + key[:-len("index.html")].rstrip("/")
+    return "/" + key
+
+class RelatedPosts:
+    """
+    Finds the most similar posts of a section with TF-IDF and an inverted index.
+    
+    Each post is a sparse vector of its terms' normalized TF-IDF weights,
+    stored as parallel arrays of term ids and weights. The inverted index maps
+    each term id to the posts containing it, so finding a post's neighbours
+    only touches posts that share one of its strongest terms with it instead
+    of every pair.
+    
+    Term counts are kept per post with the post's (mtime_ns, size) stamp, so
+    update() only re-reads changed posts; the index and cached results are
+    rebuilt lazily after a change. The counts can be saved to and loaded from
+    a JSON file to carry them across builds.
+    
+    Args:
+        content_dir: Directory containing the markdown pages
+        section: Directory under content_dir whose pages are posts
+        count: Number of related posts per page
+    """
+    def __init__(self, content_dir, section=DEFAULT_SECTION, count=DEFAULT_COUNT):
+        self.content_dir = content_dir
+        self.section = section.strip("/") + "/"
+        self.count = count
+        # path -> (stamp, title, Counter of terms)
+        self._posts = {}
+        self._index = None
+        self._related = {}
+    
+    def is_post(self, path):
+        return path.startswith(self.section) and path.endswith(".md")
+    
+    def update(self, files):
+        """
+        Bring the posts in line with a content listing.
+        
+        Args:
+            files: {path: (mtime_ns, size)} for the files under content_dir,
+                as in Inventory.content
+        
+        Returns:
+            The number of posts that were read again
+        """
+        posts = {path: stamp for path, stamp in files.items() if self.is_post(path)}
+        changed = 0
+        for path in list(self._posts):
+            if path not in posts:
+                del self._posts[path]
+                changed += 1
+        read = 0
+        for path, stamp in posts.items():
+            entry = self._posts.get(path)
+            if entry is not None and entry[0] == tuple(stamp):
+                continue
+            with open(os.path.join(self.content_dir, *path.split("/")), 'r') as f:
+                title, terms = post_terms(f.read())
+            self._posts[path] = (tuple(stamp), title, terms)
+            read += 1
+        if read or changed:
+            self._index = None
+            self._related = {}
+        return read
+    
+    def _build_index(self):
+        paths = sorted(self._posts)
+        document_frequency = Counter()
+        for path in paths:
+            document_frequency.update(self._posts[path][2].keys())
+        total = len(paths)
+        term_ids = {term: i for i, term in enumerate(sorted(document_frequency))}
+        idf = [0.0] * len(term_ids)
+        for term, frequency in document_frequency.items():
+            idf[term_ids[term]] = math.log(total / frequency)
+        
+        vectors = []
+        postings = [(array('I'), array('f')) for _ in term_ids]
+        for doc_id, path in enumerate(paths):
+            weights = sorted(
+                (term_ids[term], (1 + math.log(count)) * idf[term_ids[term]])
+                for term, count in self._posts[path][2].items()
+            )
+            norm = math.sqrt(sum(weight * weight for _, weight in weights)) or 1.0
+            ids = array('I')
+            values = array('f')
+            for term_id, weight in weights:
+                if weight:
+                    ids.append(term_id)
+                    values.append(weight / norm)
+                    postings[term_id][0].append(doc_id)
+                    postings[term_id][1].append(weight / norm)
+            vectors.append((ids, values))
+        
+        max_postings = max(MIN_POSTINGS_LIMIT, int(total * MAX_DOCUMENT_FRACTION))
+        self._index = (paths, {path: i for i, path in enumerate(paths)}, vectors, postings, max_postings)
+    
+    def related(self, path):
+        """
+        Return the paths of the posts most similar to a post, best first.
+        
+        Args:
+            path: Post path relative to content_dir, e.g. "blog/tom/index.md"
+        
+        Returns:
+            Up to count (score, path) tuples; empty for a page that is not a post
+        """
+        result = self._related.get(path)
+        if result is not None:
+            return result
+        if self._index is None:
+            self._build_index()
+        paths, doc_ids, vectors, postings, max_postings = self._index
+        doc_id = doc_ids.get(path)
+        if doc_id is None:
+            return []
+        
+        scores = {}
+        get = scores.get
+        ids, values = vectors[doc_id]
+        for weight, term_id in heapq.nlargest(MAX_QUERY_TERMS, zip(values, ids)):
+            docs, doc_weights = postings[term_id]
+            if len(docs) > max_postings:
+                continue
+            for other, other_weight in zip(docs, doc_weights):
+                scores[other] = get(other, 0.0) + weight * other_weight
+        scores.pop(doc_id, None)
+        best = heapq.nsmallest(self.count, scores.items(), key=lambda item: (-item[1], item[0]))
+        result = [(round(score, 6), paths[other]) for other, score in best if score > 0]
+        self._related[path] = result
+        return result
+    
+    def html_for(self, path):
+        """Render a post's related posts as a list of links, or "" if it has none."""
+        items = "".join(
+            f'<li><a href="{post_url(other)}">{escape_text(self._posts[other][1] or post_url(other))}</a></li>'
+            for score, other in self.related(path)
+        )
+        return f'<ul class="related">{items}</ul>' if items else ""
+    
+    def save(self, cache_path):
+        """Write the per-post term counts to a JSON cache file."""
+        posts = {
+            path: {"stamp": list(stamp), "title": title, "terms": terms}
+            for path, (stamp, title, terms) in self._posts.items()
+        }
+        with open(cache_path, 'w') as f:
+            json.dump({"section": self.section, "posts": posts}, f, sort_keys=True)
+    
+    def load(self, cache_path):
+        """Read term counts saved by save(); a missing or unreadable cache is ignored."""
+        try:
+            with open(cache_path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError) as e:
+            logging.info(f"No related posts cache loaded: {e}")
+            return
+        if data.get("section") != self.section:
+            return
+        self._posts = {
+            path: (tuple(entry["stamp"]), entry["title"], Counter(entry["terms"]))
+            for path, entry in data["posts"].items()
+        }
+        self._index = None
+        self._related = {}
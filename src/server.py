@@ -0,0 +1,211 @@
+import os
+import sys
+import hashlib
+import logging
+import argparse
+import mimetypes
+import threading
+from urllib.parse import unquote
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from builder import Site
+from inlinecache import BlockCache
+
+class PageCache:
+    """
+    Bounded LRU cache of rendered pages.
+    
+    Each entry is stored with a stamp (the source and template mtimes it was
+    rendered from); a lookup with a different stamp is treated as a miss.
+    
+    Args:
+        max_entries: Number of pages kept before the least recently used is evicted
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, stamp):
+        """Return the cached value for key if it was stored with this stamp, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key, stamp, value):
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (stamp, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def __len__(self):
+        return len(self._entries)
+
+def make_etag(body):
+    """Return a strong ETag for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def page_for_url(url_path):
+    """
+    Map a request path to the markdown page that renders it.
+    
+    "/" and "/blog/tom", "/blog/tom/" or "/blog/tom/index.html" map to
+    index.md in the matching content directory.
+    
+    Returns:
+        The markdown path relative to the content directory, or None if the
+        path escapes the content directory
+    """
+    path = unquote(url_path.split("?", 1)[0].split("#", 1)[0]).strip("/")
+    if path.endswith("index.html"):
+        path = path[:-len("index.html")].rstrip("/")
+    parts = [part for part in path.split("/") if part]
+    if any(part in (".", "..") for part in parts):
+        return None
+    return os.path.join(*parts, "index.md")
+
+class PreviewServer(ThreadingHTTPServer):
+    """
+    HTTP server that renders pages on demand through the Site pipeline.
+    
+    Rendered pages are kept in a PageCache keyed by markdown path and
+    invalidated when the source or template mtime changes, so repeated hits
+    on an unchanged page only cost two stat calls.
+    
+    Args:
+        address: (host, port) to listen on
+        site: The Site whose pages are served
+        cache_size: Maximum number of rendered pages kept in memory
+    """
+    daemon_threads = True
+    
+    def __init__(self, address, site, cache_size=256):
+        super().__init__(address, PreviewRequestHandler)
+        self.site = site
+        self.cache = PageCache(cache_size)
+    
+    def render(self, page):
+        """
+        Return (etag, body) for a markdown page, rendering it only on a cache miss.
+        
+        Raises:
+            FileNotFoundError: If the page does not exist
+        """
+        source_path = os.path.join(self.site.content_dir, page)
+        stamp = (os.stat(source_path).st_mtime_ns, os.stat(self.site.template_path).st_mtime_ns)
+        entry = self.cache.get(page, stamp)
+        if entry is None:
+            logging.info(f"Rendering {source_path}")
+            key, body = self.site.build_page(page)
+            entry = (make_etag(body), body)
+            self.cache.put(page, stamp, entry)
+        return entry
+    
+    def static_file(self, url_path):
+        """Return the filesystem path of a static file for a request, or None."""
+        if self.site.static_dir is None:
+            return None
+        root = os.path.abspath(self.site.static_dir)
+        path = unquote(url_path.split("?", 1)[0].split("#", 1)[0]).lstrip("/")
+        full_path = os.path.abspath(os.path.join(root, path))
+        if not full_path.startswith(root + os.sep) or not os.path.isfile(full_path):
+            return None
+        return full_path
+
+class PreviewRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.respond(send_body=True)
+    
+    def do_HEAD(self):
+        self.respond(send_body=False)
+    
+    def respond(self, send_body):
+        static_path = self.server.static_file(self.path)
+        if static_path is not None:
+            with open(static_path, 'rb') as f:
+                body = f.read()
+            content_type = mimetypes.guess_type(static_path)[0] or "application/octet-stream"
+            etag = make_etag(body)
+        else:
+            page = page_for_url(self.path)
+            if page is None:
+                self.send_error(404)
+                return
+            try:
+                etag, body = self.server.render(page)
+            except FileNotFoundError:
+                self.send_error(404)
+                return
+            except Exception as e:
+                logging.error(f"Error rendering {page}: {e}")
+                self.send_error(500)
+                return
+            content_type = "text/html; charset=utf-8"
+        
+        # Clients may keep the page but must revalidate, which is a cheap 304
+        if etag in parse_if_none_match(self.headers.get("If-None-Match")):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logging.info(f"{self.address_string()} - {format % args}")
+
+def parse_if_none_match(header):
+    """Return the set of entity tags listed in an If-None-Match header."""
+    if not header:
+        return set()
+    return {tag.strip() for tag in header.split(",")}
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description="Serve the site, rendering pages on request")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--basepath", default="/")
+    parser.add_argument("--cache-size", type=int, default=256)
+    args = parser.parse_args(argv)
+    
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    site = Site(
+        os.path.join(project_root, "content"),
+        os.path.join(project_root, "template.html"),
+        os.path.join(project_root, "static"),
+        args.basepath,
+        # An edited page only re-renders the blocks that changed
+        block_cache=BlockCache(),
+    )
+    server = PreviewServer((args.host, args.port), site, args.cache_size)
+    logging.info(f"Serving on http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
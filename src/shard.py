@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+import argparse
+from xml.sax.saxutils import escape
+from manifest import MANIFEST_NAME, read_manifest, write_build_manifest, write_json
+
+# Written next to each shard's manifest to record which shard it holds
+SHARD_NAME = "shard.json"
+SITEMAP_NAME = "sitemap.xml"
+
+class ShardConflictError(Exception):
+    """Raised when shards cannot be merged into one consistent site."""
+
+def parse_shard(value):
+    """
+    Parse a 1-based "i/N" shard specification.
+    
+    Returns:
+        A tuple of (index, count)
+        
+    Raises:
+        ValueError: If the value is malformed or the index is out of range
+    """
+    index, sep, count = value.partition("/")
+    if not sep or not index.isdigit() or not count.isdigit():
+        raise ValueError(f"Shard must look like i/N: {value}")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}: {value}")
+    return index, count
+
+def shard_of(output_key, count):
+    """
+    Return the 1-based shard an output path belongs to.
+    
+    Uses a hash of the path rather than Python's randomised hash(), so every
+    process and machine makes the same assignment.
+    """
+    digest = hashlib.sha1(output_key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+def in_shard(output_key, shard):
+    """Check whether an output path belongs to a shard; shard None means all paths do."""
+    if shard is None:
+        return True
+    index, count = shard
+    return shard_of(output_key, count) == index
+
+def write_shard_info(shard_dir, shard):
+    """Record which shard a directory holds."""
+    index, count = shard
+    write_json({"index": index, "count": count}, os.path.join(shard_dir, SHARD_NAME))
+
+def write_sitemap(keys, dest_path, site_url="", basepath="/"):
+    """
+    Write a sitemap listing every HTML page among the output paths.
+    
+    Args:
+        keys: Output paths of the site
+        dest_path: Where to write the sitemap
+        site_url: Scheme and host prefixed to every URL, e.g. "https://example.com"
+        basepath: Base path the site is served under (default: "/")
+    """
+    prefix = site_url.rstrip("/") + "/" + basepath.strip("/")
+    prefix = prefix.rstrip("/") + "/"
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for key in sorted(keys):
+        if not key.endswith(".html"):
+            continue
+        # Pages are linked by directory, matching the site's own links
+        path = key[:-len("index.html")] if key.endswith("index.html") else key
+        lines.append(f"  <url><loc>{escape(prefix + path)}</loc></url>")
+    lines.append("</urlset>")
+    with open(dest_path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+def merge_shards(shard_dirs, out_dir, site_url="", basepath="/"):
+    """
+    Combine per-shard build outputs into one site.
+    
+    Every shard of the same build must be present exactly once, and no
+    output path may appear in two shards with different content. The merge
+    then writes the site-wide artifacts: the sitemap and the merged manifest.
+    
+    Args:
+        shard_dirs: Output directories written with --shard i/N
+        out_dir: Directory the merged site is written to; replaced if it exists
+        site_url: Scheme and host used in sitemap URLs
+        basepath: Base path the site is served under (default: "/")
+        
+    Returns:
+        The ManifestDiff of the merged site against the previous one in out_dir
+        
+    Raises:
+        ShardConflictError: If shards are missing, repeated or conflicting
+    """
+    infos = []
+    for shard_dir in shard_dirs:
+        try:
+            with open(os.path.join(shard_dir, SHARD_NAME)) as f:
+                infos.append(json.load(f))
+        except FileNotFoundError:
+            raise ShardConflictError(f"Not a shard output directory: {shard_dir}") from None
+    
+    counts = {info["count"] for info in infos}
+    if len(counts) != 1:
+        raise ShardConflictError(f"Shards come from builds split {sorted(counts)} ways")
+    count = counts.pop()
+    indexes = sorted(info["index"] for info in infos)
+    if indexes != list(range(1, count + 1)):
+        raise ShardConflictError(f"Expected shards 1..{count}, got {indexes}")
+    
+    owners = {}
+    merged = {}
+    for shard_dir in shard_dirs:
+        for key, digest in read_manifest(os.path.join(shard_dir, MANIFEST_NAME)).items():
+            if key in merged and merged[key] != digest:
+                raise ShardConflictError(f"{key} differs between {owners[key]} and {shard_dir}")
+            merged[key] = digest
+            owners[key] = shard_dir
+    
+    previous = read_manifest(os.path.join(out_dir, MANIFEST_NAME))
+    if os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    for key, shard_dir in sorted(owners.items()):
+        dest_path = os.path.join(out_dir, *key.split("/"))
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copy2(os.path.join(shard_dir, *key.split("/")), dest_path)
+    
+    os.makedirs(out_dir, exist_ok=True)
+    write_sitemap(merged, os.path.join(out_dir, SITEMAP_NAME), site_url, basepath)
+    logging.info(f"Merged {len(shard_dirs)} shards, {len(merged)} files into {out_dir}")
+    return write_build_manifest(out_dir, previous)
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Merge sharded build outputs into one site")
+    parser.add_argument("shard_dirs", nargs="+", metavar="SHARD_DIR")
+    parser.add_argument("--out", default=os.path.join(project_root, "docs"), help="Merged output directory")
+    parser.add_argument("--site-url", default="", help="Scheme and host for sitemap URLs")
+    parser.add_argument("--basepath", default="/")
+    args = parser.parse_args(argv)
+    try:
+        merge_shards(args.shard_dirs, args.out, args.site_url, args.basepath)
+    except ShardConflictError as e:
+        logging.error(f"Merge failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
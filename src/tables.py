@@ -0,0 +1,89 @@
+import re
+from htmlnode import ParentNode
+
+# Block type key for GitHub-style pipe tables
+TABLE = "table"
+
+# A delimiter row cell: dashes with optional colons marking the alignment
+DELIMITER_CELL = re.compile(r"^:?-+:?$")
+# Cells are separated by pipes that are not escaped with a backslash
+CELL_SEPARATOR = re.compile(r"(?<!\\)\|")
+
+def split_row(line):
+    """Split a table row into its stripped cell strings.
+
+    Args:
+        line: A table row such as "| a | b |"
+
+    Returns:
+        A list of cell strings with escaped pipes unescaped
+    """
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in CELL_SEPARATOR.split(line)]
+
+def column_alignments(delimiter_line):
+    """Return the alignment of each column, or None if the line is not a delimiter row.
+
+    Each alignment is "left", "right", "center" or None for the default.
+    """
+    alignments = []
+    for cell in split_row(delimiter_line):
+        if not DELIMITER_CELL.match(cell):
+            return None
+        if cell.startswith(":") and cell.endswith(":"):
+            alignments.append("center")
+        elif cell.endswith(":"):
+            alignments.append("right")
+        elif cell.startswith(":"):
+            alignments.append("left")
+        else:
+            alignments.append(None)
+    return alignments
+
+def is_table(block):
+    """Check whether a block is a pipe table.
+
+    Every line must start with a pipe and the second line must be a
+    delimiter row with one cell per header cell.
+    """
+    lines = block.split("\n")
+    if len(lines) < 2 or not all(line.startswith("|") for line in lines):
+        return False
+    alignments = column_alignments(lines[1])
+    return alignments is not None and len(alignments) == len(split_row(lines[0]))
+
+def table_row(cells, tag, alignments, inline):
+    """Build a tr node, padding or truncating cells to the column count."""
+    children = []
+    for i, alignment in enumerate(alignments):
+        text = cells[i] if i < len(cells) else ""
+        props = {"align": alignment} if alignment else None
+        children.append(ParentNode(tag, inline(text), props))
+    return ParentNode("tr", children)
+
+def table_to_html_node(block, inline):
+    """Convert a pipe table block to a table node.
+
+    Args:
+        block: A string containing a table block
+        inline: Callable converting inline markdown to a list of child nodes
+
+    Returns:
+        A ParentNode with a thead and, if there are body rows, a tbody
+    """
+    lines = block.split("\n")
+    alignments = column_alignments(lines[1])
+    header = table_row(split_row(lines[0]), "th", alignments, inline)
+    children = [ParentNode("thead", [header])]
+    body = [table_row(split_row(line), "td", alignments, inline) for line in lines[2:]]
+    if body:
+        children.append(ParentNode("tbody", body))
+    return ParentNode("table", children)
+
+def register(registry):
+    """Add pipe table support to a BlockRegistry."""
+    registry.register(TABLE, table_to_html_node, detector=is_table, prefixes="|")
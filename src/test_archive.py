@@ -0,0 +1,109 @@
+import os
+import tarfile
+import zipfile
+import tempfile
+import unittest
+
+from archive import FIXED_MTIME, SiteArchive, write_site_archive
+from builder import Site
+from css import CssStage
+from limits import DocumentLimits
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content_dir = os.path.join(root, "content")
+        self.static_dir = os.path.join(root, "static")
+        self.template_path = os.path.join(root, "template.html")
+        write(os.path.join(self.content_dir, "index.md"), "# Home\n\ntext")
+        write(os.path.join(self.content_dir, "blog", "post.md"), "# Post\n\n[home](/)")
+        write(os.path.join(self.static_dir, "images", "a.txt"), "static")
+        write(os.path.join(self.static_dir, "index.css"), "body {\n  color: red;\n}\n")
+        write(self.template_path,
+              '<html><head><title>{{ Title }}</title><link rel="stylesheet" href="/index.css"></head>'
+              '<body>{{ Content }}</body></html>')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def site(self, css=None):
+        return Site(self.content_dir, self.template_path, self.static_dir, css=css)
+
+    def test_tar_gz(self):
+        path = os.path.join(self.tmp.name, "site.tar.gz")
+        manifest = write_site_archive(self.site(), path)
+        with tarfile.open(path, "r:gz") as tar:
+            members = tar.getmembers()
+            self.assertEqual(
+                [m.name for m in members],
+                ["blog/post.html", "images/a.txt", "index.css", "index.html", "manifest.json"],
+            )
+            self.assertTrue(all(m.mtime == FIXED_MTIME and m.uid == 0 and m.uname == "" for m in members))
+            self.assertIn(b"<h1", tar.extractfile("index.html").read())
+            self.assertEqual(tar.extractfile("images/a.txt").read(), b"static")
+        self.assertEqual(sorted(manifest), ["blog/post.html", "images/a.txt", "index.css", "index.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "docs")))
+
+    def test_zip_matches_build(self):
+        path = os.path.join(self.tmp.name, "site.zip")
+        write_site_archive(self.site(), path)
+        expected = self.site().build()
+        with zipfile.ZipFile(path) as archive:
+            self.assertTrue(all(info.date_time == (1980, 1, 1, 0, 0, 0) for info in archive.infolist()))
+            for key, data in expected.items():
+                self.assertEqual(archive.read(key), data)
+
+    def test_css_outputs_are_archived(self):
+        path = os.path.join(self.tmp.name, "site.tar")
+        write_site_archive(self.site(CssStage(self.static_dir, inline_limit=0)), path)
+        with tarfile.open(path) as tar:
+            names = tar.getnames()
+        self.assertTrue(any(name.startswith("index.") and name != "index.css" and name.endswith(".css")
+                            for name in names))
+
+    def test_deterministic(self):
+        for name in ("a.tar.gz", "a.zip"):
+            first = os.path.join(self.tmp.name, "1-" + name)
+            second = os.path.join(self.tmp.name, "2-" + name)
+            write_site_archive(self.site(), first)
+            os.utime(os.path.join(self.static_dir, "images", "a.txt"), (0, 0))
+            write_site_archive(self.site(), second)
+            with open(first, 'rb') as f1, open(second, 'rb') as f2:
+                self.assertEqual(f1.read(), f2.read())
+
+    def test_page_over_limits_is_skipped(self):
+        write(os.path.join(self.content_dir, "big.md"), "# Big\n\n" + "x" * 200)
+        path = os.path.join(self.tmp.name, "site.zip")
+        site = Site(self.content_dir, self.template_path, self.static_dir, limits=DocumentLimits(max_chars=100))
+        with self.assertLogs(level="ERROR"):
+            manifest = write_site_archive(site, path)
+        self.assertNotIn("big.html", manifest)
+        self.assertIn("index.html", manifest)
+
+    def test_failed_build_leaves_no_archive(self):
+        path = os.path.join(self.tmp.name, "site.tar.gz")
+        with open(path, 'wb') as f:
+            f.write(b"previous")
+        with self.assertRaises(RuntimeError):
+            with SiteArchive(path) as archive:
+                archive.add_bytes("a.txt", b"a")
+                raise RuntimeError("build failed")
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b"previous")
+        self.assertEqual(os.listdir(self.tmp.name).count(".site.tar.gz.tmp"), 0)
+
+    def test_unsupported_extension(self):
+        with self.assertRaises(ValueError):
+            SiteArchive(os.path.join(self.tmp.name, "site.rar"))
+
+
+if __name__ == "__main__":
+    unittest.main()
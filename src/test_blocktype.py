@@ -83,6 +83,22 @@ class TestBlockType(unittest.TestCase):
         # Test invalid ordered list (no space after number)
         block = "1.Item without space"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+    
+    def test_nested_lists(self):
+        block = "- Item 1\n  - Nested\n    1. Deeper\n- Item 2"
+        self.assertEqual(block_to_block_type(block), BlockType.UNORDERED_LIST)
+        
+        # Nested items do not count towards the top-level numbering
+        block = "1. Item 1\n   - Nested\n\t2. Tabbed\n2. Item 2"
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+        
+        # Test invalid nested list (indented line without a marker)
+        block = "- Item 1\n  continued"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+    
+    def test_nested_quote(self):
+        block = "> Outer\n>> Inner\n> > Also inner"
+        self.assertEqual(block_to_block_type(block), BlockType.QUOTE)
 
 if __name__ == "__main__":
     unittest.main()
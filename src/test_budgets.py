@@ -0,0 +1,83 @@
+import os
+import json
+import tempfile
+import unittest
+
+from budgets import BudgetCheck, SizeBudgets, image_key
+from hooks import HookRegistry, Page
+from inventory import Inventory
+from shard import shard_of
+from utils import parse_document
+
+
+def page(dest_dir, key, markdown):
+    result = Page(os.path.join(dest_dir, "src.md"), os.path.join(dest_dir, *key.split("/")))
+    result.summary = parse_document(markdown)[1]
+    return result
+
+
+class TestBudgets(unittest.TestCase):
+    def test_image_key(self):
+        self.assertEqual(image_key("blog/a/index.html", "/images/x.png?v=1"), "images/x.png")
+        self.assertEqual(image_key("blog/a/index.html", "pic%20one.png"), "blog/a/pic one.png")
+        self.assertEqual(image_key("blog/a/index.html", "../../images/x.png"), "images/x.png")
+        for url in ("https://example.com/x.png", "//cdn/x.png", "data:image/png;base64,AA", ""):
+            self.assertIsNone(image_key("index.html", url))
+
+    def test_budgets_are_optional(self):
+        self.assertFalse(SizeBudgets())
+        self.assertTrue(SizeBudgets(max_site_bytes=0))
+
+    def test_check_and_report(self):
+        with tempfile.TemporaryDirectory() as dest_dir:
+            report_path = os.path.join(dest_dir, "report.json")
+            static_sizes = {"images/big.png": 500, "images/small.png": 10, "index.css": 40}
+            check = BudgetCheck(SizeBudgets(max_page_bytes=20, max_image_bytes=100, max_site_bytes=600),
+                                static_sizes, dest_dir, report_path)
+            registry = HookRegistry()
+            check.register(registry)
+            hooks = registry.bind()
+
+            html = "<p>" + "x" * 30 + "</p>"
+            self.assertEqual(hooks.pre_write(html, page(dest_dir, "a.html", "![a](/images/big.png) ![b](/images/big.png)")), html)
+            hooks.pre_write("<p>ok</p>", page(dest_dir, "b/index.html", "![s](/images/small.png) ![e](https://e.com/x.png)"))
+            check.add_static({"index.css": b"1234"})
+            hooks.post_build(dest_dir)
+
+            with open(report_path) as f:
+                report = json.load(f)
+            self.assertEqual(report["pages"], {
+                "a.html": {"html_bytes": 37, "image_bytes": 500},
+                "b/index.html": {"html_bytes": 9, "image_bytes": 10},
+            })
+            self.assertEqual(report["site_bytes"], 37 + 9 + 500 + 10 + 4)
+            self.assertEqual(
+                [(v["budget"], v["path"]) for v in report["violations"]],
+                [("page_html", "a.html"), ("page_images", "a.html")],
+            )
+            check.add_static({"extra.bin": b"x" * 100})
+            self.assertEqual(check.violations()[-1]["budget"], "site")
+
+    def test_sharded_image_lookup(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static_dir = os.path.join(tmp, "static")
+            os.makedirs(os.path.join(static_dir, "images"))
+            for name, size in (("photo.png", 300), ("index.css", 20)):
+                path = os.path.join(static_dir, "images" if name.endswith(".png") else "", name)
+                with open(path, 'wb') as f:
+                    f.write(b"x" * size)
+            inventory = Inventory(static_dir)
+            # Build the shard that does not hold the image
+            shard = (3 - shard_of("images/photo.png", 2), 2)
+            static_sizes = {key: size for key, (mtime_ns, size) in inventory.static.items()}
+            check = BudgetCheck(SizeBudgets(max_image_bytes=100), static_sizes, tmp,
+                                os.path.join(tmp, "report.json"), inventory.static_files(shard))
+            check.record_page("<p>x</p>", page(tmp, "a.html", "![p](/images/photo.png)"))
+            self.assertEqual(check.pages["a.html"], (8, 300))
+            self.assertEqual([v["budget"] for v in check.violations()], ["page_images"])
+            shard_static = sum(static_sizes[key] for key in inventory.static_files(shard))
+            self.assertEqual(check.site_bytes, 8 + shard_static)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import io
+import os
+import tempfile
+import unittest
+import contextlib
+
+from builder import Site, Template, apply_basepath, fill_template, output_path, parse_page, render_page
+from fixtures import write_file
+from limits import DocumentLimits
+from main import build_targets, parse_args
+
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css" /><main>{{ Content }}</main>'
+
+
+class TestBuilder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content_dir = os.path.join(root, "content")
+        self.static_dir = os.path.join(root, "static")
+        self.template_path = os.path.join(root, "template.html")
+        write_file(self.template_path, TEMPLATE)
+        write_file(os.path.join(self.content_dir, "index.md"), "# Home\n\n[Tom](/blog/tom)")
+        write_file(os.path.join(self.content_dir, "blog", "tom", "index.md"), "# Tom\n\nA < B")
+        write_file(os.path.join(self.content_dir, "about.md"), "No title here")
+        write_file(os.path.join(self.static_dir, "index.css"), "body {}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def site(self, basepath="/"):
+        return Site(self.content_dir, self.template_path, self.static_dir, basepath)
+
+    def test_output_path(self):
+        self.assertEqual(output_path("index.md"), "index.html")
+        self.assertEqual(output_path(os.path.join("blog", "index.md")), os.path.join("blog", "index.html"))
+        self.assertEqual(output_path("about.md"), "about.html")
+
+    def test_apply_basepath(self):
+        html = '<a href="/x"><img src="/y.png">'
+        self.assertEqual(apply_basepath(html, "/"), html)
+        self.assertEqual(apply_basepath(html, "/repo/"), '<a href="/repo/x"><img src="/repo/y.png">')
+
+    def test_template_matches_fill_template(self):
+        template = Template(TEMPLATE)
+        for basepath in ("/", "/repo"):
+            self.assertEqual(
+                template.render("T", "<p>body</p>", basepath),
+                fill_template(TEMPLATE, "T", "<p>body</p>", basepath),
+            )
+        self.assertEqual(Template("{{ Title }}-{{ Title }}").render("x", ""), "x-x")
+
+    def test_render_page(self):
+        html = render_page("# Hi\n\ntext", "{{ Title }}|{{ Content }}")
+        self.assertEqual(html, 'Hi|<div><h1 id="hi">Hi</h1><p>text</p></div>')
+
+    def test_summary_placeholders(self):
+        template = "{{ Toc }}|{{ WordCount }}|{{ ReadingTime }}|{{ Content }}"
+        title, html_content, summary = parse_page("# Hi\n\n## Part two\n\nsome text", fast=True)
+        expected = '<ul class="toc"><li class="toc-h1"><a href="#hi">Hi</a></li><li class="toc-h2"><a href="#part-two">Part two</a></li></ul>|5|1|'
+        self.assertEqual(fill_template(template, title, html_content, "/", summary), expected + html_content)
+        self.assertEqual(Template(template).render(title, html_content, "/", summary), expected + html_content)
+        self.assertEqual(Template(template).render(title, "", "/"), "|||")
+
+    def test_summary_counted_only_when_used(self):
+        title, html_content, summary = parse_page("# Hi\n\n- one [two](/t)\n  - three\n\n```\nnot counted\n```")
+        self.assertEqual(Template("{{ Content }}").render(title, html_content, "/", summary), html_content)
+        self.assertTrue(summary._pending)
+        self.assertEqual(Template("{{ WordCount }}").render(title, html_content, "/", summary), "4")
+        self.assertFalse(summary._pending)
+        self.assertEqual(summary.links, [("two", "/t")])
+
+    def test_build_in_memory(self):
+        output = self.site().build()
+        self.assertEqual(sorted(output), ["about.html", "blog/tom/index.html", "index.css", "index.html"])
+        self.assertEqual(output["index.css"], b"body {}")
+        self.assertEqual(
+            output["blog/tom/index.html"],
+            b'<title>Tom</title><link href="/index.css" /><main><div><h1 id="tom">Tom</h1><p>A &lt; B</p></div></main>',
+        )
+        self.assertIn(b"<title>Untitled Page</title>", output["about.html"])
+
+    def test_build_with_basepath(self):
+        output = self.site("/repo").build()
+        self.assertIn(b'href="/repo/index.css"', output["index.html"])
+        self.assertIn(b'href="/repo/blog/tom"', output["index.html"])
+
+    def test_build_targets_matches_single_builds(self):
+        outputs = self.site().build_targets(["/", "/repo", "/staging/"])
+        for basepath, output in outputs.items():
+            self.assertEqual(output, self.site(basepath).build())
+
+    def test_build_targets_skips_failing_pages(self):
+        write_file(os.path.join(self.content_dir, "big.md"), "# Big\n\n" + "x" * 200)
+        root_dest = os.path.join(self.tmp.name, "root")
+        repo_dest = os.path.join(self.tmp.name, "repo")
+        with self.assertLogs(level="ERROR"):
+            build_targets([("/", root_dest), ("/repo", repo_dest)], self.static_dir, self.content_dir,
+                          self.template_path, limits=DocumentLimits(max_chars=100))
+        for dest in (root_dest, repo_dest):
+            self.assertTrue(os.path.exists(os.path.join(dest, "index.html")))
+            self.assertFalse(os.path.exists(os.path.join(dest, "big.html")))
+
+    def test_invalid_target_is_a_usage_error(self):
+        with contextlib.redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit):
+            parse_args(["--target", "no-equals-sign"])
+        self.assertIn("BASEPATH=DIR", stderr.getvalue())
+
+    def test_write_targets(self):
+        root_dest = os.path.join(self.tmp.name, "root")
+        repo_dest = os.path.join(self.tmp.name, "repo")
+        self.site().write_targets([("/", root_dest), ("/repo", repo_dest)])
+        with open(os.path.join(repo_dest, "index.html"), 'rb') as f:
+            self.assertIn(b'href="/repo/index.css"', f.read())
+        with open(os.path.join(root_dest, "index.html"), 'rb') as f:
+            self.assertIn(b'href="/index.css"', f.read())
+
+    def test_fast_build_matches(self):
+        fast = Site(self.content_dir, self.template_path, self.static_dir, fast=True)
+        self.assertEqual(fast.build(), self.site().build())
+
+    def test_build_page(self):
+        key, data = self.site().build_page(os.path.join("blog", "tom", "index.md"))
+        self.assertEqual(key, "blog/tom/index.html")
+        self.assertIn(b'<h1 id="tom">Tom</h1>', data)
+
+    def test_write(self):
+        dest = os.path.join(self.tmp.name, "docs")
+        output = self.site().write(dest)
+        for key, data in output.items():
+            with open(os.path.join(dest, key), 'rb') as f:
+                self.assertEqual(f.read(), data)
+
+    def test_write_page(self):
+        dest = os.path.join(self.tmp.name, "docs")
+        site = self.site()
+        site.write(dest)
+        write_file(os.path.join(self.content_dir, "index.md"), "# Changed")
+        self.assertEqual(site.write_page("index.md", dest), "index.html")
+        with open(os.path.join(dest, "index.html"), 'rb') as f:
+            self.assertIn(b'<h1 id="changed">Changed</h1>', f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
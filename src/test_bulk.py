@@ -0,0 +1,49 @@
+import io
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from bulk import convert_record, convert_stream
+from limits import DocumentLimits
+
+
+def records(count):
+    return "".join(json.dumps({"id": i, "markdown": f"# Doc {i}\n\nbody **{i}**"}) + "\n" for i in range(count))
+
+
+class TestBulk(unittest.TestCase):
+    def test_convert_record(self):
+        self.assertEqual(
+            convert_record('{"id": "a", "markdown": "# Hi\\n\\ntext"}'),
+            {"id": "a", "html": '<div><h1 id="hi">Hi</h1><p>text</p></div>', "title": "Hi"},
+        )
+        self.assertEqual(convert_record('{"id": 2, "markdown": "x"}')["title"], None)
+
+    def test_invalid_records(self):
+        self.assertEqual(convert_record("nope")["id"], None)
+        self.assertIn("error", convert_record("nope"))
+        self.assertEqual(convert_record("[1]"), {"id": None, "error": "Record must be a JSON object"})
+        self.assertEqual(convert_record('{"id": 3}'), {"id": 3, "error": "Record has no markdown string"})
+        result = convert_record('{"id": 4, "markdown": "long"}', DocumentLimits(max_chars=2))
+        self.assertEqual(result["id"], 4)
+        self.assertIn("error", result)
+
+    def test_stream_in_process(self):
+        out = io.StringIO()
+        self.assertEqual(convert_stream(io.StringIO(records(5) + "\n"), out, batch_size=2), 5)
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r["id"] for r in results], list(range(5)))
+        self.assertEqual(results[3]["title"], "Doc 3")
+
+    def test_stream_on_executor_keeps_order(self):
+        expected = io.StringIO()
+        convert_stream(io.StringIO(records(50)), expected)
+        out = io.StringIO()
+        with ThreadPoolExecutor(4) as executor:
+            count = convert_stream(io.StringIO(records(50)), out, executor, batch_size=3, max_pending=2)
+        self.assertEqual(count, 50)
+        self.assertEqual(out.getvalue(), expected.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
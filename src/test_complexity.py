@@ -0,0 +1,118 @@
+import time
+import unittest
+
+from blocktype import block_to_block_type
+from limits import DocumentLimits, DocumentLimitError
+from textnode import TextNode, TextType
+from utils import (
+    extract_markdown_images,
+    extract_markdown_links,
+    markdown_to_html_node,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+
+# Sizes are chosen so the small input is well above timer noise while the
+# large one still finishes quickly on a linear implementation
+SMALL = 5_000
+FACTOR = 8
+# Linear code scales by about FACTOR; quadratic code by FACTOR ** 2
+MAX_RATIO = FACTOR * 3
+
+
+def best_time(func, arg, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+class TestComplexity(unittest.TestCase):
+    def assertLinear(self, func, make_input):
+        small = best_time(func, make_input(SMALL))
+        large = best_time(func, make_input(SMALL * FACTOR))
+        # Guard against a zero reading on very fast machines
+        ratio = large / max(small, 1e-6)
+        self.assertLess(ratio, MAX_RATIO, f"{func.__name__} scaled by {ratio:.1f}x for a {FACTOR}x input")
+
+    def test_unclosed_brackets_images(self):
+        self.assertLinear(extract_markdown_images, lambda n: "![" * n)
+
+    def test_unclosed_brackets_links(self):
+        self.assertLinear(extract_markdown_links, lambda n: "[a](" * n)
+
+    def test_many_brackets_inline(self):
+        self.assertLinear(text_to_textnodes, lambda n: "[" * n)
+
+    def test_many_underscores_inline(self):
+        self.assertLinear(text_to_textnodes, lambda n: "_" * n)
+
+    def test_many_backticks_inline(self):
+        self.assertLinear(text_to_textnodes, lambda n: "`" * n)
+
+    def test_many_images(self):
+        def split(text):
+            return split_nodes_image([TextNode(text, TextType.TEXT)])
+        self.assertLinear(split, lambda n: "x ![a](b.png)" * (n // 10))
+
+    def test_many_links(self):
+        def split(text):
+            return split_nodes_link([TextNode(text, TextType.TEXT)])
+        self.assertLinear(split, lambda n: "x [a](b)" * (n // 10))
+
+    def test_huge_list_block_type(self):
+        self.assertLinear(block_to_block_type, lambda n: "\n".join(f"{i}. item" for i in range(1, n // 5)))
+
+    def test_huge_heading_marker(self):
+        self.assertLinear(block_to_block_type, lambda n: "#" * n)
+
+    def test_very_long_line_document(self):
+        def render(markdown):
+            return markdown_to_html_node(markdown).to_html()
+        self.assertLinear(render, lambda n: "word **bold** _it_ `c` [l](u) " * (n // 30))
+
+    def test_huge_list_document(self):
+        def render(markdown):
+            return markdown_to_html_node(markdown).to_html()
+        self.assertLinear(render, lambda n: "\n".join("- item" for _ in range(n // 5)))
+
+    def test_nested_quote_document(self):
+        def render(markdown):
+            return markdown_to_html_node(markdown).to_html()
+        self.assertLinear(render, lambda n: "\n".join(">" * (1 + i % 20) + " q" for i in range(n // 12)))
+
+    def test_deep_nesting_document(self):
+        # Deeper than the recursion limit, in parsing and in serialization
+        depth = 3000
+        nested_list = "\n".join(" " * i + "- x" for i in range(depth))
+        self.assertEqual(markdown_to_html_node(nested_list).to_html().count("<ul>"), depth)
+        self.assertEqual(markdown_to_html_node(">" * depth + " q").to_html().count("<blockquote>"), depth)
+
+
+class TestDocumentLimits(unittest.TestCase):
+    def test_size_limit(self):
+        limits = DocumentLimits(max_chars=10)
+        with self.assertRaises(DocumentLimitError):
+            markdown_to_html_node("x" * 11, limits)
+
+    def test_size_limit_allows_small_documents(self):
+        limits = DocumentLimits(max_chars=10)
+        self.assertEqual(markdown_to_html_node("hello", limits).to_html(), "<div><p>hello</p></div>")
+
+    def test_time_limit(self):
+        limits = DocumentLimits(max_seconds=0)
+        with self.assertRaises(DocumentLimitError):
+            markdown_to_html_node("one\n\ntwo", limits)
+
+    def test_no_limits(self):
+        limits = DocumentLimits()
+        self.assertEqual(markdown_to_html_node("hello", limits).to_html(), "<div><p>hello</p></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
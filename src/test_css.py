@@ -0,0 +1,76 @@
+import os
+import hashlib
+import tempfile
+import unittest
+
+from builder import Site
+from css import CssStage, minify_css
+from fixtures import write_file
+
+STYLESHEET = """/* Site styles */
+body {
+  font-family: "Luminari",  "Georgia", serif;
+  margin : 0 auto;
+}
+
+a:hover, nav > a {
+  content: "keep  ;  this";
+}
+"""
+MINIFIED = 'body{font-family:"Luminari","Georgia",serif;margin :0 auto}a:hover,nav>a{content:"keep  ;  this"}'
+HASHED = "index." + hashlib.sha256(MINIFIED.encode("utf-8")).hexdigest()[:10] + ".css"
+TEMPLATE = '<head><link href="/index.css" rel="stylesheet" /><link href="https://x.test/a.css" rel="stylesheet" /></head>{{ Content }}'
+
+
+class TestMinifyCss(unittest.TestCase):
+    def test_minify(self):
+        self.assertEqual(minify_css(STYLESHEET), MINIFIED)
+
+    def test_keeps_descendant_pseudo_class(self):
+        self.assertEqual(minify_css("div :first-child { color: red; }"), "div :first-child{color:red}")
+
+
+class TestCssStage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static_dir = os.path.join(self.tmp.name, "static")
+        self.content_dir = os.path.join(self.tmp.name, "content")
+        self.template_path = os.path.join(self.tmp.name, "template.html")
+        write_file(os.path.join(self.static_dir, "index.css"), STYLESHEET)
+        write_file(os.path.join(self.content_dir, "index.md"), "# Home")
+        write_file(self.template_path, TEMPLATE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_inlines_small_stylesheet(self):
+        stage = CssStage(self.static_dir)
+        self.assertEqual(
+            stage.apply(TEMPLATE),
+            f'<head><style>{MINIFIED}</style><link href="https://x.test/a.css" rel="stylesheet" /></head>{{{{ Content }}}}',
+        )
+        self.assertEqual(stage.outputs(), {"index.css": MINIFIED.encode("utf-8")})
+
+    def test_links_large_stylesheet_by_hash(self):
+        stage = CssStage(self.static_dir, inline_limit=10)
+        html = stage.apply(TEMPLATE)
+        outputs = stage.outputs()
+        self.assertEqual(sorted(outputs), [HASHED, "index.css"])
+        self.assertIn(f'<link href="/{HASHED}" rel="stylesheet" />', html)
+        self.assertEqual(outputs[HASHED], MINIFIED.encode("utf-8"))
+
+    def test_minifies_once(self):
+        stage = CssStage(self.static_dir)
+        self.assertIs(stage.apply(TEMPLATE), stage.apply(TEMPLATE))
+        stage.outputs()
+        self.assertEqual(len(stage._minified), 1)
+
+    def test_site_build(self):
+        site = Site(self.content_dir, self.template_path, self.static_dir, css=CssStage(self.static_dir, 10))
+        output = site.build()
+        self.assertEqual(sorted(output), [HASHED, "index.css", "index.html"])
+        self.assertIn(f'href="/{HASHED}"'.encode("utf-8"), output["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
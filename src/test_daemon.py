@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from builder import Site
+from daemon import BuildDaemon, BuildState, send_request
+from fixtures import write_file
+
+
+def touch_later(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestBuildState(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content_dir = os.path.join(root, "content")
+        self.static_dir = os.path.join(root, "static")
+        self.template_path = os.path.join(root, "template.html")
+        self.dest = os.path.join(root, "docs")
+        write_file(self.template_path, "<title>{{ Title }}</title>{{ Content }}")
+        write_file(os.path.join(self.content_dir, "index.md"), "# Home\n\n[a](/a)")
+        write_file(os.path.join(self.content_dir, "blog", "index.md"), "# Blog")
+        write_file(os.path.join(self.static_dir, "index.css"), "body {}")
+        self.state = BuildState(self.content_dir, self.template_path, self.static_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, *parts):
+        with open(os.path.join(self.dest, *parts), 'rb') as f:
+            return f.read()
+
+    def test_build_matches_site(self):
+        result = self.state.build(self.dest, "/repo")
+        self.assertEqual((result["pages"], result["parsed"], result["written"]), (2, 2, 3))
+        expected = Site(self.content_dir, self.template_path, self.static_dir, "/repo").build()
+        for key, data in expected.items():
+            self.assertEqual(self.read(*key.split("/")), data)
+
+    def test_incremental_build(self):
+        self.state.build(self.dest)
+        result = self.state.build(self.dest)
+        self.assertEqual((result["parsed"], result["written"]), (0, 0))
+
+        page = os.path.join(self.content_dir, "blog", "index.md")
+        write_file(page, "# Changed")
+        touch_later(page)
+        result = self.state.build(self.dest)
+        self.assertEqual((result["parsed"], result["written"]), (1, 1))
+        self.assertIn(b'<h1 id="changed">Changed</h1>', self.read("blog", "index.html"))
+
+    def test_template_change_rewrites_without_parsing(self):
+        self.state.build(self.dest)
+        write_file(self.template_path, "<main>{{ Content }}</main>")
+        touch_later(self.template_path)
+        result = self.state.build(self.dest)
+        self.assertEqual((result["parsed"], result["written"]), (0, 2))
+
+    def test_new_directory_and_removed_output(self):
+        self.state.build(self.dest)
+        write_file(os.path.join(self.content_dir, "blog", "new", "post.md"), "# New")
+        result = self.state.build(self.dest)
+        self.assertEqual((result["parsed"], result["written"]), (1, 1))
+        self.assertIn(b"New", self.read("blog", "new", "post.html"))
+        # Directories are made again when the output directory was deleted
+        shutil.rmtree(self.dest)
+        result = self.state.build(self.dest)
+        self.assertEqual(result["written"], 4)
+        self.assertIn(b"New", self.read("blog", "new", "post.html"))
+
+    def test_alternating_basepaths(self):
+        # Only the home page has a link to rewrite; the first build also
+        # writes the blog page and the stylesheet
+        for basepath, written in (("/", 3), ("/repo", 1), ("/", 1)):
+            result = self.state.build(self.dest, basepath)
+            self.assertEqual(result["written"], written)
+        self.assertIn(b'href="/a"', self.read("index.html"))
+
+    def test_removed_page(self):
+        self.state.build(self.dest)
+        os.remove(os.path.join(self.content_dir, "blog", "index.md"))
+        result = self.state.build(self.dest)
+        self.assertEqual(result["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "index.html")))
+
+    def test_daemon_round_trip(self):
+        socket_path = os.path.join(self.tmp.name, "daemon.sock")
+        server = BuildDaemon(socket_path, self.state)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            response = send_request({"command": "build", "dest": self.dest}, socket_path)
+            self.assertTrue(response["ok"])
+            self.assertEqual(response["pages"], 2)
+            response = send_request({"command": "render", "path": "index.md", "basepath": "/x"}, socket_path)
+            self.assertIn('href="/x/a"', response["html"])
+            response = send_request({"command": "nope"}, socket_path)
+            self.assertFalse(response["ok"])
+            self.assertTrue(send_request({"command": "shutdown"}, socket_path)["ok"])
+            thread.join(5)
+        finally:
+            server.server_close()
+        self.assertFalse(os.path.exists(socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
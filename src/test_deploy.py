@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from deploy import deploy
+from manifest import write_build_manifest
+from fixtures import write_file
+
+
+def read_file(path):
+    with open(path) as f:
+        return f.read()
+
+
+class TestDeploy(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.build = os.path.join(self.tmp.name, "docs")
+        self.target = os.path.join(self.tmp.name, "target")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_first_deploy_copies_everything(self):
+        write_file(os.path.join(self.build, "index.html"), "home")
+        write_file(os.path.join(self.build, "blog", "index.html"), "blog")
+        write_build_manifest(self.build, {})
+        diff = deploy(self.build, self.target)
+        self.assertEqual(diff.added, ["blog/index.html", "index.html"])
+        self.assertEqual(read_file(os.path.join(self.target, "blog", "index.html")), "blog")
+
+    def test_applies_only_the_delta(self):
+        write_file(os.path.join(self.build, "index.html"), "home")
+        write_file(os.path.join(self.build, "old", "index.html"), "old")
+        write_file(os.path.join(self.build, "same.css"), "css")
+        write_build_manifest(self.build, {})
+        deploy(self.build, self.target)
+
+        # A file changed behind deploy's back is left alone unless the build changed it
+        write_file(os.path.join(self.target, "same.css"), "untouched")
+        os.remove(os.path.join(self.build, "old", "index.html"))
+        write_file(os.path.join(self.build, "index.html"), "new home")
+        write_file(os.path.join(self.build, "new.html"), "new")
+        write_build_manifest(self.build, {})
+
+        diff = deploy(self.build, self.target)
+        self.assertEqual((diff.added, diff.modified, diff.removed), (["new.html"], ["index.html"], ["old/index.html"]))
+        self.assertEqual(read_file(os.path.join(self.target, "index.html")), "new home")
+        self.assertEqual(read_file(os.path.join(self.target, "same.css")), "untouched")
+        self.assertFalse(os.path.exists(os.path.join(self.target, "old")))
+
+    def test_requires_manifest(self):
+        os.makedirs(self.build)
+        with self.assertRaises(FileNotFoundError):
+            deploy(self.build, self.target)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import random
+import unittest
+
+from blocktype import BlockType
+from fastrender import inline_to_html, markdown_to_html, markdown_to_html_with_summary
+from htmlnode import LeafNode
+from inlinecache import BlockCache, InlineCache
+from registry import BlockRegistry
+from utils import default_registry, markdown_to_html_node, parse_document, text_to_children
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "content")
+
+# Documents taken from the markdown_to_html_node tests, plus edge cases
+CORPUS = [
+    "",
+    "This is **bolded** paragraph\ntext in a p\ntag here\n\nThis is another paragraph with _italic_ text and `code` here",
+    "```\nThis is text that _should_ remain\nthe **same** even with inline stuff\n```",
+    "# Heading 1\n\n## Heading 2 with **bold**\n\n### Heading 3 with `code`",
+    "> This is a quote\n> with multiple lines\n> and **bold** text",
+    "- Item 1 with **bold**\n- Item 2 with _italic_\n- Item 3 with `code`",
+    "1. First item with **bold**\n2. Second item with _italic_\n3. Third item with `code`",
+    "Use a < b & c [here](/search?a=1&b=\"2\")\n\n```\nif a < b:\n    print(\"<tag>\")\n```",
+    "| a | b |\n| :- | -: |\n| **1** | 2 |",
+    "![alt \"q\"](/img.png) and [link](/x) and ![](/empty.png)",
+    "unclosed **bold and _italic and `code",
+    "#######too many hashes\n\n#\n\n# ",
+    "```python\nprint(1)\n```",
+    "- a\n  - **b**\n    1. c\n  1. d\n- e\n\n1. f\n   - g\n2. h",
+    "> a\n>> _b_\n> > c\n> d\n>>> e",
+    "# [Ref][] heading\n\n[a][ref] ![b][Ref] [c][none](/in) [d][]\n\n[ref]: /r\n[D]: /d",
+]
+
+INLINE_PIECES = ["word", "**bold**", "_it_", "`code`", "[l](/u)", "![i](/p.png)", "<", "&", '"', "**", "_", "`", "[", "]("]
+BLOCK_MAKERS = [
+    lambda r: " ".join(r.choice(INLINE_PIECES) for _ in range(r.randint(1, 12))),
+    lambda r: "#" * r.randint(1, 7) + " " + r.choice(INLINE_PIECES),
+    lambda r: "```\n" + " ".join(r.choice(INLINE_PIECES) for _ in range(5)) + "\n```",
+    lambda r: "\n".join("> " + r.choice(INLINE_PIECES) for _ in range(r.randint(1, 4))),
+    lambda r: "\n".join("- " + r.choice(INLINE_PIECES) for _ in range(r.randint(1, 4))),
+    lambda r: "\n".join(f"{i}. " + r.choice(INLINE_PIECES) for i in range(1, r.randint(2, 5))),
+    lambda r: "- " + r.choice(INLINE_PIECES) + "".join(
+        "\n" + " " * (2 * r.randint(0, 3)) + r.choice(("- ", "1. ")) + r.choice(INLINE_PIECES)
+        for _ in range(r.randint(1, 6))
+    ),
+    lambda r: "\n".join(">" * r.randint(1, 4) + " " + r.choice(INLINE_PIECES) for _ in range(r.randint(1, 5))),
+    lambda r: "| " + r.choice(INLINE_PIECES) + " |\n| --- |\n| " + r.choice(INLINE_PIECES) + " |",
+]
+
+
+def synthetic_corpus(count, seed=1234):
+    r = random.Random(seed)
+    return ["\n\n".join(r.choice(BLOCK_MAKERS)(r) for _ in range(r.randint(1, 8))) for _ in range(count)]
+
+
+def summary_facts(summary):
+    return (summary.title, summary.headings, summary.word_count, summary.links, summary.images)
+
+
+def content_corpus():
+    documents = []
+    for root, dirs, files in os.walk(CONTENT_DIR):
+        for name in files:
+            if name.endswith(".md"):
+                with open(os.path.join(root, name)) as f:
+                    documents.append(f.read())
+    return documents
+
+
+class TestFastRender(unittest.TestCase):
+    def assertSameAsTree(self, markdown, registry=None):
+        self.assertEqual(
+            markdown_to_html(markdown, registry=registry),
+            markdown_to_html_node(markdown, registry=registry).to_html(),
+            repr(markdown),
+        )
+        html, summary = markdown_to_html_with_summary(markdown, registry=registry)
+        node, tree_summary = parse_document(markdown, registry=registry)
+        self.assertEqual(html, node.to_html(), repr(markdown))
+        self.assertEqual(summary_facts(summary), summary_facts(tree_summary), repr(markdown))
+
+    def test_corpus(self):
+        for markdown in CORPUS:
+            self.assertSameAsTree(markdown)
+
+    def test_content(self):
+        for markdown in content_corpus():
+            self.assertSameAsTree(markdown)
+
+    def test_synthetic(self):
+        for markdown in synthetic_corpus(500):
+            self.assertSameAsTree(markdown)
+
+    def test_references_bypass_caches(self):
+        inline_cache = InlineCache()
+        block_cache = BlockCache()
+        for url in ("/one", "/two"):
+            markdown = f"[x][r] and **b**\n\n[r]: {url}"
+            self.assertEqual(markdown_to_html(markdown, inline_cache=inline_cache, block_cache=block_cache),
+                             f'<div><p><a href="{url}">x</a> and <b>b</b></p></div>')
+            self.assertEqual(parse_document(markdown, inline_cache=inline_cache, block_cache=block_cache)[0].to_html(),
+                             f'<div><p><a href="{url}">x</a> and <b>b</b></p></div>')
+        self.assertEqual(markdown_to_html("[x][r]", inline_cache=inline_cache, block_cache=block_cache),
+                         "<div><p>[x][r]</p></div>")
+
+    def test_inline_to_html(self):
+        self.assertEqual(inline_to_html("a **b** <c>"), "".join(n.to_html() for n in text_to_children("a **b** <c>")))
+
+    def test_custom_renderer_uses_tree_path(self):
+        registry = BlockRegistry(default_registry.detect)
+        registry.register(BlockType.PARAGRAPH, lambda block, inline: LeafNode("span", block))
+        self.assertEqual(markdown_to_html("a < b", registry=registry), "<div><span>a &lt; b</span></div>")
+        self.assertSameAsTree("a < b", registry)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import sys
+import types
+import tempfile
+import unittest
+
+from hooks import HookRegistry, NO_HOOKS, POST_BUILD, POST_PARSE, POST_RENDER, PRE_READ, PRE_WRITE, load_plugins
+from htmlnode import LeafNode
+from main import generate_page
+
+
+class TestHooks(unittest.TestCase):
+    def test_unused_points_are_none(self):
+        hooks = HookRegistry().bind()
+        for name in ("pre_read", "post_parse", "post_render", "pre_write", "post_build"):
+            self.assertIsNone(getattr(hooks, name))
+            self.assertIsNone(getattr(NO_HOOKS, name))
+
+    def test_chain_and_timing(self):
+        registry = HookRegistry()
+        registry.register(POST_RENDER, lambda html, page: html + "a", name="first")
+        registry.register(POST_RENDER, lambda html, page: html + "b", name="second")
+        hooks = registry.bind()
+        self.assertEqual(hooks.post_render("x", None), "xab")
+        self.assertEqual(registry.timings[(POST_RENDER, "first")][0], 1)
+        self.assertEqual(len(registry.report()), 2)
+        self.assertIn("hook post-render first: 1 calls", "\n".join(registry.report()))
+
+    def test_unnamed_hooks_keep_separate_timings(self):
+        registry = HookRegistry()
+        registry.register(PRE_WRITE, lambda html, page: html + "a")
+        registry.register(PRE_WRITE, lambda html, page: html + "b")
+        registry.bind().pre_write("x", None)
+        names = sorted(name for point, name in registry.timings)
+        self.assertEqual(names, ["test_hooks.TestHooks.test_unnamed_hooks_keep_separate_timings.<locals>.<lambda>",
+                                 "test_hooks.TestHooks.test_unnamed_hooks_keep_separate_timings.<locals>.<lambda>#2"])
+        self.assertEqual([calls for calls, seconds in registry.timings.values()], [1, 1])
+        self.assertEqual(len(registry.report()), 2)
+
+    def test_unknown_point(self):
+        with self.assertRaises(ValueError):
+            HookRegistry().register("post-everything", lambda value, page: value)
+
+    def test_load_plugins(self):
+        plugin = types.ModuleType("example_plugin")
+        plugin.register = lambda hooks: hooks.register(POST_BUILD, lambda dest_dir, page: dest_dir)
+        sys.modules["example_plugin"] = plugin
+        try:
+            registry = load_plugins(["example_plugin"])
+        finally:
+            del sys.modules["example_plugin"]
+        self.assertIsNotNone(registry.bind().post_build)
+
+    def test_generate_page(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "page.md")
+            other = os.path.join(root, "other.md")
+            template = os.path.join(root, "template.html")
+            dest = os.path.join(root, "out", "page.html")
+            for path, content in ((source, "# Page"), (other, "# Other\n\nbody"), (template, "<t>{{ Title }}</t>{{ Content }}")):
+                with open(path, 'w') as f:
+                    f.write(content)
+            registry = HookRegistry()
+            seen = []
+            registry.register(PRE_READ, lambda path, page: other)
+            registry.register(POST_PARSE, lambda node, page: node.children.append(LeafNode("hr", "")) or node)
+            registry.register(POST_RENDER, lambda html, page: seen.append(page.summary.title) or html)
+            registry.register(PRE_WRITE, lambda html, page: html.upper())
+            generate_page(source, template, dest, fast=True, hooks=registry.bind())
+            with open(dest) as f:
+                self.assertEqual(f.read(), '<T>OTHER</T><DIV><H1 ID="OTHER">OTHER</H1><P>BODY</P><HR></HR></DIV>')
+            self.assertEqual(seen, ["Other"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from builder import fill_template
+from htmlmin import HtmlMinifier, minify_html
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_collapses_whitespace_and_comments(self):
+        self.assertEqual(
+            minify_html('<ul>\n  <li class="a">x  y</li>\n  <!-- note -->\n  <li>z</li>\n</ul>'),
+            "<ul><li class=a>x y</li><li>z</li></ul>",
+        )
+        self.assertEqual(minify_html("<p>a <b>b</b> <!-- c --> <i>d</i>\n</p>"), "<p>a <b>b</b> <i>d</i></p>")
+        self.assertEqual(minify_html("<!--[if IE]><p>old</p><![endif]-->"), "<!--[if IE]><p>old</p><![endif]-->")
+
+    def test_attributes(self):
+        self.assertEqual(
+            minify_html('<meta charset="utf-8" />\n<input disabled value=\'a"b\' data-x="a b">'),
+            "<meta charset=utf-8><input disabled value='a\"b' data-x=\"a b\">",
+        )
+        # href and src keep their quotes for apply_basepath
+        self.assertEqual(minify_html('<a href="/x" title="t">x</a>'), '<a href="/x" title=t>x</a>')
+
+    def test_preserves_pre_and_code(self):
+        html = "<pre>\n  a  <b> b </b>\n</pre> <code> c  d </code>\n<script>\nif (a  <  b) {}\n</script>"
+        self.assertEqual(
+            minify_html(html),
+            "<pre>\n  a  <b> b </b>\n</pre><code> c  d </code><script>\nif (a  <  b) {}\n</script>",
+        )
+
+    def test_template(self):
+        template = (
+            "<!doctype html>\n<html>\n  <head>\n    <title>{{ Title }}</title>\n"
+            '    <link href="/index.css" rel="stylesheet" />\n  </head>\n\n'
+            "  <body>\n    <article>{{ Content }}</article>\n  </body>\n</html>"
+        )
+        minifier = HtmlMinifier()
+        minified = minifier.apply(template)
+        self.assertIs(minifier.apply(template), minified)
+        self.assertEqual(
+            fill_template(minified, "T", "<pre><code>x\n  y</code></pre>", "/base"),
+            '<!doctype html><html><head><title>T</title><link href="/base/index.css" rel=stylesheet></head>'
+            "<body><article><pre><code>x\n  y</code></pre></article></body></html>",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
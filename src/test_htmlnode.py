@@ -1,6 +1,6 @@
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, RawNode, escape_text, escape_attribute
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -79,5 +79,48 @@ class TestHTMLNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_escape_text(self):
+        self.assertEqual(escape_text("a < b && c > d"), "a &lt; b &amp;&amp; c &gt; d")
+        self.assertEqual(escape_text('"quoted"'), '"quoted"')
+        # Strings without special characters come back unchanged
+        text = "nothing to escape"
+        self.assertIs(escape_text(text), text)
+
+    def test_escape_attribute(self):
+        self.assertEqual(escape_attribute('a"b<c>&'), "a&quot;b&lt;c&gt;&amp;")
+
+    def test_leaf_to_html_escapes_value(self):
+        node = LeafNode("p", "1 < 2")
+        self.assertEqual(node.to_html(), "<p>1 &lt; 2</p>")
+        node = LeafNode(None, "<script>")
+        self.assertEqual(node.to_html(), "&lt;script&gt;")
+
+    def test_props_escape_values(self):
+        node = LeafNode("a", "link", {"href": 'https://example.com/?q="x"&y=1'})
+        self.assertEqual(node.to_html(), '<a href="https://example.com/?q=&quot;x&quot;&amp;y=1">link</a>')
+
+    def test_raw_node_is_trusted(self):
+        node = ParentNode("div", [RawNode("<b>raw</b>"), LeafNode(None, "<b>")])
+        self.assertEqual(node.to_html(), "<div><b>raw</b>&lt;b&gt;</div>")
+
+    def test_deep_nesting_to_html(self):
+        node = LeafNode(None, "x")
+        for _ in range(5000):
+            node = ParentNode("b", [node])
+        self.assertEqual(node.to_html(), "<b>" * 5000 + "x" + "</b>" * 5000)
+
+    def test_subclass_to_html_is_used(self):
+        class Upper(ParentNode):
+            def to_html(self):
+                return super().to_html().upper()
+        node = ParentNode("div", [Upper("p", [LeafNode(None, "a")]), LeafNode("i", "b")])
+        self.assertEqual(node.to_html(), "<div><P>A</P><i>b</i></div>")
+
+    def test_parent_to_html_errors(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode(None, [])]).to_html()
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode("p", None)]).to_html()
+
 if __name__ == "__main__":
     unittest.main()
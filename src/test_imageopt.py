@@ -0,0 +1,75 @@
+import os
+import zlib
+import struct
+import tempfile
+import unittest
+
+from imageopt import ImageStage, optimize_png, read_chunks, write_chunk, PNG_SIGNATURE
+
+
+def make_png(width=64, height=64, extra=(), level=0):
+    """A greyscale PNG with compressible rows, stored at the given zlib level."""
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    raw = b"".join(b"\x00" + bytes((x * 4 + y) % 256 for x in range(width)) for y in range(height))
+    chunks = [write_chunk(b"IHDR", header)]
+    chunks.extend(write_chunk(chunk_type, data) for chunk_type, data in extra)
+    stream = zlib.compress(raw, level)
+    chunks.append(write_chunk(b"IDAT", stream[:100]))
+    chunks.append(write_chunk(b"IDAT", stream[100:]))
+    chunks.append(write_chunk(b"IEND", b""))
+    return PNG_SIGNATURE + b"".join(chunks), raw
+
+
+def image_data(png):
+    return zlib.decompress(b"".join(data for chunk_type, data in read_chunks(png) if chunk_type == b"IDAT"))
+
+
+class TestOptimizePng(unittest.TestCase):
+    def test_recompresses_losslessly(self):
+        png, raw = make_png(extra=[(b"tEXt", b"Comment\x00hello"), (b"gAMA", struct.pack(">I", 45455))])
+        optimized = optimize_png(png)
+        self.assertLess(len(optimized), len(png))
+        self.assertEqual(image_data(optimized), raw)
+        self.assertEqual([t for t, _ in read_chunks(optimized)], [b"IHDR", b"gAMA", b"IDAT", b"IEND"])
+
+    def test_keeps_original_when_not_smaller(self):
+        png, raw = make_png(level=9)
+        optimized = optimize_png(optimize_png(png))
+        self.assertIs(optimize_png(optimized), optimized)
+
+    def test_leaves_other_files_alone(self):
+        for data in (b"not a png", PNG_SIGNATURE + b"\x00\x00", make_png()[0][:-20]):
+            self.assertIs(optimize_png(data), data)
+        animated, raw = make_png(extra=[(b"acTL", struct.pack(">II", 1, 0))])
+        self.assertIs(optimize_png(animated), animated)
+
+
+class TestImageStage(unittest.TestCase):
+    def test_write_and_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            static_dir = os.path.join(tmp, "static")
+            dest_dir = os.path.join(tmp, "docs")
+            cache_dir = os.path.join(tmp, "cache")
+            png, raw = make_png()
+            for directory in (static_dir, dest_dir):
+                os.makedirs(os.path.join(directory, "images"))
+                with open(os.path.join(directory, "images", "a.png"), 'wb') as f:
+                    f.write(png)
+                with open(os.path.join(directory, "style.css"), 'w') as f:
+                    f.write("a{}")
+
+            stage = ImageStage(static_dir, cache_dir, workers=1)
+            stage.write(dest_dir, ["images/a.png", "style.css"])
+            self.assertEqual(stage.optimized, 1)
+            with open(os.path.join(dest_dir, "images", "a.png"), 'rb') as f:
+                written = f.read()
+            self.assertLess(len(written), len(png))
+            self.assertEqual(image_data(written), raw)
+
+            again = ImageStage(static_dir, cache_dir, workers=1)
+            self.assertEqual(again.outputs(["images/a.png"]), {"images/a.png": written})
+            self.assertEqual(again.optimized, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
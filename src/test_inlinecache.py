@@ -0,0 +1,94 @@
+import unittest
+
+from fastrender import markdown_to_html, markdown_to_html_with_summary
+from inlinecache import BlockCache, InlineCache
+from utils import markdown_to_html_node, parse_document
+
+BOILERPLATE = "- [Home](/)\n- [Blog](/blog)\n- Gandalf"
+
+
+class TestInlineCache(unittest.TestCase):
+    def test_lookup_memoizes(self):
+        cache = InlineCache()
+        calls = []
+
+        def compute(text):
+            calls.append(text)
+            return text.upper()
+
+        self.assertEqual(cache.lookup("k", "abc", compute), "ABC")
+        self.assertEqual(cache.lookup("k", "abc", compute), "ABC")
+        self.assertEqual(calls, ["abc"])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_kinds_are_separate(self):
+        cache = InlineCache()
+        self.assertEqual(cache.lookup("a", "x", lambda text: 1), 1)
+        self.assertEqual(cache.lookup("b", "x", lambda text: 2), 2)
+
+    def test_bounded(self):
+        cache = InlineCache(max_entries=2)
+        for text in ("a", "b", "c"):
+            cache.lookup("k", text, str.upper)
+        self.assertEqual(len(cache), 2)
+        cache.lookup("k", "a", str.upper)
+        self.assertEqual(cache.hits, 0)
+
+    def test_long_text_not_cached(self):
+        cache = InlineCache(max_text_length=3)
+        cache.lookup("k", "long text", str.upper)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.misses, 0)
+
+    def test_shared_across_documents(self):
+        cache = InlineCache()
+        pages = [f"# Page {i}\n\n{BOILERPLATE}" for i in range(10)]
+        for page in pages:
+            self.assertEqual(
+                markdown_to_html_node(page, inline_cache=cache).to_html(),
+                markdown_to_html_node(page).to_html(),
+            )
+        # Three boilerplate items repeat on nine of the ten pages
+        self.assertEqual(cache.hits, 27)
+        self.assertIn("27 hits", cache.stats())
+
+    def test_fused_renderer(self):
+        cache = InlineCache()
+        for i in range(3):
+            page = f"# Page {i}\n\n{BOILERPLATE}\n\n| a |\n| - |\n| **b** |"
+            self.assertEqual(markdown_to_html(page, inline_cache=cache), markdown_to_html_node(page).to_html())
+        self.assertGreater(cache.hits, 0)
+
+
+
+class TestBlockCache(unittest.TestCase):
+    def page(self, edited=""):
+        blocks = [f"## Section\n\nParagraph {i} with [a link](/{i}){edited if i == 5 else ''}" for i in range(10)]
+        return "# Title\n\n" + "\n\n".join(blocks) + "\n\n| a |\n| - |\n| b |"
+
+    def test_only_changed_blocks_rerender(self):
+        cache = BlockCache()
+        markdown_to_html(self.page(), block_cache=cache)
+        # One heading, one distinct section heading, ten paragraphs and a table
+        self.assertEqual(cache.misses, 13)
+        html, summary = markdown_to_html_with_summary(self.page(" edited"), block_cache=cache)
+        self.assertEqual(cache.misses, 14)
+        expected_html, expected = markdown_to_html_with_summary(self.page(" edited"))
+        self.assertEqual(html, expected_html)
+        self.assertEqual(summary.headings, expected.headings)
+        self.assertEqual(summary.headings[2][2], "section-1")
+        self.assertEqual((summary.title, summary.word_count, summary.links), (expected.title, expected.word_count, expected.links))
+        self.assertIn("block cache:", cache.stats())
+
+    def test_tree_path_splices_cached_html(self):
+        cache = BlockCache()
+        for _ in range(2):
+            node, summary = parse_document(self.page(), block_cache=cache)
+            self.assertEqual(node.to_html(), markdown_to_html_node(self.page()).to_html())
+            self.assertEqual(summary.title, "Title")
+        self.assertEqual(cache.misses, 13)
+
+
+if __name__ == "__main__":
+    unittest.main()
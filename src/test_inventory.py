@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+
+from inventory import Inventory, scan_files
+from fixtures import write_file
+
+
+class TestInventory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.content_dir = os.path.join(root, "content")
+        self.static_dir = os.path.join(root, "static")
+        self.dest = os.path.join(root, "docs")
+        write_file(os.path.join(self.content_dir, "index.md"), "# Home")
+        write_file(os.path.join(self.content_dir, "blog", "tom", "index.md"), "# Tom")
+        write_file(os.path.join(self.content_dir, "about.md"), "About")
+        write_file(os.path.join(self.content_dir, "notes.txt"), "not a page")
+        write_file(os.path.join(self.static_dir, "images", "deep", "a.png"), "png")
+        write_file(os.path.join(self.static_dir, "index.css"), "body {}")
+        self.inventory = Inventory(self.static_dir, self.content_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan_files(self):
+        files = scan_files(self.content_dir)
+        self.assertEqual(sorted(files), ["about.md", "blog/tom/index.md", "index.md", "notes.txt"])
+        stat = os.stat(os.path.join(self.content_dir, "about.md"))
+        self.assertEqual(files["about.md"], (stat.st_mtime_ns, stat.st_size))
+        self.assertEqual(scan_files(os.path.join(self.tmp.name, "missing")), {})
+
+    def test_listing(self):
+        self.assertEqual(self.inventory.static_files(), ["images/deep/a.png", "index.css"])
+        self.assertEqual(
+            self.inventory.pages(),
+            [("about.md", "about.html"), ("blog/tom/index.md", "blog/tom/index.html"), ("index.md", "index.html")],
+        )
+        self.assertEqual(self.inventory.dest_dirs(), ["blog", "blog/tom", "images", "images/deep"])
+
+    def test_make_dest_dirs(self):
+        self.inventory.make_dest_dirs(self.dest)
+        for directory in ("blog/tom", "images/deep"):
+            self.assertTrue(os.path.isdir(os.path.join(self.dest, *directory.split("/"))))
+        # A second call for the same destination is free
+        os.rmdir(os.path.join(self.dest, "blog", "tom"))
+        self.inventory.make_dest_dirs(self.dest)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "tom")))
+
+    def test_sharded_dirs(self):
+        dirs = set()
+        for index in (1, 2, 3):
+            dirs.update(self.inventory.dest_dirs((index, 3)))
+        self.assertEqual(sorted(dirs), self.inventory.dest_dirs())
+
+
+if __name__ == "__main__":
+    unittest.main()
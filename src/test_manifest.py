@@ -0,0 +1,51 @@
+import os
+import json
+import tempfile
+import unittest
+
+from fixtures import write_file
+from manifest import (
+    CHANGES_NAME,
+    MANIFEST_NAME,
+    diff_manifests,
+    hash_bytes,
+    manifest_for_directory,
+    manifest_for_output,
+    write_build_manifest,
+)
+
+
+class TestManifest(unittest.TestCase):
+    def test_diff_manifests(self):
+        old = {"a": "1", "b": "2", "c": "3"}
+        new = {"a": "1", "b": "changed", "d": "4"}
+        diff = diff_manifests(old, new)
+        self.assertEqual(diff.added, ["d"])
+        self.assertEqual(diff.modified, ["b"])
+        self.assertEqual(diff.removed, ["c"])
+        self.assertFalse(diff_manifests(new, new))
+
+    def test_manifest_for_directory_matches_output(self):
+        output = {"index.html": b"<p>hi</p>", "images/a.png": b"\x89PNG"}
+        with tempfile.TemporaryDirectory() as root:
+            for key, data in output.items():
+                write_file(os.path.join(root, *key.split("/")), data)
+            write_file(os.path.join(root, MANIFEST_NAME), b"{}")
+            self.assertEqual(manifest_for_directory(root), manifest_for_output(output))
+        self.assertEqual(manifest_for_output(output)["index.html"], hash_bytes(b"<p>hi</p>"))
+
+    def test_write_build_manifest(self):
+        with tempfile.TemporaryDirectory() as root:
+            write_file(os.path.join(root, "index.html"), b"new")
+            write_file(os.path.join(root, "kept.css"), b"same")
+            previous = {"index.html": hash_bytes(b"old"), "kept.css": hash_bytes(b"same"), "gone.html": "x"}
+            diff = write_build_manifest(root, previous)
+            with open(os.path.join(root, MANIFEST_NAME)) as f:
+                self.assertEqual(sorted(json.load(f)), ["index.html", "kept.css"])
+            with open(os.path.join(root, CHANGES_NAME)) as f:
+                self.assertEqual(json.load(f), {"added": [], "modified": ["index.html"], "removed": ["gone.html"]})
+            self.assertEqual(diff.modified, ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from builder import Site
+from pipeline import build_pages_async, generate_pages_pipelined, page_jobs
+from fixtures import write_file
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content_dir = os.path.join(self.tmp.name, "content")
+        self.dest_dir = os.path.join(self.tmp.name, "docs")
+        self.template_path = os.path.join(self.tmp.name, "template.html")
+        write_file(self.template_path, TEMPLATE)
+        for i in range(40):
+            write_file(os.path.join(self.content_dir, f"page{i}", "index.md"), f"# Page {i}\n\n- item **{i}**")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_page_jobs(self):
+        jobs = page_jobs(self.content_dir, self.dest_dir)
+        self.assertEqual(len(jobs), 40)
+        self.assertIn(
+            (os.path.join(self.content_dir, "page3", "index.md"), os.path.join(self.dest_dir, "page3", "index.html")),
+            jobs,
+        )
+
+    def test_matches_site_build(self):
+        written = generate_pages_pipelined(self.content_dir, self.template_path, self.dest_dir, "/repo")
+        self.assertEqual(len(written), 40)
+        expected = Site(self.content_dir, self.template_path, basepath="/repo").build()
+        for key, data in expected.items():
+            with open(os.path.join(self.dest_dir, key), 'rb') as f:
+                self.assertEqual(f.read(), data)
+
+    def test_small_queues_and_explicit_executor(self):
+        jobs = page_jobs(self.content_dir, self.dest_dir)
+        with ThreadPoolExecutor(2) as executor:
+            written = asyncio.run(build_pages_async(
+                jobs, TEMPLATE, executor=executor, render_workers=2, write_workers=1, queue_size=1
+            ))
+        self.assertEqual(sorted(written), sorted(dest for _, dest in jobs))
+
+    def test_bad_page_is_skipped(self):
+        jobs = page_jobs(self.content_dir, self.dest_dir)
+        jobs.append((os.path.join(self.content_dir, "missing.md"), os.path.join(self.dest_dir, "missing.html")))
+        with self.assertLogs(level="ERROR"):
+            written = asyncio.run(build_pages_async(jobs, TEMPLATE))
+        self.assertEqual(len(written), 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from blocktype import BlockType, block_to_block_type
+from htmlnode import LeafNode
+from registry import BlockRegistry
+from utils import default_registry, markdown_to_html_node
+
+
+def render_note(block, inline):
+    return LeafNode("aside", block[2:])
+
+
+def is_note(block):
+    return block.startswith("! ")
+
+
+class TestBlockRegistry(unittest.TestCase):
+    def test_default_detector(self):
+        registry = BlockRegistry(block_to_block_type)
+        self.assertEqual(registry.detect("# Heading"), BlockType.HEADING)
+        self.assertEqual(registry.detect("plain"), BlockType.PARAGRAPH)
+
+    def test_extension_detector(self):
+        registry = BlockRegistry(block_to_block_type)
+        registry.register("note", render_note, detector=is_note, prefixes="!")
+        self.assertEqual(registry.detect("! careful"), "note")
+        # Blocks sharing the prefix but failing the detector fall through
+        self.assertEqual(registry.detect("!not a note"), BlockType.PARAGRAPH)
+
+    def test_detector_requires_prefix(self):
+        registry = BlockRegistry(block_to_block_type)
+        with self.assertRaises(ValueError):
+            registry.register("note", render_note, detector=is_note)
+
+    def test_unknown_renderer(self):
+        registry = BlockRegistry(block_to_block_type)
+        with self.assertRaises(ValueError):
+            registry.render("plain", None)
+
+    def test_custom_registry_in_markdown_to_html_node(self):
+        registry = BlockRegistry(default_registry.detect)
+        registry.register(BlockType.PARAGRAPH, default_registry.renderer(BlockType.PARAGRAPH))
+        registry.register("note", render_note, detector=is_note, prefixes="!")
+        html = markdown_to_html_node("! careful\n\nplain", registry=registry).to_html()
+        self.assertEqual(html, "<div><aside>careful</aside><p>plain</p></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
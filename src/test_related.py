@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from builder import Template, fill_template
+from inventory import scan_files
+from related import RelatedPosts, post_terms, post_url
+from fixtures import write_file
+
+POSTS = {
+    "blog/elves/index.md": "# Elves\n\nGlorfindel and Legolas are elves of Rivendell.\n\n```\nelves elves elves\n```",
+    "blog/rivendell/index.md": "# Rivendell\n\nElrond rules Rivendell, home of many elves like Glorfindel.",
+    "blog/hobbits.md": "# Hobbits\n\nHobbits live in the Shire and enjoy second breakfast.",
+    "blog/shire/index.md": "# The Shire\n\nThe Shire is green; hobbits farm there. ![elves](/elves.png)",
+}
+
+
+class TestRelatedPosts(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content_dir = os.path.join(self.tmp.name, "content")
+        for path, markdown in POSTS.items():
+            write_file(os.path.join(self.content_dir, *path.split("/")), markdown)
+        write_file(os.path.join(self.content_dir, "index.md"), "# Home\n\nelves and hobbits")
+        self.related = RelatedPosts(self.content_dir, count=2)
+        self.related.update(scan_files(self.content_dir))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_post_terms(self):
+        title, terms = post_terms(POSTS["blog/elves/index.md"])
+        self.assertEqual(title, "Elves")
+        # Code blocks and stop words are left out
+        self.assertEqual(terms["elves"], 2)
+        self.assertNotIn("and", terms)
+        self.assertEqual(post_terms(POSTS["blog/shire/index.md"])[1]["elves"], 0)
+
+    def test_post_url(self):
+        self.assertEqual(post_url("blog/tom/index.md"), "/blog/tom")
+        self.assertEqual(post_url("blog/hobbits.md"), "/blog/hobbits.html")
+
+    def test_related(self):
+        self.assertEqual([path for score, path in self.related.related("blog/elves/index.md")], ["blog/rivendell/index.md"])
+        self.assertEqual([path for score, path in self.related.related("blog/hobbits.md")], ["blog/shire/index.md"])
+        self.assertEqual(self.related.related("index.md"), [])
+        self.assertEqual(
+            self.related.html_for("blog/shire/index.md"),
+            '<ul class="related"><li><a href="/blog/hobbits.html">Hobbits</a></li></ul>',
+        )
+        self.assertEqual(self.related.html_for("index.md"), "")
+
+    def test_topic_clusters(self):
+        # Each topic is a quarter of the posts, so its terms are common but
+        # still the ones linking its posts
+        topics = ["python asyncio coroutine", "rust borrow checker", "garden tomato compost", "guitar chord scales"]
+        for total in (12, 120):
+            with self.subTest(total=total):
+                content_dir = os.path.join(self.tmp.name, f"clusters{total}")
+                for i in range(total):
+                    write_file(os.path.join(content_dir, "blog", f"post{i:03}.md"), f"# Post {i}\n\n{topics[i % 4]} post{i:03}")
+                related = RelatedPosts(content_dir, count=2)
+                related.update(scan_files(content_dir))
+                neighbours = [path for score, path in related.related("blog/post000.md")]
+                self.assertEqual(len(neighbours), 2)
+                self.assertTrue(all(int(path[len("blog/post"):-len(".md")]) % 4 == 0 for path in neighbours))
+
+    def test_incremental_update(self):
+        self.assertEqual(self.related.update(scan_files(self.content_dir)), 0)
+        path = os.path.join(self.content_dir, "blog", "hobbits.md")
+        write_file(path, "# Hobbits\n\nHobbits visit Rivendell to see the elves and Elrond, Glorfindel too.")
+        self.assertEqual(self.related.update(scan_files(self.content_dir)), 1)
+        self.assertEqual(self.related.related("blog/hobbits.md")[0][1], "blog/rivendell/index.md")
+        os.remove(path)
+        self.related.update(scan_files(self.content_dir))
+        self.assertEqual(self.related.related("blog/hobbits.md"), [])
+
+    def test_cache_round_trip(self):
+        cache_path = os.path.join(self.tmp.name, "related.json")
+        self.related.save(cache_path)
+        loaded = RelatedPosts(self.content_dir, count=2)
+        loaded.load(cache_path)
+        self.assertEqual(loaded.update(scan_files(self.content_dir)), 0)
+        self.assertEqual(loaded.related("blog/elves/index.md"), self.related.related("blog/elves/index.md"))
+        RelatedPosts(self.content_dir).load(os.path.join(self.tmp.name, "missing.json"))
+
+    def test_template_placeholder(self):
+        related = self.related.html_for("blog/hobbits.md")
+        self.assertEqual(fill_template("{{ Related }}", "T", "", "/repo", related=related), related.replace('href="/', 'href="/repo/'))
+        self.assertEqual(Template("[{{ Related }}]").render("T", "", related=related), f"[{related}]")
+
+
+if __name__ == "__main__":
+    unittest.main()
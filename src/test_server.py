@@ -0,0 +1,102 @@
+import os
+import tempfile
+import threading
+import unittest
+import http.client
+
+from builder import Site
+from server import PageCache, PreviewServer, page_for_url
+from fixtures import write_file
+
+
+class TestPageCache(unittest.TestCase):
+    def test_stamp_mismatch_is_miss(self):
+        cache = PageCache()
+        cache.put("a", 1, "value")
+        self.assertEqual(cache.get("a", 1), "value")
+        self.assertIsNone(cache.get("a", 2))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = PageCache(max_entries=2)
+        cache.put("a", 0, "a")
+        cache.put("b", 0, "b")
+        cache.get("a", 0)
+        cache.put("c", 0, "c")
+        self.assertIsNone(cache.get("b", 0))
+        self.assertEqual(cache.get("a", 0), "a")
+        self.assertEqual(len(cache), 2)
+
+
+class TestPageForUrl(unittest.TestCase):
+    def test_paths(self):
+        self.assertEqual(page_for_url("/"), "index.md")
+        self.assertEqual(page_for_url("/blog/tom"), os.path.join("blog", "tom", "index.md"))
+        self.assertEqual(page_for_url("/blog/tom/?x=1"), os.path.join("blog", "tom", "index.md"))
+        self.assertEqual(page_for_url("/blog/tom/index.html"), os.path.join("blog", "tom", "index.md"))
+        self.assertIsNone(page_for_url("/../secret"))
+
+
+class TestPreviewServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = self.tmp.name
+        self.page_path = os.path.join(root, "content", "index.md")
+        write_file(self.page_path, "# Home")
+        write_file(os.path.join(root, "template.html"), "<title>{{ Title }}</title>{{ Content }}")
+        write_file(os.path.join(root, "static", "index.css"), "body {}")
+        site = Site(os.path.join(root, "content"), os.path.join(root, "template.html"), os.path.join(root, "static"))
+        self.server = PreviewServer(("127.0.0.1", 0), site)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def request(self, path, headers=None):
+        connection = http.client.HTTPConnection(*self.server.server_address)
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_render_and_cache(self):
+        response, body = self.request("/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b'<title>Home</title><div><h1 id="home">Home</h1></div>')
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+        etag = response.getheader("ETag")
+        self.assertTrue(etag.startswith('"'))
+
+        response, body = self.request("/index.html")
+        self.assertEqual(response.getheader("ETag"), etag)
+        self.assertEqual(self.server.cache.hits, 1)
+
+    def test_not_modified(self):
+        response, body = self.request("/")
+        response, body = self.request("/", {"If-None-Match": response.getheader("ETag")})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+
+    def test_invalidated_by_source_mtime(self):
+        self.request("/")
+        write_file(self.page_path, "# Changed")
+        stat = os.stat(self.page_path)
+        os.utime(self.page_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        response, body = self.request("/")
+        self.assertIn(b'<h1 id="changed">Changed</h1>', body)
+        self.assertEqual(self.server.cache.hits, 0)
+
+    def test_static_and_missing(self):
+        response, body = self.request("/index.css")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"body {}")
+        response, body = self.request("/nope")
+        self.assertEqual(response.status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
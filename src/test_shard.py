@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from fixtures import write_file
+from manifest import write_build_manifest
+from shard import (
+    ShardConflictError,
+    in_shard,
+    merge_shards,
+    parse_shard,
+    shard_of,
+    write_shard_info,
+)
+
+
+class TestShard(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "a/b", "2"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_assignment_is_stable_and_complete(self):
+        keys = [f"blog/post{i}/index.html" for i in range(200)]
+        # A fixed value guards against accidentally using the randomised hash()
+        self.assertEqual(shard_of("index.html", 4), shard_of("index.html", 4))
+        for key in keys:
+            owners = [index for index in range(1, 5) if in_shard(key, (index, 4))]
+            self.assertEqual(len(owners), 1)
+        self.assertTrue(in_shard("anything", None))
+        # Every shard gets some of the work
+        self.assertEqual({shard_of(key, 4) for key in keys}, {1, 2, 3, 4})
+
+
+class TestMergeShards(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = os.path.join(self.tmp.name, "docs")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_shard(self, index, count, files):
+        shard_dir = os.path.join(self.tmp.name, f"{index}-of-{count}")
+        for key, content in files.items():
+            write_file(os.path.join(shard_dir, *key.split("/")), content)
+        os.makedirs(shard_dir, exist_ok=True)
+        write_build_manifest(shard_dir, {})
+        write_shard_info(shard_dir, (index, count))
+        return shard_dir
+
+    def test_merge(self):
+        shards = [
+            self.make_shard(1, 2, {"index.html": "home", "index.css": "css"}),
+            self.make_shard(2, 2, {"blog/tom/index.html": "tom"}),
+        ]
+        diff = merge_shards(shards, self.out, "https://example.com", "/repo")
+        self.assertEqual(diff.added, ["blog/tom/index.html", "index.css", "index.html", "sitemap.xml"])
+        with open(os.path.join(self.out, "blog", "tom", "index.html")) as f:
+            self.assertEqual(f.read(), "tom")
+        with open(os.path.join(self.out, "sitemap.xml")) as f:
+            sitemap = f.read()
+        self.assertIn("<loc>https://example.com/repo/</loc>", sitemap)
+        self.assertIn("<loc>https://example.com/repo/blog/tom/</loc>", sitemap)
+        self.assertNotIn("index.css", sitemap)
+
+    def test_conflict(self):
+        shards = [
+            self.make_shard(1, 2, {"index.html": "one"}),
+            self.make_shard(2, 2, {"index.html": "two"}),
+        ]
+        with self.assertRaises(ShardConflictError):
+            merge_shards(shards, self.out)
+
+    def test_missing_shard(self):
+        shards = [self.make_shard(1, 3, {"a.html": "a"}), self.make_shard(3, 3, {"b.html": "b"})]
+        with self.assertRaises(ShardConflictError):
+            merge_shards(shards, self.out)
+
+    def test_not_a_shard(self):
+        with self.assertRaises(ShardConflictError):
+            merge_shards([self.tmp.name], self.out)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from tables import TABLE, is_table, split_row, column_alignments
+from utils import default_registry, markdown_to_html_node
+
+
+class TestTables(unittest.TestCase):
+    def test_split_row(self):
+        self.assertEqual(split_row("| a | **b** |"), ["a", "**b**"])
+        self.assertEqual(split_row("| a \\| b | c |"), ["a | b", "c"])
+
+    def test_column_alignments(self):
+        self.assertEqual(column_alignments("| --- | :-- | --: | :-: |"), [None, "left", "right", "center"])
+        self.assertIsNone(column_alignments("| a | b |"))
+
+    def test_is_table(self):
+        self.assertTrue(is_table("| a | b |\n| - | - |\n| 1 | 2 |"))
+        self.assertFalse(is_table("| a | b |"))
+        self.assertFalse(is_table("| a | b |\n| - |"))
+        self.assertFalse(is_table("| a | b |\nplain text"))
+
+    def test_registered_by_default(self):
+        self.assertEqual(default_registry.detect("| a |\n| - |"), TABLE)
+
+    def test_table(self):
+        md = """
+| Name | Race |
+| :--- | :--: |
+| **Gandalf** | Maia |
+| Bilbo |
+"""
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            '<div><table><thead><tr><th align="left">Name</th><th align="center">Race</th></tr></thead>'
+            '<tbody><tr><td align="left"><b>Gandalf</b></td><td align="center">Maia</td></tr>'
+            '<tr><td align="left">Bilbo</td><td align="center"></td></tr></tbody></table></div>',
+        )
+
+    def test_header_only_table(self):
+        html = markdown_to_html_node("| a | b |\n| --- | --- |").to_html()
+        self.assertEqual(html, "<div><table><thead><tr><th>a</th><th>b</th></tr></thead></table></div>")
+
+    def test_pipe_paragraph_is_not_table(self):
+        html = markdown_to_html_node("| just a pipe").to_html()
+        self.assertEqual(html, "<div><p>| just a pipe</p></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
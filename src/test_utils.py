@@ -1,7 +1,7 @@
 import unittest
 
 from src.textnode import TextNode, TextType
-from src.utils import text_node_to_html_node, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, markdown_to_html_node, extract_title
+from src.utils import text_node_to_html_node, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, markdown_to_blocks, markdown_to_html_node, extract_title, parse_document, slugify, extract_reference_definitions
 
 class TestUtils(unittest.TestCase):
     def test_text(self):
@@ -485,7 +485,7 @@ the **same** even with inline stuff
         html = node.to_html()
         self.assertEqual(
             html,
-            "<div><h1>Heading 1</h1><h2>Heading 2 with <b>bold</b></h2><h3>Heading 3 with <code>code</code></h3></div>",
+            '<div><h1 id="heading-1">Heading 1</h1><h2 id="heading-2-with-bold">Heading 2 with <b>bold</b></h2><h3 id="heading-3-with-code">Heading 3 with <code>code</code></h3></div>',
         )
         
     def test_quote(self):
@@ -530,6 +530,41 @@ the **same** even with inline stuff
             "<div><ol><li>First item with <b>bold</b></li><li>Second item with <i>italic</i></li><li>Third item with <code>code</code></li></ol></div>",
         )
         
+    def test_nested_lists(self):
+        md = """
+- Item 1
+  - Nested **a**
+    1. Deeper
+    2. Deeper 2
+  1. Switched
+- Item 2
+"""
+
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            "<div><ul><li>Item 1<ul><li>Nested <b>a</b><ol><li>Deeper</li><li>Deeper 2</li></ol></li></ul>"
+            "<ol><li>Switched</li></ol></li><li>Item 2</li></ul></div>",
+        )
+        
+    def test_nested_ordered_list(self):
+        html = markdown_to_html_node("1. One\n   - a\n   - b\n2. Two").to_html()
+        self.assertEqual(html, "<div><ol><li>One<ul><li>a</li><li>b</li></ul></li><li>Two</li></ol></div>")
+        
+    def test_nested_quote(self):
+        md = """
+> Outer
+>> Inner _one_
+> > and more
+> Back out
+"""
+
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            "<div><blockquote>Outer<blockquote>Inner <i>one</i>\nand more</blockquote>Back out</blockquote></div>",
+        )
+        
     def test_mixed_content(self):
         md = """
 # Main Heading
@@ -555,7 +590,24 @@ with multiple lines
         html = node.to_html()
         self.assertEqual(
             html,
-            "<div><h1>Main Heading</h1><p>This is a paragraph with <b>bold</b> and <i>italic</i> text.</p><pre><code>code block\nwith multiple lines\n</code></pre><blockquote>This is a quote\nwith multiple lines</blockquote><ul><li>List item 1</li><li>List item 2</li></ul><ol><li>Ordered item 1</li><li>Ordered item 2</li></ol></div>",
+            '<div><h1 id="main-heading">Main Heading</h1><p>This is a paragraph with <b>bold</b> and <i>italic</i> text.</p><pre><code>code block\nwith multiple lines\n</code></pre><blockquote>This is a quote\nwith multiple lines</blockquote><ul><li>List item 1</li><li>List item 2</li></ul><ol><li>Ordered item 1</li><li>Ordered item 2</li></ol></div>',
+        )
+        
+    def test_escaping(self):
+        md = """
+Use a < b & c [here](/search?a=1&b="2")
+
+```
+if a < b:
+    print("<tag>")
+```
+"""
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            '<div><p>Use a &lt; b &amp; c <a href="/search?a=1&amp;b=&quot;2&quot;">here</a></p><pre><code>if a &lt; b:\n    print("&lt;tag&gt;")\n</code></pre></div>',
         )
         
     def test_extract_title_basic(self):
@@ -583,5 +635,82 @@ with multiple lines
         with self.assertRaises(ValueError):
             extract_title(md)
 
+class TestReferenceLinks(unittest.TestCase):
+    def test_extract_reference_definitions(self):
+        blocks = ["[Home][h]", "[h]: /\n [Docs  Page]: /docs", "[x]: /x\nnot a definition"]
+        references, content = extract_reference_definitions(blocks)
+        self.assertEqual(references, {"h": "/", "docs page": "/docs"})
+        self.assertEqual(content, ["[Home][h]", "[x]: /x\nnot a definition"])
+        self.assertEqual(extract_reference_definitions(["[a]: /1\n[A]: /2"])[0], {"a": "/1"})
+
+    def test_definition_titles(self):
+        blocks = ['[r]: /x "Title"\n[s]: /y \'Single\'\n[t]: /z (Paren)', '[u]: /u "unclosed']
+        references, content = extract_reference_definitions(blocks)
+        self.assertEqual(references, {"r": "/x", "s": "/y", "t": "/z"})
+        self.assertEqual(content, ['[u]: /u "unclosed'])
+        self.assertEqual(
+            markdown_to_html_node('[r]: /x "Title"\n\n[t][r]').to_html(),
+            '<div><p><a href="/x">t</a></p></div>',
+        )
+
+    def test_extract_with_references(self):
+        references = {"home": "/", "logo": "/logo.png"}
+        self.assertEqual(
+            extract_markdown_links("[Home][] and [site][HOME] and [x](/x) and [y][missing]", references),
+            [("Home", "/"), ("site", "/"), ("x", "/x")],
+        )
+        self.assertEqual(extract_markdown_images("![a][logo] and ![b](/b.png)", references),
+                         [("a", "/logo.png"), ("b", "/b.png")])
+        self.assertEqual(extract_markdown_links("[site][home]"), [])
+
+    def test_text_to_textnodes_with_references(self):
+        nodes = text_to_textnodes("go [home][h] or [a][none](/in)", {"h": "/"})
+        self.assertEqual(
+            [(n.text, n.text_type.name, n.url) for n in nodes],
+            [("go ", "TEXT", None), ("home", "LINK", "/"), (" or [a]", "TEXT", None), ("none", "LINK", "/in")],
+        )
+
+    def test_document(self):
+        md = "See [the docs][docs] and ![logo][].\n\n[docs]: /docs\n[logo]: /logo.png\n\nUnknown [x][y]."
+        node, summary = parse_document(md)
+        self.assertEqual(
+            node.to_html(),
+            '<div><p>See <a href="/docs">the docs</a> and <img src="/logo.png" alt="logo"></img>.</p>'
+            '<p>Unknown [x][y].</p></div>',
+        )
+        self.assertEqual(summary.links, [("the docs", "/docs")])
+        self.assertEqual(summary.images, [("logo", "/logo.png")])
+
+class TestDocumentSummary(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Why Tom Bombadil Was a Mistake!"), "why-tom-bombadil-was-a-mistake")
+        self.assertEqual(slugify("  --  "), "--")
+        self.assertEqual(slugify("?!"), "section")
+
+    def test_summary(self):
+        md = "# The **Title**\n\nSee [docs](/docs) and ![logo](/logo.png) here.\n\n## Usage\n\n```\nnot counted\n```\n\n## Usage"
+        node, summary = parse_document(md)
+        self.assertEqual(summary.title, "The **Title**")
+        self.assertEqual(summary.headings, [(1, "The Title", "the-title"), (2, "Usage", "usage"), (2, "Usage", "usage-1")])
+        self.assertEqual(summary.links, [("docs", "/docs")])
+        self.assertEqual(summary.images, [("logo", "/logo.png")])
+        self.assertEqual(summary.word_count, 8)
+        self.assertEqual(summary.reading_time, 1)
+        self.assertIn('<h2 id="usage-1">Usage</h2>', node.to_html())
+
+    def test_toc_html(self):
+        summary = parse_document("# A < B\n\n### Sub")[1]
+        self.assertEqual(
+            summary.toc_html(),
+            '<ul class="toc"><li class="toc-h1"><a href="#a--b">A &lt; B</a></li><li class="toc-h3"><a href="#sub">Sub</a></li></ul>',
+        )
+        self.assertEqual(parse_document("no headings")[1].toc_html(), "")
+
+    def test_no_title(self):
+        summary = parse_document("## Only h2\n\ntext")[1]
+        self.assertIsNone(summary.title)
+        self.assertEqual(summary.reading_time, 1)
+        self.assertEqual(parse_document("")[1].reading_time, 0)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
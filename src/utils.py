@@ -1,7 +1,24 @@
 import re
 from textnode import TextNode, TextType
-from htmlnode import LeafNode, ParentNode
+from htmlnode import LeafNode, ParentNode, RawNode, escape_text, escape_attribute
 from blocktype import BlockType, block_to_block_type
+from registry import BlockRegistry
+import tables
+
+# Markdown image and link patterns. The bracketed parts exclude their own
+# delimiters instead of using a lazy ``(.*?)``, so an unclosed ``[`` or ``(``
+# fails in one step rather than rescanning the rest of the text.
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+# The same, also matching the reference forms ![alt][ref] and [text][ref]
+# (or the collapsed [text][]); group 2 is the inline URL, group 3 the label
+IMAGE_REFERENCE_PATTERN = re.compile(r"!\[([^\[\]]*)\](?:\(([^\(\)]*)\)|\[([^\[\]]*)\])")
+LINK_REFERENCE_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\](?:\(([^\(\)]*)\)|\[([^\[\]]*)\])")
+# A link reference definition line: [label]: url, with an optional
+# "title", 'title' or (title) after the URL, which is accepted and not rendered
+REFERENCE_DEFINITION_PATTERN = re.compile(
+  r" {0,3}\[([^\[\]]+)\]:[ \t]*(\S+)(?:[ \t]+(?:\"[^\"]*\"|'[^']*'|\([^()]*\)))?[ \t]*"
+)
 
 def text_node_to_html_node(text_node):
   if text_node.text_type == TextType.TEXT:
@@ -63,11 +80,73 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
   
   return result
 
-def extract_markdown_images(text):
+def reference_label(label):
+  """Normalize a reference label: case and runs of whitespace do not matter."""
+  return " ".join(label.split()).lower()
+
+def extract_reference_definitions(blocks):
+  """Collect a document's link reference definitions in one pass over its blocks.
+  
+  A block made up only of definition lines ("[label]: url") defines
+  references and is left out of the returned blocks, so it is never
+  rendered as a paragraph. The first definition of a label wins.
+  
+  Args:
+    blocks: The document's blocks, as returned by markdown_to_blocks
+    
+  Returns:
+    A tuple of (dict of normalized label to URL, the remaining blocks)
+  
+  Example:
+    extract_reference_definitions(["[home][h]", "[h]: /"]) # ({"h": "/"}, ["[home][h]"])
+  """
+  references = {}
+  content = []
+  for block in blocks:
+    if block.startswith("[") and "]:" in block:
+      matches = [REFERENCE_DEFINITION_PATTERN.fullmatch(line) for line in block.split("\n")]
+      if all(matches):
+        for match in matches:
+          references.setdefault(reference_label(match.group(1)), match.group(2))
+        continue
+    content.append(block)
+  return references, content
+
+def resolve_reference(match, references):
+  """Return the URL of an IMAGE_REFERENCE_PATTERN or LINK_REFERENCE_PATTERN match.
+  
+  Returns None for a reference to an undefined label, which stays plain text.
+  """
+  url = match.group(2)
+  if url is not None:
+    return url
+  return references.get(reference_label(match.group(3) or match.group(1)))
+
+def find_references(text, pattern, references):
+  """Yield (match, url) for every inline or resolvable reference match of pattern in text.
+  
+  After an undefined reference the scan resumes one character in, so
+  "[a][undefined](url)" still finds the inline link "[undefined](url)".
+  """
+  position = 0
+  while True:
+    match = pattern.search(text, position)
+    if match is None:
+      return
+    url = resolve_reference(match, references)
+    if url is None:
+      position = match.start() + 1
+      continue
+    yield match, url
+    position = match.end()
+
+def extract_markdown_images(text, references=None):
   """Extract markdown images from text and return a list of tuples with alt text and URL.
   
   Args:
     text: A string containing markdown text
+    references: Optional dict of reference definitions (see
+      extract_reference_definitions); ![alt][ref] images are then resolved too
     
   Returns:
     A list of tuples, each containing (alt_text, url) for each markdown image found
@@ -76,21 +155,22 @@ def extract_markdown_images(text):
     text = "This is text with a ![rick roll](https://i.imgur.com/aKaOqIh.gif)"
     extract_markdown_images(text) # [("rick roll", "https://i.imgur.com/aKaOqIh.gif")]
   """
-  # Regular expression pattern for markdown images: ![alt text](url)
-  # The pattern captures two groups: the alt text and the URL
-  pattern = r"!\[(.*?)\]\((.*?)\)"
+  if references:
+    return [(match.group(1), url) for match, url in find_references(text, IMAGE_REFERENCE_PATTERN, references)]
   
-  # Find all matches in the text
-  matches = re.findall(pattern, text)
+  # IMAGE_PATTERN captures two groups: the alt text and the URL
+  matches = IMAGE_PATTERN.findall(text)
   
   # Each match is a tuple of (alt_text, url)
   return matches
 
-def extract_markdown_links(text):
+def extract_markdown_links(text, references=None):
   """Extract markdown links from text and return a list of tuples with anchor text and URL.
   
   Args:
     text: A string containing markdown text
+    references: Optional dict of reference definitions (see
+      extract_reference_definitions); [text][ref] links are then resolved too
     
   Returns:
     A list of tuples, each containing (anchor_text, url) for each markdown link found
@@ -99,22 +179,23 @@ def extract_markdown_links(text):
     text = "This is text with a link [to boot dev](https://www.boot.dev)"
     extract_markdown_links(text) # [("to boot dev", "https://www.boot.dev")]
   """
-  # Regular expression pattern for markdown links: [anchor text](url)
-  # The pattern captures two groups: the anchor text and the URL
-  # The negative lookbehind (?<!!)) ensures we don't match image syntax (which has ! before [)
-  pattern = r"(?<!!)\[(.*?)\]\((.*?)\)"
+  if references:
+    return [(match.group(1), url) for match, url in find_references(text, LINK_REFERENCE_PATTERN, references)]
   
-  # Find all matches in the text
-  matches = re.findall(pattern, text)
+  # LINK_PATTERN captures two groups: the anchor text and the URL
+  # The negative lookbehind (?<!!) ensures we don't match image syntax (which has ! before [)
+  matches = LINK_PATTERN.findall(text)
   
   # Each match is a tuple of (anchor_text, url)
   return matches
 
-def split_nodes_image(old_nodes):
+def split_nodes_image(old_nodes, references=None):
   """Split text nodes that contain markdown image syntax into multiple nodes.
   
   Args:
     old_nodes: A list of TextNode objects
+    references: Optional dict of reference definitions; reference-style
+      images to defined labels are then split out too
     
   Returns:
     A list of TextNode objects where any markdown images have been converted to image nodes
@@ -131,46 +212,46 @@ def split_nodes_image(old_nodes):
       result.append(old_node)
       continue
     
-    # Extract all images from the text
-    images = extract_markdown_images(old_node.text)
-    
-    # If no images found, keep the original node
-    if not images:
+    # Walk the matches in order, slicing around each one. Every character is
+    # visited once, so a node with many images stays linear in its length.
+    text = old_node.text
+    if "![" not in text:
       result.append(old_node)
       continue
+    position = 0
     
-    # Process the text, splitting on each image
-    remaining_text = old_node.text
+    if references:
+      matches = find_references(text, IMAGE_REFERENCE_PATTERN, references)
+    else:
+      matches = ((match, match.group(2)) for match in IMAGE_PATTERN.finditer(text))
     
-    for image_alt, image_url in images:
-      # Split the text at the image markdown
-      image_markdown = f"![{image_alt}]({image_url})"
-      sections = remaining_text.split(image_markdown, 1)
-      
+    for match, url in matches:
       # Add the text before the image if it's not empty
-      if sections[0]:
-        result.append(TextNode(sections[0], TextType.TEXT))
+      if match.start() > position:
+        result.append(TextNode(text[position:match.start()], TextType.TEXT))
       
       # Add the image node
-      result.append(TextNode(image_alt, TextType.IMAGE, image_url))
-      
-      # Update the remaining text
-      if len(sections) > 1:
-        remaining_text = sections[1]
-      else:
-        remaining_text = ""
+      result.append(TextNode(match.group(1), TextType.IMAGE, url))
+      position = match.end()
+    
+    # If no images were found, keep the original node
+    if position == 0:
+      result.append(old_node)
+      continue
     
     # Add any remaining text after the last image
-    if remaining_text:
-      result.append(TextNode(remaining_text, TextType.TEXT))
+    if position < len(text):
+      result.append(TextNode(text[position:], TextType.TEXT))
   
   return result
 
-def split_nodes_link(old_nodes):
+def split_nodes_link(old_nodes, references=None):
   """Split text nodes that contain markdown link syntax into multiple nodes.
   
   Args:
     old_nodes: A list of TextNode objects
+    references: Optional dict of reference definitions; reference-style
+      links to defined labels are then split out too
     
   Returns:
     A list of TextNode objects where any markdown links have been converted to link nodes
@@ -187,46 +268,45 @@ def split_nodes_link(old_nodes):
       result.append(old_node)
       continue
     
-    # Extract all links from the text
-    links = extract_markdown_links(old_node.text)
-    
-    # If no links found, keep the original node
-    if not links:
+    # Walk the matches in order, slicing around each one. Every character is
+    # visited once, so a node with many links stays linear in its length.
+    text = old_node.text
+    if "[" not in text:
       result.append(old_node)
       continue
+    position = 0
     
-    # Process the text, splitting on each link
-    remaining_text = old_node.text
+    if references:
+      matches = find_references(text, LINK_REFERENCE_PATTERN, references)
+    else:
+      matches = ((match, match.group(2)) for match in LINK_PATTERN.finditer(text))
     
-    for link_text, link_url in links:
-      # Split the text at the link markdown
-      link_markdown = f"[{link_text}]({link_url})"
-      sections = remaining_text.split(link_markdown, 1)
-      
+    for match, url in matches:
       # Add the text before the link if it's not empty
-      if sections[0]:
-        result.append(TextNode(sections[0], TextType.TEXT))
+      if match.start() > position:
+        result.append(TextNode(text[position:match.start()], TextType.TEXT))
       
       # Add the link node
-      result.append(TextNode(link_text, TextType.LINK, link_url))
-      
-      # Update the remaining text
-      if len(sections) > 1:
-        remaining_text = sections[1]
-      else:
-        remaining_text = ""
+      result.append(TextNode(match.group(1), TextType.LINK, url))
+      position = match.end()
+    
+    # If no links were found, keep the original node
+    if position == 0:
+      result.append(old_node)
+      continue
     
     # Add any remaining text after the last link
-    if remaining_text:
-      result.append(TextNode(remaining_text, TextType.TEXT))
+    if position < len(text):
+      result.append(TextNode(text[position:], TextType.TEXT))
   
   return result
 
-def text_to_textnodes(text):
+def text_to_textnodes(text, references=None):
   """Convert markdown text to a list of TextNode objects.
   
   Args:
     text: A string containing markdown text
+    references: Optional dict of the document's reference definitions
     
   Returns:
     A list of TextNode objects representing the parsed markdown text
@@ -243,8 +323,8 @@ def text_to_textnodes(text):
   nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
   nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
   nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-  nodes = split_nodes_image(nodes)
-  nodes = split_nodes_link(nodes)
+  nodes = split_nodes_image(nodes, references)
+  nodes = split_nodes_link(nodes, references)
   
   return nodes
 
@@ -276,18 +356,60 @@ def markdown_to_blocks(markdown):
   
   return result
 
-def text_to_children(text):
+def text_to_children(text, references=None):
   """Convert text to a list of HTMLNode children by processing inline markdown.
   
   Args:
     text: A string containing markdown text
+    references: Optional dict of the document's reference definitions
     
   Returns:
     A list of HTMLNode objects representing the inline markdown elements
   """
-  text_nodes = text_to_textnodes(text)
+  text_nodes = text_to_textnodes(text, references)
   return [text_node_to_html_node(text_node) for text_node in text_nodes]
 
+def cached_text_to_children(inline_cache):
+  """Return a text_to_children equivalent that memoizes tokenization.
+  
+  The token tuples are shared through the cache; fresh HTML nodes are built
+  from them on every call so no node is shared between documents.
+  
+  Args:
+    inline_cache: An InlineCache shared by every document that uses it
+  """
+  def tokens(text):
+    return tuple(text_to_textnodes(text))
+  
+  def inline(text):
+    return [text_node_to_html_node(text_node) for text_node in inline_cache.lookup("tokens", text, tokens)]
+  
+  return inline
+
+def depends_on_references(text, references):
+  """Whether text could contain a reference link or image resolved through references."""
+  return bool(references) and "][" in text
+
+def resolving_references(render, resolve, references):
+  """Wrap a document's inline renderer so reference links resolve against its definitions.
+  
+  Inline and block caches are keyed only on the text, but "[text][ref]"
+  renders differently from one document to the next, so fragments that
+  could hold a reference go to resolve uncached; all others still use
+  render and its cache.
+  
+  Args:
+    render: The inline renderer, possibly cached
+    resolve: Uncached renderer taking (text, references)
+    references: The document's reference definitions
+  """
+  def inline(text):
+    if "][" in text:
+      return resolve(text, references)
+    return render(text)
+  
+  return inline
+
 def extract_title_level(heading_block):
   """Extract the heading level from a heading block.
   
@@ -325,54 +447,158 @@ def extract_code_content(code_block):
     # Remove the opening and closing backtick lines
     return "\n".join(lines[1:-1]) + "\n"
 
-def extract_quote_content(quote_block):
-  """Extract the content from a quote block, removing the > markers.
+# Events produced by scan_list and scan_quote, in document order: (OPEN, tag)
+# and (CLOSE, tag) around each element, and (TEXT, inline markdown) for its text
+OPEN = "open"
+TEXT = "text"
+CLOSE = "close"
+
+# The indentation and marker of a list item line
+LIST_ITEM_PATTERN = re.compile(r"([ \t]*)(?:(-)|\d+\.) ")
+# The > markers of a quote line, nested as ">>" or "> >"
+QUOTE_MARKER_PATTERN = re.compile(r"(?:> ?)+")
+
+def scan_list(list_block):
+  """Scan a list block, with any nested lists, into a flat list of events.
+  
+  A stack holds the indentation and tag of each open list, so every line
+  is visited once however deep the nesting goes. An item indented further
+  than the current one opens a nested list inside it; a dedent closes the
+  lists deeper than it. Nested lists may switch between "- " and "1. "
+  markers; a switch at the same indentation starts a sibling list.
   
   Args:
-    quote_block: A string containing a quote block where each line starts with >
+    list_block: A string containing an unordered or ordered list block
     
   Returns:
-    The content of the quote block without the > markers
-  """
-  lines = quote_block.split("\n")
-  result = []
+    A list of (OPEN, tag), (TEXT, item text) and (CLOSE, tag) events for
+    the outermost ul or ol and everything in it
   
-  for line in lines:
-    # Remove the > and the space after it (if present)
-    if line.startswith("> "):
-      result.append(line[2:])
-    elif line.startswith(">"):
-      result.append(line[1:])
+  Example:
+    scan_list("- a\n  1. b") # [(OPEN, "ul"), (OPEN, "li"), (TEXT, "a"), (OPEN, "ol"), ...]
+  """
+  events = []
+  # (indent, tag) of each open list, innermost last; each has an open li
+  stack = []
+  for line in list_block.split("\n"):
+    match = LIST_ITEM_PATTERN.match(line)
+    if match is None:
+      continue
+    indent = len(match.group(1).expandtabs(4))
+    tag = "ul" if match.group(2) else "ol"
+    
+    while stack and indent < stack[-1][0]:
+      events.append((CLOSE, "li"))
+      events.append((CLOSE, stack.pop()[1]))
+    if stack and indent == stack[-1][0]:
+      events.append((CLOSE, "li"))
+      # The outermost list keeps its tag so the block stays one element
+      if tag != stack[-1][1] and len(stack) > 1:
+        events.append((CLOSE, stack.pop()[1]))
+        events.append((OPEN, tag))
+        stack.append((indent, tag))
     else:
-      result.append(line)  # Shouldn't happen if properly formatted
+      events.append((OPEN, tag))
+      stack.append((indent, tag))
+    events.append((OPEN, "li"))
+    events.append((TEXT, line[match.end():]))
+  
+  while stack:
+    events.append((CLOSE, "li"))
+    events.append((CLOSE, stack.pop()[1]))
+  return events
+
+def flat_list_items(list_block):
+  """Return (tag, item texts) of a list block without nesting, or None if any line is indented.
   
-  return "\n".join(result)
+  Lists without nesting are the common case; they render the same as
+  through scan_list, but without building and replaying its events.
+  """
+  if list_block[:1] in (" ", "\t") or "\n " in list_block or "\n\t" in list_block:
+    return None
+  tag = None
+  items = []
+  for line in list_block.split("\n"):
+    match = LIST_ITEM_PATTERN.match(line)
+    if match is None:
+      continue
+    if tag is None:
+      tag = "ul" if match.group(2) else "ol"
+    items.append(line[match.end():])
+  if tag is None:
+    return None
+  return tag, items
 
-def extract_list_items(list_block, ordered=False):
-  """Extract items from a list block.
+def scan_quote(quote_block):
+  """Scan a quote block, with any nested quotes, into a flat list of events.
+  
+  Each line's depth is its number of > markers. Consecutive lines at the
+  same depth are joined into one text run, so a quote without nesting
+  renders exactly as before; a change of depth opens or closes blockquotes.
+  Every line is visited once.
   
   Args:
-    list_block: A string containing a list block
-    ordered: Boolean indicating if this is an ordered list
+    quote_block: A string containing a quote block where each line starts with >
     
   Returns:
-    A list of strings, each representing a list item without the marker
-  """
-  lines = list_block.split("\n")
-  items = []
+    A list of (OPEN, "blockquote"), (TEXT, text) and (CLOSE, "blockquote") events
   
-  for i, line in enumerate(lines):
-    if ordered:
-      # For ordered lists, remove the number, period, and space
-      prefix = f"{i+1}. "
-      if line.startswith(prefix):
-        items.append(line[len(prefix):])
+  Example:
+    scan_quote("> a\n>> b") # [(OPEN, "blockquote"), (TEXT, "a"), (OPEN, "blockquote"), (TEXT, "b"), ...]
+  """
+  events = []
+  depth = 0
+  lines = []
+  for line in quote_block.split("\n"):
+    match = QUOTE_MARKER_PATTERN.match(line)
+    if match is None:
+      # Shouldn't happen if properly formatted; kept at the current depth
+      level = max(depth, 1)
     else:
-      # For unordered lists, remove the dash and space
-      if line.startswith("- "):
-        items.append(line[2:])
+      level = match.group().count(">")
+      line = line[match.end():]
+    if level != depth:
+      if lines:
+        events.append((TEXT, "\n".join(lines)))
+        lines = []
+      while depth < level:
+        events.append((OPEN, "blockquote"))
+        depth += 1
+      while depth > level:
+        events.append((CLOSE, "blockquote"))
+        depth -= 1
+    lines.append(line)
+  
+  if lines:
+    events.append((TEXT, "\n".join(lines)))
+  events.extend([(CLOSE, "blockquote")] * depth)
+  return events
+
+def events_to_node(events, inline):
+  """Build the node tree for scan_list or scan_quote events without recursion.
   
-  return items
+  Args:
+    events: Events starting with the OPEN of the outermost element
+    inline: Callable converting inline markdown to a list of child nodes
+    
+  Returns:
+    The ParentNode of the outermost element
+  """
+  root = None
+  stack = []
+  for kind, value in events:
+    if kind == TEXT:
+      stack[-1].children.extend(inline(value))
+    elif kind == OPEN:
+      node = ParentNode(value, [])
+      if stack:
+        stack[-1].children.append(node)
+      else:
+        root = node
+      stack.append(node)
+    else:
+      stack.pop()
+  return root
 
 def extract_title(markdown):
   """Extract the title (h1 header) from a markdown string.
@@ -401,66 +627,306 @@ def extract_title(markdown):
   # If no h1 header is found, raise an exception
   raise ValueError("No h1 header found in the markdown")
 
-def markdown_to_html_node(markdown):
-  """Convert a markdown string to an HTML node.
+# Reading speed used for DocumentSummary.reading_time
+WORDS_PER_MINUTE = 200
+
+def slugify(text):
+  """Turn heading text into an anchor ID, GitHub style.
+  
+  Example:
+    slugify("Why Tom Bombadil Was a Mistake!") # "why-tom-bombadil-was-a-mistake"
+  """
+  slug = re.sub(r"[^\w\- ]", "", text.strip().lower()).replace(" ", "-")
+  return slug or "section"
+
+class DocumentSummary:
+  """Facts about a document gathered while it is converted.
+  
+  Headings are recorded as they are rendered. Word counts, links and images
+  are counted lazily: the rendered block trees are kept and walked once,
+  the first time one of those attributes is read, so a page whose template
+  does not use them never pays for counting.
+  
+  Attributes:
+    title: Text of the first h1 heading (as extract_title returns it), or None
+    headings: List of (level, text, anchor) tuples in document order
+    word_count: Number of words of inline text, excluding code blocks
+    links: List of (text, url) tuples for every link
+    images: List of (alt, url) tuples for every image
+  """
+  def __init__(self):
+    self.title = None
+    self.headings = []
+    self._word_count = 0
+    self._links = []
+    self._images = []
+    # Block node trees and (word count or plain text, links, images) tuples
+    # not counted yet, in document order
+    self._pending = []
+    self._anchor_counts = {}
+  
+  @property
+  def word_count(self):
+    self._count()
+    return self._word_count
+  
+  @property
+  def links(self):
+    self._count()
+    return self._links
+  
+  @property
+  def images(self):
+    self._count()
+    return self._images
+  
+  @property
+  def reading_time(self):
+    """Estimated reading time in whole minutes (at least 1 for any text)."""
+    return -(-self.word_count // WORDS_PER_MINUTE)
+  
+  def add_counts(self, word_count, links, images):
+    """Record the word count, links and images of an already counted fragment or block."""
+    self._pending.append((word_count, links, images))
+  
+  def add_inline(self, plain_text, links, images):
+    """Record one inline fragment's plain text, links and images; its words are counted with the rest."""
+    self._pending.append((plain_text, links, images))
+  
+  def add_block(self, node):
+    """Record a rendered block, counted from its node tree when first needed."""
+    self._pending.append(node)
+  
+  def _count(self):
+    """Count the pending blocks in one walk, without recursion.
+    
+    The leaves between two element boundaries come from one inline
+    fragment, so their values are joined into one run of text; the runs
+    are split into words once at the end. Code blocks are skipped.
+    """
+    if not self._pending:
+      return
+    runs = []
+    words = 0
+    links = self._links
+    images = self._images
+    for item in self._pending:
+      if type(item) is tuple:
+        if type(item[0]) is str:
+          runs.append(item[0])
+        else:
+          words += item[0]
+        links.extend(item[1])
+        images.extend(item[2])
+        continue
+      run = []
+      stack = [iter((item,))]
+      while stack:
+        for node in stack[-1]:
+          if node.children is not None:
+            if run:
+              runs.append("".join(run))
+              run = []
+            if node.tag != "pre":
+              stack.append(iter(node.children))
+              break
+          elif node.tag == "img":
+            images.append((node.props["alt"], node.props["src"]))
+          else:
+            if node.tag == "a":
+              links.append((node.value, node.props["href"]))
+            run.append(node.value)
+        else:
+          stack.pop()
+          if run:
+            runs.append("".join(run))
+            run = []
+    self._pending = []
+    self._word_count += words + len(" ".join(runs).split())
+  
+  def add_heading(self, level, text, content):
+    """Record a heading and return its unique anchor ID.
+    
+    Args:
+      level: Heading level, 1-6
+      text: Plain text of the heading, used for the anchor and outline
+      content: The heading's markdown source, used for the title
+    """
+    anchor = slugify(text)
+    count = self._anchor_counts.get(anchor, 0)
+    self._anchor_counts[anchor] = count + 1
+    if count:
+      anchor = f"{anchor}-{count}"
+    self.headings.append((level, text, anchor))
+    if level == 1 and self.title is None:
+      self.title = content.strip()
+    return anchor
+  
+  def toc_html(self):
+    """Render the heading outline as a list of links to the heading anchors."""
+    items = "".join(
+      f'<li class="toc-h{level}"><a href="#{escape_attribute(anchor)}">{escape_text(text)}</a></li>'
+      for level, text, anchor in self.headings
+    )
+    return f'<ul class="toc">{items}</ul>' if items else ""
+
+def add_heading_anchor(node, block, summary):
+  """Record a rendered heading in the summary and set its id attribute."""
+  level, content = extract_title_level(block)
+  text = "".join(child.value for child in node.children or () if child.tag != "img")
+  anchor = summary.add_heading(level, text, content)
+  node.props = {**(node.props or {}), "id": anchor}
+
+# A rendered block as kept in a BlockCache: a tuple of (html, word count,
+# links, images, heading). For a heading, heading is (level, text, content)
+# and html is only its inner HTML, since its anchor depends on the headings
+# before it in the document; for any other block heading is None.
+
+def is_cacheable(block_type, renderer):
+  """Whether a block can be spliced from a BlockCache (headings only with the core renderer)."""
+  return block_type != BlockType.HEADING or renderer is heading_to_html_node
+
+def block_entry(block, renderer, render_nodes):
+  """Render a block through its node-tree renderer into a BlockCache entry."""
+  summary = DocumentSummary()
+  node = renderer(block, render_nodes)
+  summary.add_block(node)
+  links = tuple(summary.links)
+  images = tuple(summary.images)
+  if renderer is heading_to_html_node:
+    level, content = extract_title_level(block)
+    text = "".join(child.value for child in node.children if child.tag != "img")
+    html = "".join(child.to_html() for child in node.children)
+    return html, summary.word_count, links, images, (level, text, content)
+  return node.to_html(), summary.word_count, links, images, None
+
+def splice_block(entry, summary):
+  """Record a BlockCache entry in the document summary and return the block's HTML."""
+  html, word_count, links, images, heading = entry
+  summary.add_counts(word_count, links, images)
+  if heading is None:
+    return html
+  level, text, content = heading
+  anchor = summary.add_heading(level, text, content)
+  return f'<h{level} id="{escape_attribute(anchor)}">{html}</h{level}>'
+
+def parse_document(markdown, limits=None, registry=None, inline_cache=None, block_cache=None):
+  """Convert a markdown string to an HTML node and summarize it in the same pass.
+  
+  Headings get id attributes matching the anchors in the summary.
   
   Args:
     markdown: A string containing markdown text
+    limits: Optional DocumentLimits guarding the size and conversion time
+    registry: BlockRegistry used to detect and render blocks (default: default_registry)
+    inline_cache: Optional InlineCache memoizing inline tokenization across documents
+    block_cache: Optional BlockCache of rendered blocks; blocks found there
+      are spliced in as RawNodes instead of being parsed again
     
   Returns:
-    An HTMLNode object representing the markdown document
+    A tuple of (HTMLNode for the document, DocumentSummary)
+    
+  Raises:
+    DocumentLimitError: If the document exceeds one of the given limits
   """
-  # Split the markdown into blocks
-  blocks = markdown_to_blocks(markdown)
-  
-  # Process each block and create HTML nodes
+  deadline = None
+  if limits is not None:
+    limits.check_size(markdown)
+    deadline = limits.deadline()
+  
+  if registry is None:
+    registry = default_registry
+  # Split the markdown into blocks, taking out the reference definitions
+  references, blocks = extract_reference_definitions(markdown_to_blocks(markdown))
+  
+  render_inline = text_to_children if inline_cache is None else cached_text_to_children(inline_cache)
+  if references:
+    render_inline = resolving_references(render_inline, text_to_children, references)
+  summary = DocumentSummary()
+  
+  # Render each block through the renderer registered for its type
   children = []
   for block in blocks:
-    # Determine the block type
-    block_type = block_to_block_type(block)
-    
-    if block_type == BlockType.PARAGRAPH:
-      # Replace newlines with spaces in paragraphs
-      block_text = block.replace("\n", " ")
-      # Create paragraph node with inline markdown processing
-      children.append(ParentNode("p", text_to_children(block_text)))
-    
-    elif block_type == BlockType.HEADING:
-      # Extract the heading level and content
-      level, content = extract_title_level(block)
-      # Create heading node with inline markdown processing
-      children.append(ParentNode(f"h{level}", text_to_children(content)))
-    
-    elif block_type == BlockType.CODE:
-      # Extract code content without the backticks
-      code_content = extract_code_content(block)
-      # Create code block without inline markdown processing
-      code_node = TextNode(code_content, TextType.TEXT)
-      # Wrap in pre and code tags
-      code_html_node = text_node_to_html_node(code_node)
-      children.append(ParentNode("pre", [ParentNode("code", [code_html_node])]))
-    
-    elif block_type == BlockType.QUOTE:
-      # Extract quote content without the > markers
-      quote_content = extract_quote_content(block)
-      # Create quote node with inline markdown processing
-      children.append(ParentNode("blockquote", text_to_children(quote_content)))
-    
-    elif block_type == BlockType.UNORDERED_LIST:
-      # Extract list items
-      items = extract_list_items(block, ordered=False)
-      # Create list items with inline markdown processing
-      list_items = [ParentNode("li", text_to_children(item)) for item in items]
-      # Create unordered list node
-      children.append(ParentNode("ul", list_items))
-    
-    elif block_type == BlockType.ORDERED_LIST:
-      # Extract list items
-      items = extract_list_items(block, ordered=True)
-      # Create list items with inline markdown processing
-      list_items = [ParentNode("li", text_to_children(item)) for item in items]
-      # Create ordered list node
-      children.append(ParentNode("ol", list_items))
+    # Blocks convert in linear time, so checking between them is enough
+    if deadline is not None:
+      limits.check_time(deadline)
+    
+    block_type = registry.detect(block)
+    renderer = registry.renderer(block_type)
+    if (block_cache is not None and is_cacheable(block_type, renderer)
+        and not depends_on_references(block, references)):
+      entry = block_cache.lookup(block_type, block, lambda block: block_entry(block, renderer, render_inline))
+      children.append(RawNode(splice_block(entry, summary)))
+      continue
+    
+    node = renderer(block, render_inline)
+    summary.add_block(node)
+    if block_type == BlockType.HEADING:
+      add_heading_anchor(node, block, summary)
+    children.append(node)
   
   # Create parent div node containing all block nodes
-  return ParentNode("div", children)
+  return ParentNode("div", children), summary
+
+def markdown_to_html_node(markdown, limits=None, registry=None, inline_cache=None, block_cache=None):
+  """Convert a markdown string to an HTML node.
+  
+  Args:
+    markdown: A string containing markdown text
+    limits: Optional DocumentLimits guarding the size and conversion time
+    registry: BlockRegistry used to detect and render blocks (default: default_registry)
+    inline_cache: Optional InlineCache memoizing inline tokenization across documents
+    block_cache: Optional BlockCache of rendered blocks (see parse_document)
+    
+  Returns:
+    An HTMLNode object representing the markdown document
+    
+  Raises:
+    DocumentLimitError: If the document exceeds one of the given limits
+  """
+  return parse_document(markdown, limits, registry, inline_cache, block_cache)[0]
+
+def paragraph_to_html_node(block, inline):
+  """Render a paragraph block, joining its lines with spaces."""
+  return ParentNode("p", inline(block.replace("\n", " ")))
+
+def heading_to_html_node(block, inline):
+  """Render a heading block as an h1-h6 node."""
+  level, content = extract_title_level(block)
+  return ParentNode(f"h{level}", inline(content))
+
+def code_to_html_node(block, inline):
+  """Render a code block without inline markdown processing."""
+  code_node = TextNode(extract_code_content(block), TextType.TEXT)
+  return ParentNode("pre", [ParentNode("code", [text_node_to_html_node(code_node)])])
+
+def quote_to_html_node(block, inline):
+  """Render a quote block with its > markers removed, nesting blockquotes by depth."""
+  return events_to_node(scan_quote(block), inline)
+
+def list_to_html_node(block, inline):
+  """Render a list block, with any nested lists, as a ul or ol node."""
+  flat = flat_list_items(block)
+  if flat is None:
+    return events_to_node(scan_list(block), inline)
+  tag, items = flat
+  return ParentNode(tag, [ParentNode("li", inline(item)) for item in items])
+
+def unordered_list_to_html_node(block, inline):
+  """Render an unordered list block, with any nested lists, as a ul node."""
+  return list_to_html_node(block, inline)
+
+def ordered_list_to_html_node(block, inline):
+  """Render an ordered list block, with any nested lists, as an ol node."""
+  return list_to_html_node(block, inline)
+
+# The registry used by markdown_to_html_node when none is given. Core block
+# types are detected by block_to_block_type; extensions add their own detectors.
+default_registry = BlockRegistry(block_to_block_type)
+default_registry.register(BlockType.PARAGRAPH, paragraph_to_html_node)
+default_registry.register(BlockType.HEADING, heading_to_html_node)
+default_registry.register(BlockType.CODE, code_to_html_node)
+default_registry.register(BlockType.QUOTE, quote_to_html_node)
+default_registry.register(BlockType.UNORDERED_LIST, unordered_list_to_html_node)
+default_registry.register(BlockType.ORDERED_LIST, ordered_list_to_html_node)
+tables.register(default_registry)